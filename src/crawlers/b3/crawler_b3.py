@@ -1,13 +1,33 @@
 import os
 import json
+import argparse
 import requests
-import pandas as pd
 from bs4 import BeautifulSoup
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os.path as op
 import urllib3
 urllib3.disable_warnings()
 
+from ingestion import BATCH_SIZE, connect, ingest
+
+path_crawlers = op.dirname(op.abspath(__file__))
+
+# Qflib database (see ingestion.connect)
+DB_URL = os.environ.get('QFLIB_DB', 'sqlite:///' + op.join(path_crawlers, 'relevant_facts.sqlite'))
+
+# Qflib table of the relevant facts (no default: it must be given)
+DB_TABLE = os.environ.get('QFLIB_TABLE')
+
+REPORTS_URL = 'https://bvmf.bmfbovespa.com.br/pt-br/mercados/acoes/empresas/ExecutaAcaoConsultaInfoRelevantes.asp?codCVM={cvm_code}&ano={year}'
+
+# Concurrent requests to bvmf.bmfbovespa (one pooled connection each)
+MAX_WORKERS = 8
+
+TIMEOUT = 30
+
 
 def find_between(s, first, last):
     try:
@@ -18,34 +38,54 @@ def find_between(s, first, last):
         return ""
 
 
-def get_reports(cvm_code, year):
-    url = f'https://bvmf.bmfbovespa.com.br/pt-br/mercados/acoes/empresas/ExecutaAcaoConsultaInfoRelevantes.asp?codCVM={cvm_code}&ano={year}'
+def new_session(pool_size=MAX_WORKERS, retries=5):
+    """
+    Session shared by all the requests: keep-alive connections (up to
+    `pool_size`) and retries with exponential backoff on connection errors
+    and 429/5xx answers.
+    """
+
+    retry = Retry(total=retries, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=['GET'], respect_retry_after_header=True)
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
 
-    with requests.Session() as s:
-        req = s.get(url,
-                    allow_redirects=False,
-                    verify=False)
+    return session
 
-        soup = BeautifulSoup(req.content.decode('utf-8'), 'html.parser')
 
-        # Get all <div> tags with class 'large-12 columns'
-        divs = [d for d in soup.find_all('div', {'class': 'large-12 columns'})]
+def get_reports(cvm_code, year, session=None):
+    url = REPORTS_URL.format(cvm_code=cvm_code, year=year)
 
-        # Skip first 3 divs (Metadata)
-        # Return last 10 divs
-        return divs[2:13]
+    if session is None:
+        with new_session() as session:
+            return get_reports(cvm_code, year, session)
 
+    req = session.get(url,
+                      allow_redirects=False,
+                      verify=False,
+                      timeout=TIMEOUT)
+    req.raise_for_status()
 
-def get_data(ticker, cvm_code, year):
+    soup = BeautifulSoup(req.content.decode('utf-8'), 'html.parser')
+
+    # Get all <div> tags with class 'large-12 columns'
+    divs = [d for d in soup.find_all('div', {'class': 'large-12 columns'})]
+
+    # Skip first 3 divs (Metadata)
+    # Return last 10 divs
+    return divs[2:13]
+
+
+def parse_reports(divs, cvm_code):
     results_list = list()
-    divs = get_reports(cvm_code, year)
 
     for div in divs:
         try:
             results_dict = dict()
             all_info = list()
 
-            results_dict['Ticker'] = ticker
             results_dict['CVM'] = cvm_code
             links = [link.text.strip() for link in div.find_all('p', {'class': 'primary-text'})]
             results_dict['Categoria'] = str(links[0])
@@ -68,75 +108,86 @@ def get_data(ticker, cvm_code, year):
     return results_list
 
 
-def save_data(results_list, ticker):
-    # Save the list of dicts
-    with open(op.join(path_crawlers, f'{ticker}.json'), 'w', encoding='utf8') as f:
-        json.dump(results_list, f, ensure_ascii=False)
-
-
-def upload_qflib(ticker):
-    # Load JSON for ticker
-    json_file = open(op.join(path_crawlers, f'{ticker}.json'), encoding='utf8')
-    json_obj = json.load(json_file)
-
-    with new_conn:
-        # Open new cursor
-        with new_conn.cursor() as c:
-            for item in json_obj:
-                reference_date = str(item['Data Referência'][:10]) if 'Data Referência' in item.keys() else '01/01/1900'
-                release_date = str(item['Data Entrega'][:10]) if 'Data Entrega' in item.keys() else '01/01/1900'
-                ticker = str(item['Ticker'])
-                headline = ((str(item['Assunto']) if 'Assunto' in item.keys() else 'Sem informação.') + ' ' + (str(item['Assunto Extra']) if 'Assunto Extra' in item.keys() else '')).strip()
-                topic = ((str(item['Tipo']) if 'Tipo' in item.keys() else '') + ' - ' + (str(item['Categoria']) if 'Categoria' in item.keys() else '')).strip()
-
-                if topic.startswith('- '):
-                    topic = topic.replace('- ', '')
-
-                c.execute(
-                    """
-                    INSERT INTO XXX (reference_date, release_date, headline, ticker, topic)
-                    VALUES (%(reference_date)s, %(release_date)s, %(headline)s, %(ticker)s, %(topic)s)
-                    ON CONFLICT (reference_date, ticker, headline, topic) DO NOTHING;
-                     """,
-                    {
-                        "reference_date": datetime.strptime(reference_date, '%d/%m/%Y'),
-                        "release_date": datetime.strptime(release_date, '%d/%m/%Y'),
-                        "headline": headline,
-                        "ticker": ticker,
-                        "topic": topic,
-                    },
-                )
-    new_conn.close()
-
-
-def main(year):
+def cvm_tickers(data):
+    """
+    CVM code -> tickers (several tickers share the reports of one company).
+    """
+
+    code_tickers = dict()
+
+    for company in data:
+        if company['tickers']:
+            cvm_code = find_between(company['url_dados'], '?CodCVM=', '&AnoDoc=')
+            code_tickers.setdefault(cvm_code, list()).extend(company['tickers'])
+
+    return code_tickers
+
+
+def iter_reports(code_tickers, years, max_workers=MAX_WORKERS):
+    """
+    Fetches the reports of every CVM code and year once, with at most
+    `max_workers` concurrent requests on a pooled session. Yields
+    (cvm_code, year, results_list) as they arrive (in order).
+    """
+
+    tasks = [(cvm_code, year) for cvm_code in code_tickers for year in years]
+
+    def fetch(task):
+        cvm_code, year = task
+
+        try:
+            return parse_reports(get_reports(cvm_code, year, session), cvm_code)
+        except requests.RequestException as e:
+            print(f'CVM {cvm_code} ({year}): {e}')
+            return list()
+
+    with new_session(pool_size=max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for (cvm_code, year), results_list in zip(tasks, executor.map(fetch, tasks)):
+                yield cvm_code, year, results_list
+
+
+def iter_records(code_tickers, years, max_workers=MAX_WORKERS):
+    """
+    Records of every ticker (the reports of its CVM code), as they are fetched.
+    """
+
+    for cvm_code, year, results_list in iter_reports(code_tickers, years, max_workers):
+        for ticker in code_tickers[cvm_code]:
+            for results_dict in results_list:
+                yield dict(Ticker=ticker, **results_dict)
+
+
+def main(years, db_table, db_url=DB_URL, max_workers=MAX_WORKERS, batch_size=BATCH_SIZE):
     # 1. Get Ticker <--> CVM code info
     with open(op.join(path_crawlers, 'results-b3.json'), encoding='utf8') as json_file:
         data = json.load(json_file)
 
-    df_b3 = pd.DataFrame(data)
-
-    # 2. Save info into Dict
-    ticker_code = dict()
-    for index, row in df_b3.iterrows():
-        if row['tickers']:
-            for ticker in row['tickers']:
-                ticker_code[ticker] = find_between(row['url_dados'], '?CodCVM=', '&AnoDoc=')
+    # 2. Save info into Dict (CVM code -> tickers)
+    code_tickers = cvm_tickers(data)
 
-    # 3. Get news for all tickers
-    for ticker, cvm_code in ticker_code.items():
-        results_list = get_data(ticker, cvm_code, year)
+    # 3. Get news for all tickers (each CVM code and year fetched once, concurrently)
+    # and upload them to Qflib in batches, on one connection
+    backend = connect(db_url, db_table)
 
-        # Save the list of dicts
-        save_data(results_list, ticker)
-
-        # Upload to Qflib
-        upload_qflib(ticker)
+    try:
+        read, inserted = ingest(iter_records(code_tickers, years, max_workers), backend, batch_size)
+    finally:
+        backend.close()
 
-        # Delete JSON file with crawler results
-        os.remove(op.join(path_crawlers, f'{ticker}.json'))
+    print(f'{read} records, {inserted} new')
 
 
 if __name__ == '__main__':
     currentYear = datetime.now().year
-    main(year=currentYear)
+
+    parser = argparse.ArgumentParser(description='B3 relevant facts crawler.')
+    parser.add_argument('--start-year', type=int, default=currentYear)
+    parser.add_argument('--end-year', type=int, default=currentYear)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--db', default=DB_URL, help='sqlite:///path or postgresql://... (default: $QFLIB_DB or a local SQLite file)')
+    parser.add_argument('--table', default=DB_TABLE, required=DB_TABLE is None, help='Qflib table of the relevant facts (default: $QFLIB_TABLE)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    main(years=range(args.start_year, args.end_year + 1), db_table=args.table, db_url=args.db, max_workers=args.workers, batch_size=args.batch_size)
@@ -0,0 +1,169 @@
+"""
+Benchmark of the article field extraction: the per-field selectors the
+spiders used before extraction.Extractor (kept below as `legacy_*`) against
+the Extractor backends (parsel, lxml and, if installed, selectolax).
+
+Runs on the article pages of a response cache directory (--cache) or of the fixtures
+of bench_parse.py. Every page is parsed from its raw body (a new response
+per page and method, as when re-parsing an archive), and the fields of every
+backend are checked against the legacy ones (tags compared without the
+empty strings the legacy code kept).
+
+Results are appended as JSON lines to benchmarks/results/bench_extraction.jsonl.
+
+Usage (from src/crawlers):
+    python benchmarks/bench_extraction.py [--cache httpcache] [--articles 500] [--repeat 3]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+from datetime import datetime
+
+from scrapy.http import HtmlResponse
+
+from bench_parse import SITES, FIXTURES_DIR, build_fixtures, git_revision
+
+from response_cache import stored_responses
+from extraction import BACKENDS, Extractor
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RESULTS_FILE = os.path.join(THIS_DIR, 'results', 'bench_extraction.jsonl')
+
+
+def legacy_suno(response) -> dict:
+    return dict(
+        topic=response.xpath('//span[contains(@class, "newsContent__article__categoryName")]/a/text()').extract_first().strip(),
+        title=response.xpath('//h1[contains(@class,"newsContent__article__title")]/text()').extract_first().strip(),
+        date=response.xpath('//div[contains(@class, "authorBox__name")]/time/text()').extract_first().strip(),
+        tags=[t.strip() for t in response.css('ul.tags__list li ::text').extract()],
+    )
+
+
+def legacy_infomoney(response) -> dict:
+    return dict(
+        title=response.xpath('//h1[contains(@class,"typography__display--2")]/text()').extract_first().strip(),
+        date=response.xpath('//div[contains(@class, "single__author-info")]//time[contains(@class, "entry-date published")]/@datetime').extract_first().strip(),
+        tags=[t.strip() for t in response.css('div.single__tag-list ul li a ::text').extract()],
+    )
+
+
+def legacy_moneytimes(response) -> dict:
+    fields = dict(
+        topic=response.xpath('//div[contains(@class, "single__category")]/a/text()').extract_first().strip(),
+        title=response.xpath('//h1[contains(@class,"single__title")]/text()').extract_first().strip(),
+        date=response.css('div.single-meta > div.single-meta__date::text').extract_first(),
+    )
+
+    # Computed (but not exported) by the old parser
+    full_string_text = ''.join(response.css('div.single__text p ::text').extract())
+    full_string_text = full_string_text.replace('\xa0', ' ')
+    full_string_text = re.sub(' +', ' ', full_string_text).strip()
+
+    fields['tags'] = [t.strip() for t in response.css('div.single__tags a ::text').extract()]
+
+    return fields
+
+
+LEGACY = {
+    'suno': legacy_suno,
+    'infomoney': legacy_infomoney,
+    'moneytimes': legacy_moneytimes,
+}
+
+
+def available_backends() -> list:
+    backends = list()
+
+    for backend in BACKENDS:
+        try:
+            Extractor(dict(), backend=backend)
+        except ImportError:
+            print(f'{backend} not installed: skipped')
+            continue
+
+        backends.append(backend)
+
+    return backends
+
+
+def time_method(pages: list, extract, repeat: int) -> tuple:
+    """
+    Best time of `repeat` passes of `extract` over the raw pages, and its results.
+    Responses are built inside the loop: only one parsed page is alive at a time.
+    """
+
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [extract(HtmlResponse(url=url, body=body, headers=headers)) for url, body, headers in pages]
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of the article field extraction.')
+    parser.add_argument('--cache', default=None, help='recorded response cache directory (default: build the fixtures)')
+    parser.add_argument('--articles', type=int, default=500, help='fixture articles per site')
+    parser.add_argument('--padding-kb', type=int, default=60, help='boilerplate per fixture page')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    cache_dir = args.cache
+
+    if cache_dir is None:
+        cache_dir = FIXTURES_DIR
+        build_fixtures(cache_dir, args.articles, args.padding_kb)
+    backends = available_backends()
+
+    environment = dict(revision=git_revision(), python=platform.python_version(), machine=platform.machine(),
+                       cache=args.cache or 'fixtures', padding_kb=args.padding_kb)
+
+    header = f"{'site':<11} {'method':<11} {'pages':>6} {'time (s)':>9} {'pages/s':>9} {'speedup':>8} {'mismatches':>11}"
+    print(header)
+    print('-' * len(header))
+
+    for site, (spider_cls, _, _) in SITES.items():
+        pages = [(response.url, response.body, response.headers) for response, _, _ in stored_responses(spider_cls.name, cache_dir, 'parse_pages')]
+
+        if not pages:
+            continue
+
+        legacy_time, legacy_results = time_method(pages, LEGACY[site], args.repeat)
+        expected = [dict(fields, tags=[tag for tag in fields['tags'] if tag]) for fields in legacy_results]
+
+        methods = [('legacy', legacy_time, 0)]
+
+        for backend in backends:
+            extractor = Extractor(spider_cls.article_fields, backend=backend)
+            elapsed, results = time_method(pages, extractor.extract, args.repeat)
+
+            methods.append((backend, elapsed, sum(result != fields for result, fields in zip(results, expected))))
+
+        for method, elapsed, mismatches in methods:
+            result = dict(site=site, method=method, pages=len(pages), time=elapsed, pages_per_sec=len(pages) / elapsed,
+                          speedup=legacy_time / elapsed, mismatches=mismatches,
+                          timestamp=datetime.now().isoformat(timespec='seconds'), **environment)
+
+            with open(args.output, 'a', encoding='utf8') as f:
+                f.write(json.dumps(result) + '\n')
+
+            print(f"{site:<11} {method:<11} {len(pages):>6} {elapsed:>9.3f} {result['pages_per_sec']:>9.0f} {result['speedup']:>7.2f}x {mismatches:>11}")
+
+    print(f'Results appended to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
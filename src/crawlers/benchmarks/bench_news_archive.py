@@ -0,0 +1,147 @@
+"""
+Benchmark of the news archive (news_archive.py) against the file scans it
+replaces:
+
+- ticker: the Suno news of one ticker and year, with datasets.load_suno_files
+  (reads and filters the whole CSV) and with NewsArchive.search;
+- keyword: the news of every source with a keyword in the title, reading
+  all the spider outputs with pandas and with the FTS5 index.
+
+The archive is built from the bundled spider outputs (the load time is
+reported) in benchmarks/results/. Every query is timed `--repeat` times
+(best time kept).
+
+Results are appended as JSON lines to benchmarks/results/bench_news_archive.jsonl.
+
+Usage (from src/crawlers):
+    python benchmarks/bench_news_archive.py [--ticker PETR4] [--year 2021] [--keyword dividendos]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import platform
+import unicodedata
+from datetime import datetime
+
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWLERS_DIR = os.path.dirname(THIS_DIR)
+
+sys.path.insert(0, CRAWLERS_DIR)
+sys.path.insert(0, os.path.join(CRAWLERS_DIR, '..', 'sentiment_classifier'))
+
+from bench_parse import git_revision
+from news_archive import SOURCES, NewsArchive
+
+RESULTS_FILE = os.path.join(THIS_DIR, 'results', 'bench_news_archive.jsonl')
+ARCHIVE_FILE = os.path.join(THIS_DIR, 'results', 'news_archive.sqlite')
+
+
+def strip_accents(text: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def scan_keyword(keyword: str) -> pd.DataFrame:
+    """
+    News of every source with `keyword` in the title, from the spider outputs.
+    """
+
+    frames = list()
+
+    for source, config in SOURCES.items():
+        for pattern in config['patterns']:
+            for path in sorted(glob.glob(os.path.join(CRAWLERS_DIR, pattern))):
+                frames.append(pd.read_json(path, lines=path.endswith('.jsonl')).assign(source=source))
+
+    df = pd.concat(frames, ignore_index=True)
+    df['url'] = df['url'].fillna(df['link'])
+    df = df.drop_duplicates(subset=['source', 'url'])
+
+    # Same matching as the FTS5 tokenizer: case and accents ignored
+    titles = df['title'].fillna('').map(strip_accents).str.lower()
+
+    return df[titles.str.contains(rf'\b{strip_accents(keyword).lower()}\b')]
+
+
+def best_time(query, repeat: int) -> tuple:
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = query()
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, len(df)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of the news archive.')
+    parser.add_argument('--ticker', default='PETR4')
+    parser.add_argument('--year', default='2021')
+    parser.add_argument('--keyword', default='dividendos')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    from datasets import load_suno_files
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    if os.path.exists(ARCHIVE_FILE):
+        os.remove(ARCHIVE_FILE)
+
+    archive = NewsArchive(ARCHIVE_FILE)
+
+    start = time.perf_counter()
+    archive.load()
+    print(f'{len(archive)} articles loaded in {time.perf_counter() - start:.1f}s')
+
+    start_dt, end_dt = f'{args.year}-01-01', f'{args.year}-12-31'
+
+    queries = {
+        'ticker': {
+            'scan': lambda: load_suno_files(args.ticker, start_dt, end_dt),
+            'archive': lambda: archive.search(ticker=args.ticker, start_dt=start_dt, end_dt=end_dt, sources=['suno']),
+        },
+        'keyword': {
+            'scan': lambda: scan_keyword(args.keyword),
+            'archive': lambda: archive.search(query=f'title:{args.keyword}'),
+        },
+    }
+
+    environment = dict(revision=git_revision(), python=platform.python_version(), sqlite=archive.conn.execute('SELECT sqlite_version()').fetchone()[0],
+                       machine=platform.machine(), articles=len(archive))
+
+    header = f"{'query':<8} {'method':<8} {'rows':>6} {'time (ms)':>10} {'speedup':>8}"
+    print(header)
+    print('-' * len(header))
+
+    for query, methods in queries.items():
+        scan_time = None
+
+        for method, run in methods.items():
+            elapsed, rows = best_time(run, args.repeat)
+            scan_time = scan_time or elapsed
+
+            result = dict(query=query, method=method, rows=rows, time=elapsed, speedup=scan_time / elapsed,
+                          timestamp=datetime.now().isoformat(timespec='seconds'), **environment)
+
+            with open(args.output, 'a', encoding='utf8') as f:
+                f.write(json.dumps(result) + '\n')
+
+            print(f"{query:<8} {method:<8} {rows:>6} {elapsed * 1000:>10.1f} {result['speedup']:>7.1f}x")
+
+    archive.close()
+
+    print(f'Results appended to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
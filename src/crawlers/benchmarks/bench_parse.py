@@ -0,0 +1,291 @@
+"""
+Parse throughput of the news spiders over stored pages.
+
+The pages come from a response cache directory (see response_cache): one
+recorded by a live crawl (--cache, e.g. httpcache after a crawl with
+cache_mode='record') or, by default, a fixture cache built from the bundled
+Suno, InfoMoney and MoneyTimes results: every stored item is rendered back
+into the markup of its site (article pages, plus listing pages of 10 links),
+padded with --padding-kb of boilerplate (menus, scripts) to the size of a
+real page.
+
+Every stored response is fed to the spider callback it was routed to
+(parse_front / parse_pages), without the Scrapy engine. The script reports
+the pages/sec of each site and callback and, for the fixtures, the articles
+whose parsed item differs from the item they were rendered from (a parser
+regression check). With --crawl, the fixtures are also crawled end to end
+through Scrapy with cache_mode='replay'.
+
+Results are appended as JSON lines to benchmarks/results/bench_parse.jsonl.
+Runs offline.
+
+Usage (from src/crawlers):
+    python benchmarks/bench_parse.py [--cache httpcache] [--articles 500] [--crawl]
+"""
+
+import os
+import sys
+import json
+import html
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+
+import scrapy
+from scrapy.http import HtmlResponse
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWLERS_DIR = os.path.dirname(THIS_DIR)
+
+sys.path.insert(0, CRAWLERS_DIR)
+
+for site_dir in ['suno', 'moneytimes', 'infomoney']:
+    sys.path.insert(0, os.path.join(CRAWLERS_DIR, site_dir))
+
+from response_cache import open_storage, stored_responses
+from main_suno import SunoSpider
+from main_moneytimes import MoneyTimesSpider
+from main_infomoney import InfoMoneySpider
+
+RESULTS_FILE = os.path.join(THIS_DIR, 'results', 'bench_parse.jsonl')
+FIXTURES_DIR = os.path.join(THIS_DIR, 'results', 'fixtures_httpcache')
+
+# Site -> spider, bundled results file and the item field with the article URL
+SITES = {
+    'suno': (SunoSpider, 'suno/results/suno-petr4.json', 'url'),
+    'infomoney': (InfoMoneySpider, 'infomoney/results/infomoney-results_check.json', 'link'),
+    'moneytimes': (MoneyTimesSpider, 'moneytimes/results/moneytimes-petr4.json', 'link'),
+}
+
+# Item fields checked against the fixtures
+CHECKED_FIELDS = ['topic', 'title', 'date', 'tags']
+
+LINKS_PER_PAGE = 10
+
+
+def boilerplate(kb: int) -> str:
+    menu = ''.join(f'<li class="menu__item"><a href="/secao-{i}/">Seção {i}</a></li>' for i in range(40))
+    script = '<script>window.dataLayer = window.dataLayer || []; dataLayer.push({"event": "pageview"});</script>'
+    block = f'<nav><ul class="menu">{menu}</ul></nav>{script}'
+
+    return block * max(1, kb * 1024 // len(block))
+
+
+def article_html(site: str, item: dict, padding: str) -> str:
+    e = html.escape
+    tags = item.get('tags') or []
+
+    if site == 'suno':
+        content = (f'<article class="newsContent__article">'
+                   f'<span class="newsContent__article__categoryName"><a>{e(item["topic"])}</a></span>'
+                   f'<h1 class="newsContent__article__title">{e(item["title"])}</h1>'
+                   f'<div class="authorBox__name"><time>{e(item["date"])}</time></div>'
+                   f'<p>{e(item["title"])}</p>'
+                   f'<ul class="tags__list">{"".join(f"<li>{e(t)}</li>" for t in tags)}</ul></article>')
+    elif site == 'infomoney':
+        published = item['date'].replace(' ', 'T') + '-03:00'
+        content = (f'<h1 class="typography__display--2">{e(item["title"])}</h1>'
+                   f'<div class="single__author-info"><time class="entry-date published" datetime="{published}">{e(item["date"])}</time></div>'
+                   f'<div class="article-content"><p>{e(item["title"])}</p></div>'
+                   f'<div class="single__tag-list"><ul>{"".join(f"<li><a>{e(t)}</a></li>" for t in tags)}</ul></div>')
+    else:
+        content = (f'<div class="single__category"><a>{e(item["topic"])}</a></div>'
+                   f'<h1 class="single__title">{e(item["title"])}</h1>'
+                   f'<div class="single-meta"><div class="single-meta__date">{e(item["date"])}</div></div>'
+                   f'<div class="single__text"><p>{e(item["title"])}</p></div>'
+                   f'<div class="single__tags">{"".join(f"<a>{e(t)}</a>" for t in tags)}</div>')
+
+    return f'<html><head><meta charset="utf-8"></head><body>{padding}{content}{padding}</body></html>'
+
+
+def listing_html(site: str, urls: list, padding: str) -> str:
+
+    if site == 'suno':
+        cards = ''.join(f'<div class="cardsPage__listCard__boxs__content"><a href="{url}">x</a></div>' for url in urls)
+        content = f'<div class="cardsPage__listCard__boxs">{cards}</div>'
+    elif site == 'infomoney':
+        # Fragment of the infinite scroll answer, with escaped slashes
+        content = ''.join(f'<div><a href="{url.replace("/", chr(92) + "/")}">x</a></div>' for url in urls)
+    else:
+        content = ''.join(f'<div class="news-item"><h2 class="news-item__title"><a href="{url}">x</a></h2></div>' for url in urls)
+
+    return f'<html><head><meta charset="utf-8"></head><body>{padding}{content}{padding}</body></html>'
+
+
+def build_fixtures(path: str, articles: int, padding_kb: int, seed: int = 123) -> dict:
+    """
+    Fixture cache with `articles` article pages of each site. Returns the
+    source items by URL.
+    """
+
+    storage = open_storage(path, clear=True)
+    rng = random.Random(seed)
+    padding = boilerplate(padding_kb)
+    expected = dict()
+
+    for site, (spider_cls, results_file, url_field) in SITES.items():
+        with open(os.path.join(CRAWLERS_DIR, results_file), encoding='utf8') as json_file:
+            items = json.load(json_file)
+
+        items = [item for item in rng.sample(items, min(articles, len(items))) if item.get('title')]
+        spider = spider_cls(seen_index_path=None)
+
+        for i in range(0, len(items), LINKS_PER_PAGE):
+            urls = [item[url_field] for item in items[i:i + LINKS_PER_PAGE]]
+            request = spider.page_request(i // LINKS_PER_PAGE + 1)
+            body = listing_html(site, urls, padding).encode('utf8')
+
+            storage.store_response(spider, request, HtmlResponse(url=request.url, body=body, encoding='utf8', headers={'Content-Type': 'text/html; charset=UTF-8'}))
+
+        for item in items:
+            url = item[url_field]
+            request = scrapy.Request(url, callback=spider.parse_pages)
+            body = article_html(site, item, padding).encode('utf8')
+
+            storage.store_response(spider, request, HtmlResponse(url=url, body=body, encoding='utf8', headers={'Content-Type': 'text/html; charset=UTF-8'}))
+            expected[url] = item
+
+    return expected
+
+
+def parse_stored(cache_dir: str, spider_cls) -> tuple:
+    """
+    Feeds every stored page of a spider to its callback. Returns the timings
+    ({callback: [pages, load seconds, parse seconds]}) and the parsed items.
+    """
+
+    spider = spider_cls(seen_index_path=None)
+    timings = dict()
+    items = list()
+
+    responses = stored_responses(spider.name, cache_dir)
+
+    while True:
+        start = time.perf_counter()
+        stored = next(responses, None)
+        loaded = time.perf_counter()
+
+        if stored is None:
+            break
+
+        response, callback, cb_kwargs = stored
+        output = list(getattr(spider, callback)(response, **cb_kwargs))
+        parsed = time.perf_counter()
+
+        stats = timings.setdefault(callback, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += loaded - start
+        stats[2] += parsed - loaded
+
+        items += [result for result in output if isinstance(result, dict)]
+
+    return timings, items
+
+
+def check_items(items: list, expected: dict) -> int:
+    """
+    Number of parsed items differing from the fixture they were rendered from.
+    """
+
+    mismatches = 0
+
+    for item in items:
+        source = expected.get(item.get('url') or item.get('link'))
+
+        if source is None or any(item.get(field) != source.get(field) for field in CHECKED_FIELDS if field in source):
+            mismatches += 1
+
+    return mismatches
+
+
+def replay_crawl(cache_dir: str) -> dict:
+    """
+    Crawls the stored pages of every site end to end through Scrapy
+    (cache_mode='replay'). Returns the items exported per site and the wall time.
+    """
+
+    from scrapy.crawler import CrawlerProcess
+    from pipelines import load_jsonl
+
+    output_dir = tempfile.mkdtemp()
+    process = CrawlerProcess(settings={'LOG_LEVEL': 'WARNING'})
+    outputs = dict()
+
+    for site, (spider_cls, _, _) in SITES.items():
+        pages = sum(1 for _ in stored_responses(spider_cls.name, cache_dir, 'parse_front'))
+
+        if pages:
+            outputs[site] = os.path.join(output_dir, f'{site}.jsonl')
+            process.crawl(spider_cls, cache_mode='replay', cache_dir=cache_dir, seen_index_path=None,
+                          last_page=pages, output_path=outputs[site])
+
+    start = time.perf_counter()
+    process.start()
+    wall = time.perf_counter() - start
+
+    return dict(items={site: len(load_jsonl(path)) for site, path in outputs.items()}, wall=wall)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=THIS_DIR, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Parse throughput of the news spiders over stored pages.')
+    parser.add_argument('--cache', default=None, help='recorded response cache directory (default: build the fixtures)')
+    parser.add_argument('--articles', type=int, default=500, help='fixture articles per site')
+    parser.add_argument('--padding-kb', type=int, default=60, help='boilerplate per fixture page')
+    parser.add_argument('--sites', nargs='+', choices=list(SITES), default=list(SITES))
+    parser.add_argument('--crawl', action='store_true', help='also replay the fixtures through Scrapy')
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    expected = None
+    cache_dir = args.cache
+
+    if cache_dir is None:
+        cache_dir = FIXTURES_DIR
+        expected = build_fixtures(cache_dir, args.articles, args.padding_kb)
+
+    environment = dict(revision=git_revision(), python=platform.python_version(), scrapy=scrapy.__version__,
+                       machine=platform.machine(), cache=args.cache or 'fixtures', padding_kb=args.padding_kb)
+
+    header = f"{'site':<11} {'callback':<12} {'pages':>6} {'load (s)':>9} {'parse (s)':>10} {'pages/s':>9} {'mismatches':>11}"
+    print(header)
+    print('-' * len(header))
+
+    for site in args.sites:
+        spider_cls = SITES[site][0]
+        timings, items = parse_stored(cache_dir, spider_cls)
+        mismatches = check_items(items, expected) if expected is not None else None
+
+        for callback, (pages, load, parse) in timings.items():
+            result = dict(site=site, callback=callback, pages=pages, load=load, parse=parse, pages_per_sec=pages / parse,
+                          timestamp=datetime.now().isoformat(timespec='seconds'), **environment)
+
+            if callback == 'parse_pages':
+                result['mismatches'] = mismatches
+
+            with open(args.output, 'a', encoding='utf8') as f:
+                f.write(json.dumps(result) + '\n')
+
+            print(f"{site:<11} {callback:<12} {pages:>6} {load:>9.3f} {parse:>10.3f} {pages / parse:>9.0f} {str(result.get('mismatches', '')):>11}")
+
+    if args.crawl:
+        crawl = replay_crawl(cache_dir)
+        print(f"Replay crawl: {crawl['items']} items in {crawl['wall']:.1f}s")
+
+    print(f'Results appended to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark of the tweet store (twitter/tweet_store.py) against the CSV
+datasets read by datasets.load_twitter_files.
+
+A synthetic multi-year, multi-account corpus (--rows rows, sampled with
+replacement from the final Twitter datasets, with random dates in
+--start/--end, random accounts among --accounts and unique tweet ids) is
+written both as the two CSV datasets and as the tweet store. Each query
+then runs in a fresh process, which reports its wall time, peak RSS and the
+deep memory of the resulting frame:
+
+- ticker: one ticker over one year (load_twitter_files / load_tweet_store);
+- full: the whole corpus (read_csv with default dtypes / load_tweets).
+
+Results are appended as JSON lines to benchmarks/results/bench_tweet_store.jsonl.
+
+Usage (from src/crawlers):
+    python benchmarks/bench_tweet_store.py [--rows 1000000] [--accounts 50]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import resource
+import argparse
+import platform
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWLERS_DIR = os.path.dirname(THIS_DIR)
+
+sys.path.insert(0, os.path.join(CRAWLERS_DIR, 'twitter'))
+sys.path.insert(0, os.path.join(CRAWLERS_DIR, '..', 'sentiment_classifier'))
+
+from bench_parse import git_revision
+
+RESULTS_FILE = os.path.join(THIS_DIR, 'results', 'bench_tweet_store.jsonl')
+DATA_DIR = os.path.join(THIS_DIR, 'results', 'tweet_store_data')
+
+
+def synthetic_corpus(rows: int, accounts: int, start: str, end: str, seed: int = 123) -> pd.DataFrame:
+    from tweet_store import CSV_FILES
+
+    rng = np.random.RandomState(seed)
+
+    df = pd.concat([pd.read_csv(path, sep=';', index_col=0) for path in CSV_FILES], ignore_index=True)
+    df = df.iloc[rng.randint(0, len(df), rows)].reset_index(drop=True)
+
+    start, end = pd.Timestamp(start).value // 10**9, pd.Timestamp(end).value // 10**9
+    created_at = pd.to_datetime(rng.randint(start, end, rows), unit='s')
+
+    df['created_at'] = created_at.strftime('%Y-%m-%d %H:%M:%S')
+    df['tweet_id'] = np.arange(rows) + 10**18
+    df['screen_name'] = [f'account_{i}' for i in rng.randint(0, accounts, rows)]
+    df['user_id'] = df['screen_name'].str.replace('account_', '', regex=False).astype(int) + 10**7
+
+    return df
+
+
+def peak_rss_mb() -> float:
+    # Peak resident set (VmHWM, in kB) of the process; ru_maxrss as a fallback
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_query(query: str, method: str, csv_files: list, store_dir: str, ticker: str, start_dt: str, end_dt: str) -> dict:
+    """
+    Runs one query (in a worker process).
+    """
+
+    import datasets
+
+    datasets.TWITTER_SPECIFIC_FILE, datasets.TWITTER_RELATED_FILE = csv_files
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+
+    if query == 'ticker' and method == 'csv':
+        df = datasets.load_twitter_files(ticker, start_dt, end_dt)
+    elif query == 'ticker':
+        df = datasets.load_tweet_store(ticker, start_dt, end_dt, store_dir=store_dir)
+    elif method == 'csv':
+        df = pd.concat([pd.read_csv(path, sep=';') for path in csv_files])
+    else:
+        from tweet_store import load_tweets
+        df = load_tweets(store_dir=store_dir)
+
+    elapsed = time.perf_counter() - start
+
+    return dict(query=query, method=method, rows=len(df), time=elapsed, peak_rss_mb=peak_rss_mb() - rss_before,
+                frame_mb=df.memory_usage(deep=True).sum() / 2**20)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of the tweet store.')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--accounts', type=int, default=50)
+    parser.add_argument('--start', default='2015-01-01')
+    parser.add_argument('--end', default='2022-07-01')
+    parser.add_argument('--ticker', default='PETR4')
+    parser.add_argument('--year', default='2021')
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    from tweet_store import write_tweets
+
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+    os.makedirs(DATA_DIR)
+
+    df = synthetic_corpus(args.rows, args.accounts, args.start, args.end)
+
+    # Same split as the datasets: specific and related users
+    csv_files = [os.path.join(DATA_DIR, 'specific.csv'), os.path.join(DATA_DIR, 'related.csv')]
+    half = len(df) // 2
+    df.iloc[:half].to_csv(csv_files[0], sep=';')
+    df.iloc[half:].to_csv(csv_files[1], sep=';')
+
+    store_dir = os.path.join(DATA_DIR, 'tweet_store')
+
+    start = time.perf_counter()
+    partitions = len(write_tweets(df, store_dir))
+    print(f'{len(df)} rows: {partitions} partitions written in {time.perf_counter() - start:.1f}s')
+
+    del df
+
+    environment = dict(revision=git_revision(), python=platform.python_version(), pandas=pd.__version__, machine=platform.machine(),
+                       corpus_rows=args.rows, accounts=args.accounts)
+
+    header = f"{'query':<7} {'method':<7} {'rows':>9} {'time (s)':>9} {'peak RSS (MB)':>14} {'frame (MB)':>11}"
+    print(header)
+    print('-' * len(header))
+
+    for query in ['ticker', 'full']:
+        results = dict()
+
+        for method in ['csv', 'store']:
+            # Fresh process per run: peak RSS is per run
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                result = executor.submit(run_query, query, method, csv_files, store_dir, args.ticker,
+                                         f'{args.year}-01-01', f'{args.year}-12-31').result()
+
+            results[method] = result = dict(result, timestamp=datetime.now().isoformat(timespec='seconds'), **environment)
+
+            with open(args.output, 'a', encoding='utf8') as f:
+                f.write(json.dumps(result) + '\n')
+
+            print(f"{query:<7} {method:<7} {result['rows']:>9} {result['time']:>9.2f} {result['peak_rss_mb']:>14.0f} {result['frame_mb']:>11.1f}")
+
+        csv, store = results['csv'], results['store']
+        print(f"{query:<7} {'ratio':<7} {'':>9} {csv['time'] / store['time']:>8.1f}x {csv['peak_rss_mb'] / max(store['peak_rss_mb'], 1):>13.1f}x {csv['frame_mb'] / store['frame_mb']:>10.1f}x")
+
+    print(f'Results appended to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
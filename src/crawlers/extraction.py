@@ -0,0 +1,105 @@
+import re
+
+# Backends of the Extractor: parsel (Scrapy selectors), lxml (same XPath
+# queries, compiled once and run on the raw tree) and selectolax (Lexbor
+# parser, optional: pip install selectolax)
+BACKENDS = ('parsel', 'lxml', 'selectolax')
+
+# Kinds of field:
+# 'text'     - first text node directly under the matched elements, stripped
+# 'texts'    - every text node under the matched elements, stripped (empty ones dropped)
+# 'fulltext' - text nodes under the matched elements joined, with nbsp and runs of spaces collapsed
+# '@<attr>'  - attribute of the first matched element, stripped
+KINDS = ('text', 'texts', 'fulltext')
+
+SPACES_RE = re.compile(' +')
+
+
+def clean_fulltext(texts: list) -> str:
+    return SPACES_RE.sub(' ', ''.join(texts).replace('\xa0', ' ')).strip()
+
+
+class Extractor:
+    """
+    Extracts the fields of a page from a declarative spec, parsing the
+    document once: {field: (CSS selector, kind)}, e.g.
+
+        Extractor({'title': ('h1[class*="single__title"]', 'text'),
+                   'tags': ('div.single__tags a', 'texts')}).extract(response)
+
+    (`[class*=...]` matches like XPath's contains(@class, ...)). Missing
+    'text' and attribute fields are None. The backends give the same result.
+    """
+
+    def __init__(self, spec: dict, backend: str = 'lxml') -> None:
+
+        if backend not in BACKENDS:
+            raise ValueError(f'backend must be one of {BACKENDS}, not {backend!r}')
+
+        for field, (_, kind) in spec.items():
+            if kind not in KINDS and not kind.startswith('@'):
+                raise ValueError(f'{field}: unknown kind {kind!r}')
+
+        self.spec = spec
+        self.backend = backend
+
+        if backend == 'selectolax':
+            from selectolax.lexbor import LexborHTMLParser
+            self.parser = LexborHTMLParser
+
+        elif backend == 'lxml':
+            from lxml import etree
+            from parsel.csstranslator import HTMLTranslator
+
+            # The XPath parsel would run, compiled once
+            translator = HTMLTranslator()
+            self.xpaths = {field: etree.XPath(translator.css_to_xpath(css + self._pseudo(kind)), smart_strings=False)
+                           for field, (css, kind) in spec.items()}
+
+    @staticmethod
+    def _pseudo(kind: str) -> str:
+
+        if kind == 'text':
+            return '::text'
+
+        if kind.startswith('@'):
+            return f'::attr({kind[1:]})'
+
+        return ' ::text'
+
+    @staticmethod
+    def _value(values: list, kind: str):
+
+        if kind == 'texts':
+            return [value for value in (value.strip() for value in values) if value]
+
+        if kind == 'fulltext':
+            return clean_fulltext(values)
+
+        return values[0].strip() if values else None
+
+    def extract(self, response) -> dict:
+        """
+        {field: value} of a (text) response.
+        """
+
+        if self.backend == 'parsel':
+            return {field: self._value(response.css(css + self._pseudo(kind)).getall(), kind) for field, (css, kind) in self.spec.items()}
+
+        if self.backend == 'lxml':
+            root = response.selector.root
+            return {field: self._value(self.xpaths[field](root), kind) for field, (_, kind) in self.spec.items()}
+
+        tree = self.parser(response.text)
+        return {field: self._value(self._lexbor_values(tree.css(css), kind), kind) for field, (css, kind) in self.spec.items()}
+
+    @staticmethod
+    def _lexbor_values(nodes: list, kind: str) -> list:
+
+        if kind.startswith('@'):
+            return [node.attributes[kind[1:]] for node in nodes if node.attributes.get(kind[1:]) is not None]
+
+        if kind == 'text':
+            return [child.text_content for node in nodes for child in node.iter(include_text=True) if child.tag == '-text']
+
+        return [child.text_content for node in nodes for child in node.traverse(include_text=True) if child.tag == '-text']
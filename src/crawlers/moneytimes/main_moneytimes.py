@@ -1,29 +1,45 @@
 import os
 import re
-import json
-import time
+import sys
 import scrapy
 from datetime import datetime, timedelta
 from scrapy.crawler import CrawlerProcess
 
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
 
-class MoneyTimesSpider(scrapy.Spider):
+from spider_base import NewsSpider
+
+
+class MoneyTimesSpider(NewsSpider):
 
     name = "moneytimes_spider"
 
-    def start_requests(self):
+    # Money Times tag of the ticker (spider argument)
+    tag = 'petrobras'
+
+    # Set number of pages to download on range(first_page, last_page + 1)
+    first_page = 1
+    last_page = 1999
 
-        # Set number of pages to download on range(1, x)
-        urls = ['https://www.moneytimes.com.br/tag/petrobras/page/%s' % i for i in range(1, 2000)]
+    # Fields of the news pages: (CSS selector, kind) (see extraction.Extractor).
+    # The full text is not exported: add it to results_dict before enabling it
+    article_fields = {
+        'topic': ('div[class*="single__category"] > a', 'text'),
+        'title': ('h1[class*="single__title"]', 'text'),
+        'date': ('div.single-meta > div.single-meta__date', 'text'),
+        # 'text': ('div.single__text p', 'fulltext'),
+        'tags': ('div.single__tags a', 'texts'),
+    }
 
-        for url in urls:
-            time.sleep(3)
-            yield scrapy.Request( 
-                        url=url, 
-                        callback=self.parse_front 
-            )
+    def page_request(self, page: int) -> scrapy.Request:
+        return scrapy.Request( 
+                    url='https://www.moneytimes.com.br/tag/%s/page/%s' % (self.tag, page), 
+                    callback=self.parse_front,
+                    cb_kwargs=dict(page=page)
+        )
 
-    def parse_front(self, response):
+    def parse_front(self, response, page):
 
         # Narrow in on the news cards (10 cards per page)
         news_items = response.css('div.news-item ')
@@ -34,69 +50,38 @@ class MoneyTimesSpider(scrapy.Spider):
         # Extract the links (as a list of strings)
         links_to_follow = news_links.extract()
 
-        # Follow the links to the next parser
-        for url in links_to_follow:
-            time.sleep(1)
-            yield response.follow(
-                            url=url,
-                            callback=self.parse_pages
-                        )
+        # Follow the links to the next parser (and the next page, when incremental)
+        yield from self.follow_articles(response, links_to_follow, page, callback=self.parse_pages)
 
 
     def parse_pages(self, response):
 
-        # Direct to the news main topic
-        news_topic = response.xpath('//div[contains(@class, "single__category")]/a/text()')
-
-        # Extract the news main topic
-        news_topic_ext = news_topic.extract_first().strip()
-
-        # Direct to the news title text
-        news_title = response.xpath('//h1[contains(@class,"single__title")]/text()')
-
-        # Extract and clean the news title text
-        news_title_ext = news_title.extract_first().strip()
-
-        # Direct to the news date
-        news_date = response.css('div.single-meta > div.single-meta__date::text')
-
-        # Extract the news date
-        news_date_ext = news_date.extract_first()
-
-        # Direct to the news full text
-        news_full_text = response.css('div.single__text p ::text')
+        # All the fields of the news page at once (see article_fields)
+        fields = self.extractor.extract(response)
 
-        # Extract the news full text
-        separator = ''
+        # Not a news page (e.g. a removed article)
+        if fields['title'] is None:
+            self.logger.warning(f'No title: {response.url}')
 
-        full_string_text = separator.join(news_full_text.extract())
-
-        # Replacing special character
-        full_string_text = full_string_text.replace(' ', ' ')
-
-        full_string_text = re.sub(' +', ' ', full_string_text)
-
-        news_full_text_ext = full_string_text.strip()
-
-        # Direct to the news tags
-        news_tags = response.css('div.single__tags a ::text')
-
-        # Extract the news tags
-        news_tags_ext = [t.strip() for t in news_tags.extract()]
+            # Marked seen anyway, or incremental runs would count it as new and fetch it every time
+            self.mark_seen(response)
+            return
 
         # Save all the data collected
         results_dict = dict()
 
         today = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        results_dict['topic'] = news_topic_ext
-        results_dict['title'] = news_title_ext
-        results_dict['date'] = news_date_ext
+        results_dict['topic'] = fields['topic']
+        results_dict['title'] = fields['title']
+        results_dict['date'] = fields['date']
         results_dict['search_date'] = today
         results_dict['link'] = response.url
-        results_dict['tags'] = news_tags_ext
+        results_dict['tags'] = fields['tags']
+
+        yield results_dict
 
-        results_list.append(results_dict)
+        self.mark_seen(response, published=fields['date'])
 
 
 if __name__ == '__main__':
@@ -105,18 +90,11 @@ if __name__ == '__main__':
 
     filename = 'moneytimes'
 
-    # List to save the data collected
-    results_list = list()
-
     # Initiate a CrawlerProcess
     process = CrawlerProcess()
 
-    # Tell the process which spider to use
-    process.crawl(MoneyTimesSpider)
+    # Tell the process which spider to use (items are streamed to output_path)
+    process.crawl(MoneyTimesSpider, output_path=os.path.join(THIS_DIR, 'results', f'{filename}-{ticker}.jsonl'))
 
     # Start the crawling process
     process.start()
-
-    # Save the list of dicts
-    with open(f'./results/{filename}-{ticker}.json', 'w', encoding='utf8') as f:
-        json.dump(results_list, f, ensure_ascii=False)
\ No newline at end of file
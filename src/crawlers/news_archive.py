@@ -0,0 +1,302 @@
+"""
+Local archive of the crawled news (SQLite, with an FTS5 full-text index).
+
+The outputs of the news spiders (<site>/results/*.json and *.jsonl) are
+loaded incrementally: the archive remembers, per file, its size and
+modification time and, for JSON Lines files, the offset of the last
+complete line, so a new load only reads what the crawls appended. An
+article is stored once per source and URL, with the tickers found in its
+title and tags by the EntityMatcher (as in batch_ner.py).
+
+Tables:
+- articles: source, url, title, topic, tags (JSON), published, search_date, origin (file);
+- mentions: (article, ticker), indexed by ticker and publish date;
+- articles_fts: FTS5 index of title, tags and topic (accents removed).
+
+Queries (NewsArchive.search) by ticker, date range, keyword and source
+read only the matching index entries instead of scanning the dumps:
+
+    archive = NewsArchive()
+    archive.search(ticker='PETR4', start_dt='2022-01-01', end_dt='2022-03-31', query='dividendos')
+
+Usage (from src/crawlers):
+    python news_archive.py [--sources suno moneytimes infomoney] [--archive news_archive.sqlite]
+"""
+
+import os
+import sys
+import glob
+import json
+import sqlite3
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ARCHIVE_FILE = os.path.join(THIS_DIR, 'news_archive.sqlite')
+
+# Source -> output file patterns, URL field and date format of the items
+SOURCES = {
+    'suno': dict(patterns=['suno/results/*.json', 'suno/results/*.jsonl'], url_field='url', date_format='%d/%m/%Y %H:%M'),
+    'infomoney': dict(patterns=['infomoney/results/*.json', 'infomoney/results/*.jsonl'], url_field='link', date_format='%Y-%m-%d %H:%M:%S'),
+    'moneytimes': dict(patterns=['moneytimes/results/*.json', 'moneytimes/results/*.jsonl'], url_field='link', date_format='%d/%m/%Y - %H:%M'),
+}
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def source_of(path: str) -> str:
+    """
+    Source of an output file (the site directory it is in).
+    """
+
+    return os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(path))))
+
+
+def parse_date(value: str, date_format: str) -> str:
+    try:
+        return datetime.strptime(value.strip(), date_format).strftime(DATE_FORMAT)
+    except (AttributeError, ValueError):
+        return None
+
+
+class NewsArchive:
+    """
+    See the module docstring. `matcher_params` are passed to
+    EntityMatcher.from_file (e.g. tickers), built on the first load.
+    """
+
+    def __init__(self, path: str = ARCHIVE_FILE, **matcher_params) -> None:
+        self.path = path
+        self.matcher_params = matcher_params
+        self.matcher = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT,
+                topic TEXT,
+                tags TEXT,
+                published TEXT,
+                search_date TEXT,
+                origin TEXT,
+                UNIQUE (source, url)
+            );
+            CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+
+            CREATE TABLE IF NOT EXISTS mentions (
+                article_id INTEGER NOT NULL,
+                ticker TEXT NOT NULL,
+                published TEXT,
+                PRIMARY KEY (article_id, ticker)
+            );
+            CREATE INDEX IF NOT EXISTS mentions_ticker ON mentions (ticker, published);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, tags, topic, content='articles', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+
+            CREATE TABLE IF NOT EXISTS loaded_files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime INTEGER NOT NULL,
+                offset INTEGER NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def find_tickers(self, texts: list) -> list:
+        if self.matcher is None:
+            sys.path.insert(0, os.path.join(THIS_DIR, '..', 'named_entity_recognition'))
+            from entity_matcher import EntityMatcher
+
+            self.matcher = EntityMatcher.from_file(**self.matcher_params)
+
+        return self.matcher.find_batch(texts)
+
+    def add(self, items: list, source: str, origin: str = None) -> int:
+        """
+        Stores the new articles of `items` (spider items of `source`) in one
+        transaction. Returns the number of articles added.
+        """
+
+        config = SOURCES[source]
+        rows = list()
+
+        for item in items:
+            url = item.get(config['url_field'])
+
+            if not url:
+                continue
+
+            tags = [tag for tag in (item.get('tags') or list()) if tag]
+
+            rows.append((source, url, item.get('title'), item.get('topic'), json.dumps(tags, ensure_ascii=False),
+                         parse_date(item.get('date'), config['date_format']), item.get('search_date'), origin))
+
+        # Tags like 'Vale (VALE3)' are scanned with the title
+        tickers = self.find_tickers([f"{row[2] or ''} {' '.join(json.loads(row[4]))}" for row in rows])
+        added = 0
+
+        with self.conn:
+            for row, row_tickers in zip(rows, tickers):
+                cursor = self.conn.execute(
+                    'INSERT OR IGNORE INTO articles (source, url, title, topic, tags, published, search_date, origin) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    row
+                )
+
+                if not cursor.rowcount:
+                    continue
+
+                article_id = cursor.lastrowid
+                added += 1
+
+                self.conn.execute('INSERT INTO articles_fts (rowid, title, tags, topic) VALUES (?, ?, ?, ?)',
+                                  (article_id, row[2], ' '.join(json.loads(row[4])), row[3]))
+                self.conn.executemany('INSERT OR IGNORE INTO mentions (article_id, ticker, published) VALUES (?, ?, ?)',
+                                      [(article_id, ticker, row[5]) for ticker in row_tickers])
+
+        return added
+
+    def load_file(self, path: str, source: str = None) -> int:
+        """
+        Loads what is new in a spider output file. Returns the number of articles added.
+        """
+
+        source = source or source_of(path)
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        loaded = self.conn.execute('SELECT size, mtime, offset FROM loaded_files WHERE path = ?', (path,)).fetchone()
+
+        if loaded is not None and loaded[:2] == (stat.st_size, stat.st_mtime_ns):
+            return 0
+
+        offset = 0
+
+        with open(path, 'rb') as f:
+            if path.endswith('.jsonl'):
+                # Appended to since the last load: read from the last complete line (a smaller file was rewritten)
+                if loaded is not None and loaded[2] <= stat.st_size:
+                    offset = loaded[2]
+
+                f.seek(offset)
+                items = list()
+
+                # Output of a crawl that may still be running: stop at an incomplete last line
+                for line in f:
+                    try:
+                        items.append(json.loads(line))
+                    except ValueError:
+                        break
+
+                    offset += len(line)
+            else:
+                items = json.load(f)
+
+        added = self.add(items, source, os.path.splitext(os.path.basename(path))[0])
+
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO loaded_files (path, size, mtime, offset) VALUES (?, ?, ?, ?)',
+                              (path, stat.st_size, stat.st_mtime_ns, offset))
+
+        return added
+
+    def load(self, sources: list = None, crawlers_dir: str = THIS_DIR) -> dict:
+        """
+        Loads the new outputs of every source. Returns {path: articles added}.
+        """
+
+        added = dict()
+
+        for source in (sources or list(SOURCES)):
+            for pattern in SOURCES[source]['patterns']:
+                for path in sorted(glob.glob(os.path.join(crawlers_dir, pattern))):
+                    added[path] = self.load_file(path, source)
+
+        return added
+
+    def search(self, ticker: str = None, start_dt: str = None, end_dt: str = None, query: str = None, sources: list = None,
+               limit: int = None) -> pd.DataFrame:
+        """
+        Articles mentioning `ticker`, published in [start_dt, end_dt] (days,
+        both included), matching the FTS5 `query` (e.g. 'dividendos',
+        'petrobras AND venda', 'tags:vale'), of `sources`. Every argument is
+        optional. Sorted by date, with the tags and tickers as lists.
+        """
+
+        published = 'm.published' if ticker is not None else 'a.published'
+        conditions = list()
+        params = list()
+
+        if ticker is not None:
+            conditions.append('m.ticker = ?')
+            params.append(ticker.upper())
+
+        if start_dt is not None:
+            conditions.append(f'{published} >= ?')
+            params.append(pd.Timestamp(start_dt).strftime(DATE_FORMAT))
+
+        if end_dt is not None:
+            conditions.append(f'{published} < ?')
+            params.append((pd.Timestamp(end_dt) + pd.Timedelta(days=1)).strftime(DATE_FORMAT))
+
+        if query is not None:
+            conditions.append('a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)')
+            params.append(query)
+
+        if sources is not None:
+            conditions.append(f'a.source IN ({", ".join("?" * len(sources))})')
+            params += list(sources)
+
+        sql = f"""
+            SELECT a.published AS date, a.source, a.title, a.topic, a.tags, a.url, a.search_date, a.origin,
+                   (SELECT group_concat(ticker) FROM mentions WHERE article_id = a.id) AS tickers
+            FROM {'mentions m JOIN articles a ON a.id = m.article_id' if ticker is not None else 'articles a'}
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY {published}
+            {f'LIMIT {int(limit)}' if limit is not None else ''}
+        """
+
+        df = pd.read_sql_query(sql, self.conn, params=params)
+
+        df['date'] = pd.to_datetime(df['date'], format=DATE_FORMAT)
+        df['tags'] = df['tags'].map(json.loads)
+        df['tickers'] = df['tickers'].map(lambda tickers: sorted(tickers.split(',')) if tickers else list())
+
+        return df.set_index('date')
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Loads the news spiders outputs into the archive.')
+    parser.add_argument('--sources', nargs='+', choices=list(SOURCES), default=None)
+    parser.add_argument('--archive', default=ARCHIVE_FILE)
+    args = parser.parse_args()
+
+    archive = NewsArchive(args.archive)
+
+    for path, added in archive.load(args.sources).items():
+        print(f'{path}: {added} new articles')
+
+    print(f'{len(archive)} articles in {args.archive}')
+
+    archive.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+
+from scrapy.exceptions import DropItem
+
+# Fields used to identify an item (first one present)
+KEY_FIELDS = ('url', 'link', 'tweet_id')
+
+
+def item_key(item: dict) -> str:
+    for field in KEY_FIELDS:
+        if item.get(field):
+            return str(item[field])
+
+    return None
+
+
+def load_jsonl(path: str, repair: bool = False) -> list:
+    """
+    Items of a JSON Lines file. A crash may leave a truncated last line:
+    it is skipped (and, with `repair`, cut off the file).
+    """
+
+    items = list()
+    valid_size = 0
+
+    if not os.path.exists(path):
+        return items
+
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                break
+
+            valid_size += len(line)
+
+    if repair and valid_size < os.path.getsize(path):
+        with open(path, 'r+b') as f:
+            f.truncate(valid_size)
+
+    return items
+
+
+class StreamingExportPipeline:
+    """
+    Streams the items of a spider to `spider.output_path` (JSON Lines) as
+    they arrive, instead of keeping them in memory until the end of the crawl.
+
+    - Every item is written and flushed at once; the file is fsync'ed every
+      EXPORT_FSYNC_ITEMS items or EXPORT_FSYNC_SECONDS seconds.
+    - Resume: an existing output file is appended to, and the items already
+      in it (by url/link) are dropped.
+    - With EXPORT_PARQUET, the items are also written to `<output>.parquet/`,
+      one part file (row group) per PARQUET_ROW_GROUP_ITEMS items.
+
+    Downstream jobs can read the file while the crawl is running.
+    """
+
+    def __init__(self, fsync_items: int = 50, fsync_seconds: float = 30, parquet: bool = False, row_group_items: int = 1000) -> None:
+        self.fsync_items = fsync_items
+        self.fsync_seconds = fsync_seconds
+        self.parquet = parquet
+        self.row_group_items = row_group_items
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+
+        return cls(fsync_items=settings.getint('EXPORT_FSYNC_ITEMS', 50),
+                   fsync_seconds=settings.getfloat('EXPORT_FSYNC_SECONDS', 30),
+                   parquet=settings.getbool('EXPORT_PARQUET', False),
+                   row_group_items=settings.getint('PARQUET_ROW_GROUP_ITEMS', 1000))
+
+    def open_spider(self, spider):
+        self.path = getattr(spider, 'output_path', None)
+
+        if self.path is None:
+            raise ValueError(f'{spider.name}: no output_path to export the items to')
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # Resume: keys of the items already exported
+        items = load_jsonl(self.path, repair=True)
+
+        self.keys = {item_key(item) for item in items}
+        self.keys.discard(None)
+
+        if self.keys:
+            spider.logger.info(f'Resuming {self.path}: {len(self.keys)} items already exported')
+
+        self.file = open(self.path, 'a', encoding='utf8')
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+        if self.parquet:
+            self.parquet_dir = os.path.splitext(self.path)[0] + '.parquet'
+            os.makedirs(self.parquet_dir, exist_ok=True)
+
+            import pyarrow.parquet as pq
+
+            parts = sorted(name for name in os.listdir(self.parquet_dir) if name.endswith('.parquet'))
+            exported = sum(pq.read_metadata(os.path.join(self.parquet_dir, name)).num_rows for name in parts)
+
+            # Items of the JSON Lines file not yet in a row group (same order in both)
+            self.row_group = items[exported:]
+            self.parts = len(parts)
+
+    def process_item(self, item, spider):
+        item = dict(item)
+        key = item_key(item)
+
+        if key is not None:
+            if key in self.keys:
+                raise DropItem(f'Already exported: {key}')
+
+            self.keys.add(key)
+
+        self.file.write(json.dumps(item, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+        self.pending += 1
+
+        if self.pending >= self.fsync_items or time.monotonic() - self.last_sync >= self.fsync_seconds:
+            self.sync()
+
+        if self.parquet:
+            self.row_group.append(item)
+
+            if len(self.row_group) >= self.row_group_items:
+                self.write_row_group()
+
+        return item
+
+    def sync(self) -> None:
+        os.fsync(self.file.fileno())
+
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def write_row_group(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self.row_group:
+            return
+
+        # Written to a temporary name first: a crash never leaves a partial part file
+        path = os.path.join(self.parquet_dir, f'part-{self.parts:05d}.parquet')
+        pq.write_table(pa.Table.from_pylist(self.row_group), path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+        self.parts += 1
+        self.row_group = list()
+
+    def close_spider(self, spider):
+
+        if self.parquet:
+            self.write_row_group()
+
+        self.sync()
+        self.file.close()
@@ -0,0 +1,134 @@
+"""
+Response cache of the news spiders, on Scrapy's HttpCacheMiddleware.
+
+The spider's `cache_mode` picks the HTTPCACHE_* settings of its crawl (see
+cache_settings):
+
+- 'off': no cache.
+- 'record': every request is downloaded and its response (if not an error)
+  stored, replacing the previous version of the page.
+- 'replay': requests are answered from the cache, without touching the
+  network (nor the download delays); requests not cached are dropped
+  (HTTPCACHE_IGNORE_MISSING).
+
+So a parser can be changed and rerun against the stored pages at local disk
+speed, e.g. process.crawl(SunoSpider, cache_mode='replay', output_path=...).
+
+Pages are stored by NewsCacheStorage: Scrapy's filesystem storage (gzipped)
+that also records the spider callback each response was routed to, so the
+stored pages can be fed straight to the parsers (see stored_responses).
+"""
+
+import os
+import gzip
+import pickle
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+from scrapy.extensions.httpcache import FilesystemCacheStorage
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.settings import Settings
+from scrapy.utils.request import fingerprint
+from w3lib.http import headers_raw_to_dict
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RESPONSE_CACHE_DIR = os.path.join(THIS_DIR, 'httpcache')
+
+CACHE_MODES = ('off', 'record', 'replay')
+
+
+def cache_settings(mode: str, cache_dir: str = RESPONSE_CACHE_DIR) -> dict:
+    """
+    HTTPCACHE_* settings of a crawl with cache `mode` (see CACHE_MODES).
+    """
+
+    if mode not in CACHE_MODES:
+        raise ValueError(f'cache_mode must be one of {CACHE_MODES}, not {mode!r}')
+
+    return dict(
+        HTTPCACHE_ENABLED=mode != 'off',
+        HTTPCACHE_DIR=cache_dir,
+        HTTPCACHE_IGNORE_MISSING=mode == 'replay',
+
+        # A record run downloads again the pages stored by earlier runs
+        # (the cache would otherwise serve stale listing pages); a replay never expires them
+        HTTPCACHE_EXPIRATION_SECS=1 if mode == 'record' else 0,
+    )
+
+
+class NewsCacheStorage(FilesystemCacheStorage):
+    """
+    FilesystemCacheStorage that also stores the name and cb_kwargs of the
+    callback of every request, which the built-in storages drop.
+
+    Requests are always keyed by the fingerprints of
+    REQUEST_FINGERPRINTER_IMPLEMENTATION '2.7' (not the crawler's), so the
+    cache can also be written and read outside a crawl (see open_storage).
+    """
+
+    def __init__(self, settings) -> None:
+        super().__init__(settings)
+        self._fingerprinter = SimpleNamespace(fingerprint=fingerprint)
+
+    def open_spider(self, spider) -> None:
+        fingerprinter = self._fingerprinter
+        super().open_spider(spider)
+        self._fingerprinter = fingerprinter
+
+    def store_response(self, spider, request, response) -> None:
+        super().store_response(spider, request, response)
+
+        rpath = Path(self._get_request_path(spider, request))
+
+        with self._open(rpath / 'pickled_meta', 'rb') as f:
+            metadata = pickle.load(f)
+
+        metadata.update(callback=getattr(request.callback, '__name__', None), cb_kwargs=request.cb_kwargs)
+
+        with self._open(rpath / 'pickled_meta', 'wb') as f:
+            pickle.dump(metadata, f, protocol=4)
+
+
+def open_storage(cache_dir: str = RESPONSE_CACHE_DIR, clear: bool = False) -> NewsCacheStorage:
+    """
+    NewsCacheStorage of `cache_dir` outside a crawl (e.g. to store fixture
+    pages). With `clear`, the stored pages are removed first.
+    """
+
+    if clear and os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+
+    # Gzipped, as in NEWS_SPIDER_SETTINGS
+    return NewsCacheStorage(Settings(dict(cache_settings('record', cache_dir), HTTPCACHE_GZIP=True)))
+
+
+def stored_responses(spider: str, cache_dir: str = RESPONSE_CACHE_DIR, callback: str = None):
+    """
+    Yields (response, callback name, cb_kwargs) of the pages stored by
+    `spider`, in the order they were stored.
+    """
+
+    pages = list()
+
+    for meta_path in Path(cache_dir, spider).glob('*/*/pickled_meta'):
+        with gzip.open(meta_path, 'rb') as f:
+            metadata = pickle.load(f)
+
+        if callback is None or metadata.get('callback') == callback:
+            pages.append((metadata['timestamp'], str(meta_path.parent), metadata))
+
+    for _, rpath, metadata in sorted(pages, key=lambda page: page[:2]):
+        with gzip.open(os.path.join(rpath, 'response_headers'), 'rb') as f:
+            headers = Headers(headers_raw_to_dict(f.read()))
+
+        with gzip.open(os.path.join(rpath, 'response_body'), 'rb') as f:
+            body = f.read()
+
+        url = metadata['response_url']
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+
+        yield respcls(url=url, status=metadata['status'], headers=headers, body=body), metadata.get('callback'), metadata.get('cb_kwargs') or dict()
+
@@ -0,0 +1,241 @@
+"""
+Crawls several tickers on several news sites at once, in a single CrawlerProcess.
+
+Each (site, ticker) is one crawl. The crawls of different sites run
+concurrently; on one site, at most CONCURRENT_REQUESTS_PER_DOMAIN crawls run
+at a time and the others wait in turn. The running crawls of a site split
+its politeness budget (POLITE_SETTINGS): with n of them, each one gets 1/n
+of the per-domain concurrency and of the AutoThrottle target concurrency,
+and n times the download delay. The site sees the same request rate as a
+single crawl, and the total time is bound by the slowest site. Items are
+written to one output file per site and ticker: <site>/results/<site>-<ticker>.jsonl.
+
+The ticker -> tag mapping of each site comes from KNOWN_TAGS. Other tickers
+get a tag derived from results-b3.json, and --tags-file (JSON
+{site: {ticker: tag}}) overrides both. With --archive, the outputs are
+loaded into the news archive (news_archive.py) once the crawls end.
+
+Usage (from src/crawlers):
+    python run_crawl.py --tickers PETR4 VALE3 [--sites suno moneytimes infomoney] [--incremental]
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import unicodedata
+
+from scrapy.crawler import CrawlerProcess
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+for site_dir in ['suno', 'moneytimes', 'infomoney']:
+    sys.path.insert(0, os.path.join(THIS_DIR, site_dir))
+
+from main_suno import SunoSpider
+from main_moneytimes import MoneyTimesSpider
+from main_infomoney import InfoMoneySpider
+from response_cache import CACHE_MODES
+
+B3_FILE = os.path.join(THIS_DIR, 'b3', 'results-b3.json')
+
+TICKERS = ['B3SA3', 'EQTL3', 'ITUB4', 'PETR4', 'VALE3']
+
+# Site -> spider and whether it is crawled per ticker (InfoMoney crawls the whole feed)
+SITES = {
+    'suno': (SunoSpider, True),
+    'moneytimes': (MoneyTimesSpider, True),
+    'infomoney': (InfoMoneySpider, False),
+}
+
+# Tags checked on the sites
+KNOWN_TAGS = {
+    'suno': {
+        'B3SA3': 'b3-b3sa3',
+        'EQTL3': 'equatorial-eqtl3',
+        'ITUB4': 'itau-unibanco-itub3-itub4',
+        'PETR4': 'petrobras-petr4',
+        'VALE3': 'vale-vale3',
+    },
+    'moneytimes': {
+        'PETR4': 'petrobras',
+    },
+}
+
+
+def slugify(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-')
+
+
+def derived_tags(company: dict) -> dict:
+    """
+    Tags of a company following the pattern of each site (e.g. Suno:
+    'vale-vale3', Money Times: 'vale').
+    """
+
+    # Without the legal suffix ('AMBEV S/A' -> 'ambev')
+    name = re.sub(r'-(s-a|sa)$', '', slugify(company['nome_pregao']))
+
+    return {
+        'suno': '-'.join([name] + [ticker.lower() for ticker in company['tickers']]),
+        'moneytimes': name,
+    }
+
+
+def ticker_tags(tickers: list, b3_file: str = B3_FILE, tags_file: str = None) -> dict:
+    """
+    {site: {ticker: tag}} of the per-ticker sites.
+    """
+
+    with open(b3_file, encoding='utf8') as json_file:
+        companies = json.load(json_file)
+
+    overrides = dict()
+
+    if tags_file is not None:
+        with open(tags_file, encoding='utf8') as json_file:
+            overrides = json.load(json_file)
+
+    tags = {site: dict() for site, (_, per_ticker) in SITES.items() if per_ticker}
+
+    for ticker in tickers:
+        company = next((company for company in companies if ticker in company['tickers']), None)
+
+        for site in tags:
+            tag = overrides.get(site, dict()).get(ticker) or KNOWN_TAGS.get(site, dict()).get(ticker)
+
+            if tag is None and company is not None:
+                tag = derived_tags(company)[site]
+
+            if tag is None:
+                print(f'No {site} tag for {ticker}: skipped')
+                continue
+
+            tags[site][ticker] = tag
+
+    return tags
+
+
+def site_slots(spider_cls) -> int:
+    """
+    Most crawls of a site that may run at once: one request slot each.
+    """
+
+    return spider_cls.custom_settings['CONCURRENT_REQUESTS_PER_DOMAIN']
+
+
+def share_site(spider_cls, n_crawls: int):
+    """
+    Spider class whose crawls use 1/n_crawls of the site's politeness budget
+    (n_crawls running at once, at most site_slots).
+    """
+
+    if n_crawls > site_slots(spider_cls):
+        raise ValueError(f'{spider_cls.name}: {n_crawls} concurrent crawls, at most {site_slots(spider_cls)}')
+
+    settings = dict(spider_cls.custom_settings)
+    settings['CONCURRENT_REQUESTS_PER_DOMAIN'] = settings['CONCURRENT_REQUESTS_PER_DOMAIN'] // n_crawls
+    settings['AUTOTHROTTLE_TARGET_CONCURRENCY'] = settings['AUTOTHROTTLE_TARGET_CONCURRENCY'] / n_crawls
+    settings['DOWNLOAD_DELAY'] = settings['DOWNLOAD_DELAY'] * n_crawls
+    settings['AUTOTHROTTLE_START_DELAY'] = settings['AUTOTHROTTLE_START_DELAY'] * n_crawls
+
+    return type(spider_cls.__name__, (spider_cls,), dict(custom_settings=settings))
+
+
+def crawl_in_turn(process: CrawlerProcess, spider_cls, crawls: list) -> None:
+    """
+    Runs the crawls (kwargs of `spider_cls`) one after the other in `process`.
+    """
+
+    if not crawls:
+        return
+
+    deferred = process.crawl(spider_cls, **crawls[0])
+    deferred.addBoth(lambda _: crawl_in_turn(process, spider_cls, crawls[1:]))
+
+
+def schedule(process: CrawlerProcess, tickers: list, sites: list, tags_file: str = None, **spider_kwargs) -> list:
+    """
+    Adds one crawl per (site, ticker) to `process`. Returns the output paths.
+    """
+
+    tags = ticker_tags(tickers, tags_file=tags_file)
+    outputs = list()
+
+    for site in sites:
+        spider_cls, per_ticker = SITES[site]
+        results_dir = os.path.join(THIS_DIR, site, 'results')
+
+        if not per_ticker:
+            output_path = os.path.join(results_dir, f'{site}-results.jsonl')
+            process.crawl(spider_cls, output_path=output_path, **spider_kwargs)
+            outputs.append(output_path)
+            continue
+
+        site_tags = tags[site]
+
+        if not site_tags:
+            continue
+
+        crawls = list()
+
+        for ticker, tag in site_tags.items():
+            output_path = os.path.join(results_dir, f'{site}-{ticker.lower()}.jsonl')
+            crawls.append(dict(tag=tag, output_path=output_path, **spider_kwargs))
+            outputs.append(output_path)
+
+        # At most site_slots crawls at once: the others are queued behind them
+        n_running = min(len(crawls), site_slots(spider_cls))
+        spider_cls = share_site(spider_cls, n_running)
+
+        for i in range(n_running):
+            crawl_in_turn(process, spider_cls, crawls[i::n_running])
+
+    return outputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Multi-ticker, multi-site news crawl.')
+    parser.add_argument('--tickers', nargs='+', default=TICKERS)
+    parser.add_argument('--sites', nargs='+', choices=list(SITES), default=list(SITES))
+    parser.add_argument('--tags-file', default=None, help='JSON {site: {ticker: tag}} overriding the tags')
+    parser.add_argument('--incremental', action='store_true')
+    parser.add_argument('--last-page', type=int, default=None, help='last listing page of every crawl')
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default='off', help='record the responses or replay them offline')
+    parser.add_argument('--archive', action='store_true', help='load the outputs into the news archive after the crawl')
+    args = parser.parse_args()
+
+    spider_kwargs = dict(incremental=args.incremental, cache_mode=args.cache_mode)
+
+    if args.last_page is not None:
+        spider_kwargs['last_page'] = args.last_page
+
+    # Initiate a CrawlerProcess
+    process = CrawlerProcess()
+
+    outputs = schedule(process, [ticker.upper() for ticker in args.tickers], args.sites, args.tags_file, **spider_kwargs)
+
+    for output_path in outputs:
+        print(output_path)
+
+    # Start the crawling process
+    process.start()
+
+    if args.archive:
+        from news_archive import NewsArchive
+
+        archive = NewsArchive()
+
+        for output_path in outputs:
+            if os.path.exists(output_path):
+                print(f'{output_path}: {archive.load_file(output_path)} new articles archived')
+
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
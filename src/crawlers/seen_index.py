@@ -0,0 +1,69 @@
+import os
+import sqlite3
+from datetime import datetime
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SEEN_INDEX_FILE = os.path.join(THIS_DIR, 'seen_urls.sqlite')
+
+# SQLite limit of variables per statement is 999 on older builds
+BATCH_SIZE = 900
+
+
+class SeenIndex:
+    """
+    Persistent (SQLite) index of the article URLs already crawled, with
+    their publish dates, shared by all the news spiders. URLs are indexed per
+    `site` (a spider, or a spider and tag), so an article crawled for one
+    ticker is still new for another.
+    """
+
+    def __init__(self, path: str = SEEN_INDEX_FILE) -> None:
+        self.path = path
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_urls (
+                url TEXT NOT NULL,
+                site TEXT NOT NULL,
+                published TEXT,
+                crawled_at TEXT NOT NULL,
+                PRIMARY KEY (url, site)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM seen_urls').fetchone()[0]
+
+    def seen(self, urls: list, site: str) -> set:
+        """
+        The subset of `urls` already indexed for `site`.
+        """
+
+        found = set()
+
+        for i in range(0, len(urls), BATCH_SIZE):
+            batch = urls[i:i + BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+
+            rows = self.conn.execute(f'SELECT url FROM seen_urls WHERE site = ? AND url IN ({placeholders})', [site] + batch)
+            found.update(row[0] for row in rows)
+
+        return found
+
+    def add(self, urls: list, site: str, published: str = None) -> None:
+        crawled_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO seen_urls (url, site, published, crawled_at) VALUES (?, ?, ?, ?)',
+            [(url, site, published, crawled_at) for url in urls]
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,215 @@
+import scrapy
+
+from seen_index import SEEN_INDEX_FILE, SeenIndex
+from response_cache import RESPONSE_CACHE_DIR, cache_settings
+from extraction import Extractor
+
+# Politeness toward each site, without blocking the reactor: Scrapy waits
+# DOWNLOAD_DELAY (randomized 0.5x-1.5x) between requests to the same
+# site, while the network waits of different requests overlap.
+POLITE_SETTINGS = {
+    'DOWNLOAD_DELAY': 1,
+    'RANDOMIZE_DOWNLOAD_DELAY': True,
+    'CONCURRENT_REQUESTS': 16,
+    'CONCURRENT_REQUESTS_PER_DOMAIN': 4,
+
+    # AutoThrottle: start slow and adapt the delay to the latency of each site
+    'AUTOTHROTTLE_ENABLED': True,
+    'AUTOTHROTTLE_START_DELAY': 3,
+    'AUTOTHROTTLE_MAX_DELAY': 60,
+    'AUTOTHROTTLE_TARGET_CONCURRENCY': 2.0,
+
+    # Retry with backoff (see BackoffMiddleware)
+    'RETRY_ENABLED': True,
+    'RETRY_TIMES': 5,
+    'RETRY_HTTP_CODES': [408, 429, 500, 502, 503, 504, 522, 524],
+    'BACKOFF_HTTP_CODES': [429, 503],
+
+    'DOWNLOADER_MIDDLEWARES': {
+        'spider_base.BackoffMiddleware': 560,
+    },
+}
+
+
+# Settings of the news spiders: politeness, response cache (Scrapy's
+# HttpCacheMiddleware, enabled by the spider's `cache_mode`, see
+# response_cache) and streaming export of the items (see
+# pipelines.StreamingExportPipeline) to the spider's `output_path`
+NEWS_SPIDER_SETTINGS = dict(
+    POLITE_SETTINGS,
+    HTTPCACHE_ENABLED=False,
+    HTTPCACHE_DIR=RESPONSE_CACHE_DIR,
+    HTTPCACHE_GZIP=True,
+    HTTPCACHE_IGNORE_MISSING=False,
+    HTTPCACHE_STORAGE='response_cache.NewsCacheStorage',
+    # Error pages are not stored: they are retried live
+    HTTPCACHE_IGNORE_HTTP_CODES=list(range(400, 600)),
+    REQUEST_FINGERPRINTER_IMPLEMENTATION='2.7',
+    ITEM_PIPELINES={
+        'pipelines.StreamingExportPipeline': 300,
+    },
+    EXPORT_FSYNC_ITEMS=50,
+    EXPORT_FSYNC_SECONDS=30,
+    EXPORT_PARQUET=False,
+    PARQUET_ROW_GROUP_ITEMS=1000,
+)
+
+
+class BackoffMiddleware:
+    """
+    Slows down a site that answers "too many requests" (429/503): the delay
+    of its download slot is doubled (or set to the Retry-After header), up
+    to AUTOTHROTTLE_MAX_DELAY. The RetryMiddleware then reschedules the request,
+    and AutoThrottle brings the delay down again once the site recovers.
+    """
+
+    def __init__(self, crawler) -> None:
+        self.crawler = crawler
+        self.max_delay = crawler.settings.getfloat('AUTOTHROTTLE_MAX_DELAY', 60.0)
+        self.backoff_codes = {int(code) for code in crawler.settings.getlist('BACKOFF_HTTP_CODES', [429, 503])}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_response(self, request, response, spider):
+
+        if response.status in self.backoff_codes:
+            slot = self.crawler.engine.downloader.slots.get(request.meta.get('download_slot'))
+
+            if slot is not None:
+                retry_after = response.headers.get('Retry-After', b'').decode('latin1').strip()
+
+                if retry_after.isdigit():
+                    delay = float(retry_after)
+                else:
+                    delay = max(slot.delay * 2, 1.0)
+
+                slot.delay = min(max(delay, slot.delay), self.max_delay)
+
+                spider.logger.info(f'Backing off {request.meta.get("download_slot")}: delay {slot.delay:.1f}s (HTTP {response.status})')
+
+        return response
+
+
+class NewsSpider(scrapy.Spider):
+    """
+    Base of the news spiders: polite crawling settings shared by all sites,
+    streaming export of the items to `output_path` and incremental crawling.
+
+    Subclasses define `page_request(page)` (request of a listing page) and
+    `article_fields` (extraction spec of the news pages, see
+    extraction.Extractor, run by `self.extractor` with `parser_backend`),
+    call `follow_articles` from the listing parser and, in the article
+    parser, `mark_seen` after yielding the item. Every crawled article is stored in
+    the SeenIndex. With `incremental`, known articles are skipped and listing
+    pages are walked one at a time, stopping after `stop_after_seen_pages`
+    pages in a row with no new articles. Otherwise all pages in
+    [first_page, last_page] are crawled.
+
+    With `cache_mode` 'record', the responses are stored in Scrapy's HTTP
+    cache at `cache_dir`; with 'replay', the crawl runs offline from that
+    cache (and leaves the SeenIndex alone). See response_cache.
+
+    Spider arguments (e.g. process.crawl(Spider, incremental=True) or -a incremental=1):
+    output_path, first_page, last_page, incremental, stop_after_seen_pages,
+    seen_index_path, cache_mode, cache_dir, parser_backend.
+    """
+
+    custom_settings = NEWS_SPIDER_SETTINGS
+
+    # Listing pages crawled (range(first_page, last_page + 1))
+    first_page = 1
+    last_page = 1
+
+    # {field: (CSS selector, kind)} of the news pages
+    article_fields = dict()
+
+    def __init__(self, incremental=False, stop_after_seen_pages=3, seen_index_path=SEEN_INDEX_FILE,
+                 cache_mode='off', cache_dir=RESPONSE_CACHE_DIR, parser_backend='lxml', *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Spider arguments given as strings (-a last_page=10)
+        self.first_page = int(self.first_page)
+        self.last_page = int(self.last_page)
+
+        self.incremental = str(incremental).lower() in ('1', 'true', 'yes')
+        self.stop_after_seen_pages = int(stop_after_seen_pages)
+
+        self.cache_mode = cache_mode
+        self.cache_dir = cache_dir
+
+        # A replay must not mark the stored pages as crawled
+        if cache_mode == 'replay':
+            seen_index_path = None
+
+        self.seen_index = SeenIndex(seen_index_path) if seen_index_path else None
+        self.extractor = Extractor(self.article_fields, backend=parser_backend)
+
+        # Listing pages in a row without new articles
+        self.seen_pages = 0
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+
+        # HTTPCACHE_* settings of the crawl (Scrapy applies them once the spider is created)
+        crawler.settings.setdict(cache_settings(spider.cache_mode, spider.cache_dir), priority='spider')
+
+        return spider
+
+    @property
+    def seen_scope(self) -> str:
+        """
+        Scope of the seen URLs: the spider and, for tag crawls, the tag.
+        """
+
+        tag = getattr(self, 'tag', None)
+
+        return f'{self.name}/{tag}' if tag else self.name
+
+    def page_request(self, page: int) -> scrapy.Request:
+        raise NotImplementedError
+
+    def start_requests(self):
+
+        if self.incremental:
+            yield self.page_request(self.first_page)
+        else:
+            for page in range(self.first_page, self.last_page + 1):
+                yield self.page_request(page)
+
+    def follow_articles(self, response, links: list, page: int, callback):
+        """
+        Follows the article `links` of a listing page (skipping the known
+        ones in incremental mode) and, in incremental mode, the next page.
+        """
+
+        urls = [response.urljoin(link) for link in links]
+
+        if self.incremental and self.seen_index is not None:
+            seen = self.seen_index.seen(urls, site=self.seen_scope)
+            urls = [url for url in urls if url not in seen]
+
+            self.seen_pages = 0 if urls else self.seen_pages + 1
+
+            if self.seen_pages >= self.stop_after_seen_pages:
+                self.logger.info(f'Stopping at page {page}: {self.seen_pages} pages in a row without new articles')
+            elif page < self.last_page:
+                yield self.page_request(page + 1)
+
+        for url in urls:
+            yield response.follow(url=url, callback=callback)
+
+    def mark_seen(self, response, published: str = None) -> None:
+        """
+        Adds a crawled article (and the URLs it was redirected from) to the index.
+        """
+
+        if self.seen_index is not None:
+            self.seen_index.add(response.meta.get('redirect_urls', []) + [response.url], site=self.seen_scope, published=published)
+
+    def closed(self, reason) -> None:
+
+        if self.seen_index is not None:
+            self.seen_index.close()
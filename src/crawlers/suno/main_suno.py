@@ -1,13 +1,17 @@
 import os
 import re
-import json
-import time
+import sys
 import scrapy
 from datetime import datetime, timedelta
 from scrapy.crawler import CrawlerProcess
 
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
 
-class SunoSpider(scrapy.Spider):
+from spider_base import NewsSpider
+
+
+class SunoSpider(NewsSpider):
     """
     Search for:
     [1]. B3SA3 -> b3-b3sa3
@@ -19,19 +23,30 @@ class SunoSpider(scrapy.Spider):
 
     name = "suno_spider"
 
-    def start_requests(self):
+    # Suno Research tag of the ticker (spider argument)
+    tag = 'itau-unibanco-itub3-itub4'
+
+    # Set number of pages to download on range(first_page, last_page + 1)
+    first_page = 1
+    last_page = 24
 
-        # Set number of pages to download on range(1, x)
-        urls = ['https://www.sunoresearch.com.br/noticias/tags/itau-unibanco-itub3-itub4/page/%s' % i for i in range (1, 25)]
+    # Fields of the news pages: (CSS selector, kind) (see extraction.Extractor)
+    article_fields = {
+        'topic': ('span[class*="newsContent__article__categoryName"] > a', 'text'),
+        'title': ('h1[class*="newsContent__article__title"]', 'text'),
+        'date': ('div[class*="authorBox__name"] > time', 'text'),
+        # 'text': ('article.newsContent__article p', 'fulltext'),
+        'tags': ('ul.tags__list li', 'texts'),
+    }
 
-        for url in urls:
-            time.sleep(5)
-            yield scrapy.Request( 
-                url=url, 
-                callback=self.parse_front 
-            )
+    def page_request(self, page: int) -> scrapy.Request:
+        return scrapy.Request( 
+            url='https://www.sunoresearch.com.br/noticias/tags/%s/page/%s' % (self.tag, page), 
+            callback=self.parse_front,
+            cb_kwargs=dict(page=page)
+        )
 
-    def parse_front(self, response):
+    def parse_front(self, response, page):
 
         # Narrow in on the news cards (10 cards per page)
         news_cards = response.css('div.cardsPage__listCard__boxs > div.cardsPage__listCard__boxs__content')
@@ -42,90 +57,50 @@ class SunoSpider(scrapy.Spider):
         # Extract the links (as a list of strings)
         links_to_follow = news_links.extract()
 
-        # Follow the links to the next parser
-        for url in links_to_follow:
-            time.sleep(1)
-            yield response.follow( 
-                url=url, 
-                callback=self.parse_pages 
-            )
+        # Follow the links to the next parser (and the next page, when incremental)
+        yield from self.follow_articles(response, links_to_follow, page, callback=self.parse_pages)
 
 
     def parse_pages(self, response):
 
-        # Direct to the news main topic
-        news_topic = response.xpath('//span[contains(@class, "newsContent__article__categoryName")]/a/text()')
-
-        # Extract the news main topic
-        news_topic_ext = news_topic.extract_first().strip()
-
-        # Direct to the news title text
-        news_title = response.xpath('//h1[contains(@class,"newsContent__article__title")]/text()')
-
-        # Extract and clean the news title text
-        news_title_ext = news_title.extract_first().strip()
-
-        # Direct to the news date
-        news_date = response.xpath('//div[contains(@class, "authorBox__name")]/time/text()')
-
-        # Extract the news date
-        news_date_ext = news_date.extract_first().strip()
-
-        # Direct to the news full text
-        #news_full_text = response.css('article.newsContent__article p ::text')
+        # All the fields of the news page at once (see article_fields)
+        fields = self.extractor.extract(response)
 
-        # Extract the news full text
-        # separator = ''
+        # Not a news page (e.g. a removed article)
+        if fields['title'] is None:
+            self.logger.warning(f'No title: {response.url}')
 
-        # full_string_text = separator.join(news_full_text.extract())
-
-        # # Replacing special character
-        # full_string_text = full_string_text.replace(' ', ' ')
-
-        # full_string_text = re.sub(' +', ' ', full_string_text)
-
-        # news_full_text_ext = full_string_text.strip()
-
-        # Direct to the news tags
-        news_tags = response.css('ul.tags__list li ::text')
-
-        # Extract the news tags
-        news_tags_ext = [t.strip() for t in news_tags.extract()]
+            # Marked seen anyway, or incremental runs would count it as new and fetch it every time
+            self.mark_seen(response)
+            return
 
         # Save all the data collected
         results_dict = dict()
 
         today = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        results_dict['topic'] = news_topic_ext
-        results_dict['title'] = news_title_ext
-        results_dict['date'] = news_date_ext
+        results_dict['topic'] = fields['topic']
+        results_dict['title'] = fields['title']
+        results_dict['date'] = fields['date']
         results_dict['search_date'] = today
         results_dict['url'] = response.url
-        results_dict['tags'] = news_tags_ext
+        results_dict['tags'] = fields['tags']
 
-        results_list.append(results_dict)
+        yield results_dict
 
+        self.mark_seen(response, published=fields['date'])
 
-if __name__ == '__main__':
 
-    THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+if __name__ == '__main__':
 
     ticker = 'itub4'
     filename = f'suno-{ticker}'
 
-    # List to save the data collected
-    results_list = list()
-
     # Initiate a CrawlerProcess
     process = CrawlerProcess()
 
-    # Tell the process which spider to use
-    process.crawl(SunoSpider)
+    # Tell the process which spider to use (items are streamed to output_path)
+    process.crawl(SunoSpider, output_path=os.path.join(THIS_DIR, 'results', f'{filename}.jsonl'))
 
     # Start the crawling process
     process.start()
-
-    # Save the list of dicts
-    with open(os.path.join(THIS_DIR + f'/results/{filename}.json'), 'w', encoding='utf8') as f:
-        json.dump(results_list, f, ensure_ascii=False)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Local fake of the tweepy.API calls used by the Twitter collector.
+
+Every account has a timeline of tweets with ids growing with time (newest
+first, as the real API). Unknown accounts raise NotFound, protected ones
+raise Unauthorized on user_timeline, and with a `rate_limit` (calls,
+period) the calls above the window raise RateLimitError.
+"""
+
+import time
+import threading
+from datetime import datetime, timedelta
+
+import requests
+import tweepy
+
+# tweepy 4 names of the errors (RateLimitError in tweepy 3)
+RateLimitError = tweepy.errors.TooManyRequests
+NotFound = tweepy.errors.NotFound
+Unauthorized = tweepy.errors.Unauthorized
+
+
+def http_error(error_cls, status_code: int, reason: str):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response._content = b'{}'
+
+    return error_cls(response)
+
+
+class Status:
+
+    def __init__(self, json: dict) -> None:
+        self._json = json
+
+
+class API:
+
+    def __init__(self, accounts: dict, protected: tuple = (), rate_limit: tuple = None, fail_after: int = None) -> None:
+        """
+        `accounts` is {screen_name: number of tweets}. With `fail_after`,
+        every user_timeline call after that many raises RuntimeError (a crash).
+        """
+
+        self.users = {screen_name: 100 + i for i, screen_name in enumerate(list(accounts) + list(protected))}
+        self.protected = set(protected)
+        self.timelines = {user_id: list() for user_id in self.users.values()}
+        self.rate_limit = rate_limit
+        self.fail_after = fail_after
+
+        self.next_id = 1000
+        self.calls = list()
+        self.lock = threading.Lock()
+
+        for screen_name, n in accounts.items():
+            self.post(screen_name, n)
+
+    def post(self, screen_name: str, n: int = 1) -> list:
+        """
+        Publishes `n` new tweets of an account. Returns their ids.
+        """
+
+        ids = list()
+
+        with self.lock:
+            for _ in range(n):
+                self.next_id += 1
+                created_at = datetime(2022, 1, 1) + timedelta(minutes=self.next_id)
+
+                self.timelines[self.users[screen_name]].append(dict(
+                    id=self.next_id, created_at=created_at.strftime('%a %b %d %H:%M:%S +0000 %Y'),
+                    full_text=f'Tweet {self.next_id} sobre a Petrobras (PETR4)', retweet_count=1, favorite_count=2,
+                    user=dict(id=self.users[screen_name], screen_name=screen_name),
+                ))
+                ids.append(self.next_id)
+
+        return ids
+
+    def count_call(self, method: str, params: dict) -> None:
+        with self.lock:
+            now = time.monotonic()
+
+            if self.rate_limit is not None:
+                calls, period = self.rate_limit
+
+                if len([t for _, _, t in self.calls if now - t < period]) >= calls:
+                    raise http_error(RateLimitError, 429, 'Too Many Requests')
+
+            self.calls.append((method, params, now))
+
+            timeline_calls = len([call for call in self.calls if call[0] == 'user_timeline'])
+
+        if self.fail_after is not None and timeline_calls > self.fail_after:
+            raise RuntimeError('crash')
+
+    def get_user(self, screen_name: str) -> Status:
+        self.count_call('get_user', dict(screen_name=screen_name))
+
+        if screen_name not in self.users:
+            raise http_error(NotFound, 404, 'Not Found')
+
+        return Status(dict(id=self.users[screen_name], screen_name=screen_name))
+
+    def user_timeline(self, user_id, count: int = 20, since_id=None, max_id=None, **params) -> list:
+        self.count_call('user_timeline', dict(params, user_id=user_id, count=count, since_id=since_id, max_id=max_id))
+
+        user_id = int(user_id)
+
+        if user_id in {self.users[screen_name] for screen_name in self.protected}:
+            raise http_error(Unauthorized, 401, 'Unauthorized')
+
+        with self.lock:
+            tweets = [tweet for tweet in self.timelines[user_id]
+                      if (since_id is None or tweet['id'] > int(since_id)) and (max_id is None or tweet['id'] <= int(max_id))]
+
+        tweets.sort(key=lambda tweet: tweet['id'], reverse=True)
+
+        return [Status(tweet) for tweet in tweets[:count]]
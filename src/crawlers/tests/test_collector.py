@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import time
+
+import pytest
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(THIS_DIR, '..', 'twitter'))
+
+from fake_tweepy import API
+from collector import PAGE_SIZE, RateLimiter, TimelineCollector
+
+
+def exported_ids(output_dir: str, screen_name: str) -> list:
+    with open(os.path.join(output_dir, f'{screen_name}.jsonl'), encoding='utf8') as f:
+        return [json.loads(line)['tweet_id'] for line in f]
+
+
+def timeline_calls(api: API) -> list:
+    return [params for method, params, _ in api.calls if method == 'user_timeline']
+
+
+def test_incremental_run_fetches_only_newer_tweets(tmp_path):
+    api = API({'itau': 450})
+    collector = TimelineCollector(api, output_dir=str(tmp_path))
+
+    assert collector.run(['itau']) == {'itau': 450}
+
+    since_id = collector.checkpoints.get('itau')['since_id']
+    assert since_id == str(max(tweet['id'] for tweet in api.timelines[api.users['itau']]))
+
+    api.calls.clear()
+    new_ids = api.post('itau', 5)
+
+    assert collector.run(['itau']) == {'itau': 5}
+
+    # Every call starts from the saved since_id: one page of new tweets, one empty page
+    calls = timeline_calls(api)
+    assert [params['since_id'] for params in calls] == [since_id, since_id]
+
+    ids = exported_ids(str(tmp_path), 'itau')
+    assert len(ids) == len(set(ids)) == 455
+    assert ids[-5:] == [str(tweet_id) for tweet_id in sorted(new_ids, reverse=True)]
+    assert collector.checkpoints.get('itau')['since_id'] == str(max(new_ids))
+
+
+def test_crash_mid_account_resumes_without_duplicates(tmp_path):
+    api = API({'itau': 3 * PAGE_SIZE + 50}, fail_after=2)
+    collector = TimelineCollector(api, output_dir=str(tmp_path))
+
+    with pytest.raises(RuntimeError):
+        collector.collect('itau')
+
+    # Two pages on disk, checkpoint not moved
+    assert len(exported_ids(str(tmp_path), 'itau')) == 2 * PAGE_SIZE
+    assert 'since_id' not in collector.checkpoints.get('itau')
+
+    api.fail_after = None
+
+    # A new run (new collector, same checkpoints file) fetches everything again and skips what was exported
+    collector = TimelineCollector(api, output_dir=str(tmp_path))
+
+    assert collector.collect('itau') == PAGE_SIZE + 50
+
+    ids = exported_ids(str(tmp_path), 'itau')
+    assert len(ids) == len(set(ids)) == 3 * PAGE_SIZE + 50
+    assert collector.checkpoints.get('itau')['since_id'] == str(api.next_id)
+
+
+def test_unknown_and_protected_accounts_are_skipped(tmp_path):
+    api = API({'itau': 300, 'B3_Oficial': 250}, protected=('locked',))
+    collector = TimelineCollector(api, output_dir=str(tmp_path))
+
+    results = collector.run(['itau', 'ghost', 'locked', 'B3_Oficial'], max_workers=4)
+
+    assert results == {'itau': 300, 'ghost': None, 'locked': None, 'B3_Oficial': 250}
+    assert len(exported_ids(str(tmp_path), 'B3_Oficial')) == 250
+    assert 'since_id' not in collector.checkpoints.get('locked')
+
+
+def test_rate_limiter_blocks_at_window_limit():
+    limiter = RateLimiter(calls=3, period=0.5)
+
+    start = time.monotonic()
+
+    for _ in range(3):
+        limiter.acquire()
+
+    assert time.monotonic() - start < 0.1
+
+    limiter.acquire()
+
+    assert time.monotonic() - start >= 0.5
+
+
+def test_rate_limiter_keeps_collector_under_api_limit(tmp_path):
+    # The fake API raises RateLimitError above 4 calls per 0.4s: the shared limiter never lets the threads get there
+    api = API({'itau': 450, 'B3_Oficial': 450, 'petrobras': 450}, rate_limit=(4, 0.4))
+    collector = TimelineCollector(api, output_dir=str(tmp_path), rate_limiter=RateLimiter(calls=4, period=0.5))
+
+    assert collector.run(['itau', 'B3_Oficial', 'petrobras'], max_workers=3) == {'itau': 450, 'B3_Oficial': 450, 'petrobras': 450}
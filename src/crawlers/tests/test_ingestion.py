@@ -0,0 +1,76 @@
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(THIS_DIR, '..', 'b3'))
+
+from ingestion import TEXT_COLUMNS, connect, copy_statement, ingest
+
+RECORDS = [
+    {'Data Referência': '03/05/2021', 'Data Entrega': '04/05/2021', 'Ticker': 'PETR4', 'Assunto': 'Pagamento de dividendos', 'Tipo': 'Fato Relevante'},
+    {'Data Referência': '10/05/2021', 'Data Entrega': '10/05/2021', 'Ticker': 'VALE3', 'Assunto': 'Produção do trimestre', 'Tipo': 'Comunicado', 'Categoria': 'Outros'},
+]
+
+
+def test_connect_requires_a_table(tmp_path):
+    with pytest.raises(TypeError):
+        connect(f"sqlite:///{tmp_path / 'facts.sqlite'}")
+
+    with pytest.raises(ValueError):
+        connect(f"sqlite:///{tmp_path / 'facts.sqlite'}", '')
+
+
+def test_sqlite_creates_the_table_and_skips_known_rows(tmp_path):
+    path = tmp_path / 'facts.sqlite'
+    backend = connect(f'sqlite:///{path}', 'relevant_facts')
+
+    assert ingest(RECORDS, backend) == (2, 2)
+    assert ingest(RECORDS, backend, batch_size=1) == (2, 0)
+
+    backend.close()
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM relevant_facts').fetchone()[0] == 2
+
+
+def test_empty_text_fields_are_not_null(tmp_path):
+    row = (datetime(2021, 5, 3), datetime(2021, 5, 4), 'Pagamento de dividendos', 'PETR4', '')
+    backend = connect(f"sqlite:///{tmp_path / 'facts.sqlite'}", 'relevant_facts')
+
+    assert backend.upsert([row]) == 1
+    assert backend.upsert([row]) == 0
+
+    backend.close()
+
+    # PostgreSQL reads the unquoted empty CSV field of the topic as '' only with FORCE_NOT_NULL
+    statement = copy_statement('relevant_facts_staging')
+
+    assert 'FORMAT csv' in statement
+    assert f'FORCE_NOT_NULL ({", ".join(TEXT_COLUMNS)})' in statement
+    assert {'headline', 'topic'} <= set(TEXT_COLUMNS)
+
+
+@pytest.mark.skipif('QFLIB_TEST_DSN' not in os.environ, reason='needs a PostgreSQL database in $QFLIB_TEST_DSN')
+def test_postgres_fails_on_a_missing_table():
+    pytest.importorskip('psycopg2')
+
+    with pytest.raises(ValueError, match='does not exist'):
+        connect(os.environ['QFLIB_TEST_DSN'], 'relevant_facts_missing')
+
+
+@pytest.mark.skipif('QFLIB_TEST_DSN' not in os.environ, reason='needs a PostgreSQL database in $QFLIB_TEST_DSN (with a relevant_facts table)')
+def test_postgres_stores_an_empty_topic():
+    pytest.importorskip('psycopg2')
+
+    backend = connect(os.environ['QFLIB_TEST_DSN'], os.environ.get('QFLIB_TEST_TABLE', 'relevant_facts'))
+    row = (datetime(1900, 1, 1), datetime(1900, 1, 1), 'Teste de tópico vazio', 'TEST3', '')
+
+    try:
+        backend.upsert([row])
+        assert backend.upsert([row]) == 0
+    finally:
+        backend.close()
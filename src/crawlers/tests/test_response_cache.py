@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+import scrapy
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+sys.path.insert(0, os.path.join(THIS_DIR, '..', 'moneytimes'))
+
+from response_cache import NewsCacheStorage, cache_settings, open_storage, stored_responses
+from spider_base import NEWS_SPIDER_SETTINGS
+from main_moneytimes import MoneyTimesSpider
+
+
+def test_cache_modes_map_to_httpcache_settings():
+    assert not cache_settings('off')['HTTPCACHE_ENABLED']
+
+    record, replay = cache_settings('record'), cache_settings('replay')
+
+    assert record['HTTPCACHE_ENABLED'] and not record['HTTPCACHE_IGNORE_MISSING']
+    assert replay['HTTPCACHE_ENABLED'] and replay['HTTPCACHE_IGNORE_MISSING'] and replay['HTTPCACHE_EXPIRATION_SECS'] == 0
+
+    with pytest.raises(ValueError):
+        cache_settings('refresh')
+
+
+def test_stored_pages_keep_their_callback(tmp_path):
+    spider = MoneyTimesSpider(seen_index_path=None, tag='petrobras')
+    storage = open_storage(str(tmp_path))
+
+    listing = spider.page_request(1)
+    article = scrapy.Request('https://www.moneytimes.com.br/petrobras-1/', callback=spider.parse_pages)
+
+    for request in (listing, article):
+        storage.store_response(spider, request, HtmlResponse(url=request.url, body=b'<html></html>', encoding='utf8'))
+
+    stored = [(response.url, callback, cb_kwargs) for response, callback, cb_kwargs in stored_responses(spider.name, str(tmp_path))]
+
+    assert stored == [(listing.url, 'parse_front', listing.cb_kwargs), (article.url, 'parse_pages', dict())]
+    assert [response.url for response, _, _ in stored_responses(spider.name, str(tmp_path), 'parse_pages')] == [article.url]
+
+    # The storage a crawl builds from NEWS_SPIDER_SETTINGS finds the same pages
+    settings = Settings(dict(NEWS_SPIDER_SETTINGS, **cache_settings('replay', str(tmp_path))))
+    crawl_storage = NewsCacheStorage(settings)
+
+    assert crawl_storage.retrieve_response(spider, article).url == article.url
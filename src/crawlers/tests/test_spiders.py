@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+import scrapy
+from scrapy.http import HtmlResponse
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+for site_dir in ['suno', 'moneytimes', 'infomoney']:
+    sys.path.insert(0, os.path.join(THIS_DIR, '..', site_dir))
+
+from main_suno import SunoSpider
+from main_moneytimes import MoneyTimesSpider
+from main_infomoney import InfoMoneySpider
+
+# A page without a title (e.g. a video or a removed article)
+NO_TITLE = b'<html><head><meta charset="utf-8"></head><body><div class="video"><p>Assista</p></div></body></html>'
+
+SPIDERS = [
+    (SunoSpider, 'https://www.sunoresearch.com.br/noticias/video-petrobras/'),
+    (MoneyTimesSpider, 'https://www.moneytimes.com.br/video-petrobras/'),
+    (InfoMoneySpider, 'https://www.infomoney.com.br/mercados/video-petrobras/'),
+]
+
+
+@pytest.mark.parametrize('spider_cls, url', SPIDERS)
+def test_page_without_title_is_marked_seen(tmp_path, spider_cls, url):
+    spider = spider_cls(incremental=True, seen_index_path=str(tmp_path / 'seen.sqlite'))
+    spider.last_page = 10
+
+    response = HtmlResponse(url=url, body=NO_TITLE, encoding='utf8', request=scrapy.Request(url))
+
+    assert list(spider.parse_pages(response)) == []
+    assert spider.seen_index.seen([url], site=spider.seen_scope) == {url}
+
+    # A listing page linking only to it has no new articles: the run of pages without new ones goes on
+    spider.seen_pages = 1
+    listing = HtmlResponse(url=url, body=b'<html></html>', encoding='utf8')
+    requests = list(spider.follow_articles(listing, [url], page=2, callback=spider.parse_pages))
+
+    assert spider.seen_pages == 2
+    assert [request.callback.__name__ for request in requests] == ['parse_front']
+
+    spider.closed('finished')
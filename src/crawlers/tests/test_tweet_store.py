@@ -0,0 +1,51 @@
+import os
+import sys
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(THIS_DIR, '..', 'twitter'))
+
+from fake_tweepy import API
+from collector import TimelineCollector
+from tweet_store import load_tweets, results_frame, write_tweets
+
+
+def test_results_frame_of_collector_output(tmp_path):
+    output_dir = str(tmp_path / 'results_stream')
+
+    api = API({'itau': 250, 'B3_Oficial': 30})
+    TimelineCollector(api, output_dir=output_dir).run(['itau', 'B3_Oficial'])
+
+    assert os.path.exists(os.path.join(output_dir, 'checkpoints.json'))
+
+    # An interrupted export leaves a truncated last line: it is skipped
+    with open(os.path.join(output_dir, 'itau.jsonl'), 'a', encoding='utf8') as f:
+        f.write('{"tweet_id": "99')
+
+    df = results_frame(output_dir)
+
+    # One row per tweet and mentioned ticker
+    assert df['tweet_id'].nunique() == 280
+    assert (df['ticker'] == 'PETR4').sum() == 280
+    assert sorted(df['screen_name'].unique()) == ['B3_Oficial', 'itau']
+
+    write_tweets(df, str(tmp_path / 'tweet_store'))
+    df_store = load_tweets('PETR4', store_dir=str(tmp_path / 'tweet_store'))
+
+    assert len(df_store) == 280
+
+
+def test_rewritten_tweet_replaces_all_its_rows(tmp_path):
+    api = API({'itau': 3})
+    TimelineCollector(api, output_dir=str(tmp_path / 'results_stream')).run(['itau'])
+
+    df = results_frame(str(tmp_path / 'results_stream'))
+    store_dir = str(tmp_path / 'tweet_store')
+
+    # First stored without mentions, then again with its matched tickers
+    write_tweets(df.drop_duplicates(subset='tweet_id').assign(ticker=None), store_dir)
+    write_tweets(df, store_dir)
+
+    df_store = load_tweets(store_dir=store_dir)
+
+    assert len(df_store) == len(df)
+    assert df_store['ticker'].notna().all()
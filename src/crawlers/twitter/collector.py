@@ -0,0 +1,261 @@
+"""
+Incremental Twitter timeline collector.
+
+Collects the timelines of a list of accounts concurrently (threads sharing
+one API client and one rate limiter) and streams the tweets, page by page,
+to one JSON Lines file per account (results_stream/<screen_name>.jsonl,
+optionally with Parquet part files) through the export of the news spiders
+(pipelines.StreamingExportPipeline).
+
+Per-account checkpoints (checkpoints.json: user id and since_id) make every
+run fetch only the tweets newer than the last one. The since_id of an
+account is only moved once its new tweets are all written: an interrupted
+run fetches them again, and the tweets already exported are skipped.
+
+Usage (from src/crawlers/twitter):
+    python collector.py --accounts itau B3_Oficial [--workers 4] [--parquet]
+    python collector.py --groups related specific
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+import tweepy
+from scrapy.exceptions import DropItem
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from pipelines import StreamingExportPipeline
+from crawler_twitter import get_twitter_api_access, get_json_object
+
+OUTPUT_DIR = os.path.join(THIS_DIR, 'results_stream')
+CHECKPOINTS_FILE = os.path.join(OUTPUT_DIR, 'checkpoints.json')
+
+# Accounts of the collected datasets (one JSON file per account)
+GROUPS = {
+    'related': os.path.join(THIS_DIR, 'results_related'),
+    'specific': os.path.join(THIS_DIR, 'results_specific'),
+}
+
+# GET statuses/user_timeline: 900 requests per 15 minutes (user auth), 200 tweets per request
+RATE_LIMIT_CALLS = 900
+RATE_LIMIT_PERIOD = 15 * 60
+PAGE_SIZE = 200
+
+MAX_WORKERS = 4
+
+logger = logging.getLogger('twitter_collector')
+
+
+def group_accounts(groups: list) -> list:
+    accounts = list()
+
+    for group in groups:
+        accounts += sorted(os.path.splitext(name)[0] for name in os.listdir(GROUPS[group]) if name.endswith('.json'))
+
+    return accounts
+
+
+class RateLimiter:
+    """
+    At most `calls` calls per `period` seconds, shared by threads
+    (sliding window): `acquire` blocks until a call is allowed.
+    """
+
+    def __init__(self, calls: int = RATE_LIMIT_CALLS, period: float = RATE_LIMIT_PERIOD) -> None:
+        self.calls = calls
+        self.period = period
+        self.times = list()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.times = [t for t in self.times if now - t < self.period]
+
+                if len(self.times) < self.calls:
+                    self.times.append(now)
+                    return
+
+                wait = self.period - (now - self.times[0])
+
+            time.sleep(wait)
+
+
+class Checkpoints:
+    """
+    {screen_name: {'user_id': ..., 'since_id': ...}}, saved (atomically) on every update.
+    """
+
+    def __init__(self, path: str = CHECKPOINTS_FILE) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = dict()
+
+        if os.path.exists(path):
+            with open(path, encoding='utf8') as json_file:
+                self.data = json.load(json_file)
+
+    def get(self, screen_name: str) -> dict:
+        with self.lock:
+            return dict(self.data.get(screen_name, dict()))
+
+    def update(self, screen_name: str, **values) -> None:
+        with self.lock:
+            self.data.setdefault(screen_name, dict()).update(values)
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+            with open(self.path + '.tmp', 'w', encoding='utf8') as f:
+                json.dump(self.data, f, indent=2)
+
+            os.replace(self.path + '.tmp', self.path)
+
+
+class TimelineCollector:
+    """
+    Collects the new tweets of each account (see the module docstring).
+    `api` is a tweepy.API (or anything with its get_user and user_timeline).
+    """
+
+    def __init__(self, api, output_dir: str = OUTPUT_DIR, checkpoints_path: str = None, parquet: bool = False,
+                 rate_limiter: RateLimiter = None) -> None:
+        self.api = api
+        self.output_dir = output_dir
+        self.checkpoints = Checkpoints(checkpoints_path or os.path.join(output_dir, 'checkpoints.json'))
+        self.parquet = parquet
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+    def call(self, method, **params):
+        self.rate_limiter.acquire()
+        return method(**params)
+
+    def user_id(self, screen_name: str) -> str:
+        user_id = self.checkpoints.get(screen_name).get('user_id')
+
+        if user_id is None:
+            user_id = str(self.call(self.api.get_user, screen_name=screen_name)._json['id'])
+            self.checkpoints.update(screen_name, user_id=user_id)
+
+        return user_id
+
+    def pages(self, user_id: str, since_id: str = None):
+        """
+        Pages of the timeline newer than `since_id`, newest first (max_id paging).
+        """
+
+        max_id = None
+
+        while True:
+            params = dict(user_id=user_id, count=PAGE_SIZE, exclude_replies=True, include_rts=False, tweet_mode='extended')
+
+            if since_id is not None:
+                params['since_id'] = since_id
+            if max_id is not None:
+                params['max_id'] = max_id
+
+            page = [status._json for status in self.call(self.api.user_timeline, **params)]
+
+            if not page:
+                return
+
+            yield page
+
+            max_id = min(tweet['id'] for tweet in page) - 1
+
+    def collect(self, screen_name: str) -> int:
+        """
+        Streams the new tweets of one account. Returns the number written.
+        """
+
+        checkpoint = self.checkpoints.get(screen_name)
+        since_id = checkpoint.get('since_id')
+
+        # The export pipeline of the spiders, with the account file as output
+        target = SimpleNamespace(name=screen_name, logger=logger, output_path=os.path.join(self.output_dir, f'{screen_name}.jsonl'))
+        export = StreamingExportPipeline(parquet=self.parquet)
+        export.open_spider(target)
+
+        newest_id = None
+        written = 0
+
+        try:
+            for page in self.pages(self.user_id(screen_name), since_id):
+                newest_id = max([newest_id or 0] + [tweet['id'] for tweet in page])
+
+                for tweet in page:
+                    try:
+                        export.process_item(get_json_object(tweet), target)
+                    except DropItem:
+                        # Already exported by an interrupted run
+                        continue
+
+                    written += 1
+        finally:
+            export.close_spider(target)
+
+        # All the new tweets are on disk: move the checkpoint
+        if newest_id is not None:
+            self.checkpoints.update(screen_name, since_id=str(newest_id))
+
+        return written
+
+    def run(self, accounts: list, max_workers: int = MAX_WORKERS) -> dict:
+        """
+        Collects the accounts concurrently. Returns {screen_name: tweets written}
+        (None for the accounts that failed).
+        """
+
+        def collect(screen_name):
+            try:
+                return self.collect(screen_name)
+            except tweepy.errors.TweepyException as e:
+                logger.warning(f'{screen_name}: {e}')
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(accounts, executor.map(collect, accounts)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Incremental Twitter timeline collector.')
+    parser.add_argument('--accounts', nargs='+', default=list())
+    parser.add_argument('--groups', nargs='+', choices=list(GROUPS), default=list(), help='accounts of the collected datasets')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    parser.add_argument('--parquet', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    # Keys and Access Tokens
+    fpath_credentials: str = os.path.join(
+        THIS_DIR, '../../../', 'resources', 'twitter_credentials.json'
+    )
+
+    with open(fpath_credentials, 'r') as file:
+        credentials = json.load(file)
+
+    api = get_twitter_api_access(credentials['api_key'], credentials['api_key_secret'],
+                                 credentials['access_token'], credentials['access_token_secret'])
+
+    accounts = args.accounts + group_accounts(args.groups)
+
+    collector = TimelineCollector(api, output_dir=args.output, parquet=args.parquet)
+
+    for screen_name, written in collector.run(accounts, args.workers).items():
+        print(f'{screen_name}: {"failed" if written is None else written}')
+
+
+if __name__ == '__main__':
+    main()
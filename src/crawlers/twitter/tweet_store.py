@@ -0,0 +1,216 @@
+"""
+Columnar store of the tweets (records of crawler_twitter.get_json_object).
+
+Parquet, partitioned by year and account (hive layout):
+
+    tweet_store/year=2021/screen_name=acionistacombr/tweets.parquet
+
+with one row per tweet and mentioned ticker (ticker null for the tweets
+without mentions), sorted by ticker and date, and compact types: tweet_id
+int64, created_at/search_dt timestamps, user_id/ticker dictionary encoded,
+counts uint32. Writing to a partition merges with what is already there
+(the newest copy of a tweet wins), so the same records can be written again.
+
+load_tweets reads only the partitions of the date range (and accounts)
+asked for, with the strings as Arrow strings and the dictionary columns as
+categoricals.
+
+Usage (from src/crawlers/twitter):
+    python tweet_store.py --from-csv                     # the final datasets (with mentions)
+    python tweet_store.py --from-results results_stream  # crawler outputs (mentions by the EntityMatcher)
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from pipelines import load_jsonl
+
+STORE_DIR = os.path.join(THIS_DIR, 'tweet_store')
+
+CSV_FILES = [
+    os.path.join(THIS_DIR, 'final', 'df_twitter_specific_users_with_mentions.csv'),
+    os.path.join(THIS_DIR, 'final', 'df_twitter_related_users_with_mentions.csv'),
+]
+
+# Columns of the partition files (year and screen_name are the partition keys)
+SCHEMA = pa.schema([
+    ('tweet_id', pa.int64()),
+    ('created_at', pa.timestamp('s')),
+    ('search_dt', pa.timestamp('s')),
+    ('text', pa.string()),
+    ('user_id', pa.dictionary(pa.int32(), pa.string())),
+    ('rt_count', pa.uint32()),
+    ('favorite_count', pa.uint32()),
+    ('ticker', pa.dictionary(pa.int32(), pa.string())),
+])
+
+COLUMNS = SCHEMA.names + ['screen_name']
+
+# Arrow -> pandas types of the loaded frames (dictionaries become categoricals)
+PANDAS_TYPES = {
+    pa.string(): pd.StringDtype('pyarrow'),
+    pa.uint32(): pd.UInt32Dtype(),
+}
+
+
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Frame of get_json_object records (or of the final datasets) with the store types.
+    """
+
+    df = df.reindex(columns=COLUMNS).copy()
+
+    df['tweet_id'] = df['tweet_id'].astype('int64')
+    df['created_at'] = pd.to_datetime(df['created_at'], format='%Y-%m-%d %H:%M:%S')
+    df['search_dt'] = pd.to_datetime(df['search_dt'], format='%Y-%m-%d %H:%M:%S')
+    df['user_id'] = df['user_id'].astype(str)
+
+    for column in ['rt_count', 'favorite_count']:
+        df[column] = pd.to_numeric(df[column]).astype('UInt32')
+
+    df['ticker'] = df['ticker'].where(df['ticker'].notna(), None)
+
+    return df
+
+
+def write_tweets(df: pd.DataFrame, store_dir: str = STORE_DIR) -> list:
+    """
+    Writes tweets (one row per tweet and ticker, see normalize) to their
+    partitions. Returns the paths written.
+    """
+
+    df = normalize(df)
+    paths = list()
+
+    for (year, screen_name), df_part in df.groupby([df['created_at'].dt.year, 'screen_name']):
+        part_dir = os.path.join(store_dir, f'year={year}', f'screen_name={screen_name}')
+        path = os.path.join(part_dir, 'tweets.parquet')
+
+        df_part = df_part.drop(columns='screen_name')
+
+        if os.path.exists(path):
+            df_old = pq.read_table(path).to_pandas(types_mapper=PANDAS_TYPES.get)
+
+            # The new copy of a tweet replaces all its old rows (e.g. a row without ticker by its mentions)
+            df_old = df_old[~df_old['tweet_id'].isin(df_part['tweet_id'])]
+            df_part = pd.concat([df_old.astype({'user_id': str, 'ticker': object}), df_part])
+
+        df_part = df_part.drop_duplicates(subset=['tweet_id', 'ticker'], keep='last')
+        df_part = df_part.sort_values(['ticker', 'created_at'], na_position='last')
+
+        table = pa.Table.from_pandas(df_part, preserve_index=False).select(SCHEMA.names).cast(SCHEMA)
+
+        # Written to a temporary name first: a crash never leaves a partial partition
+        os.makedirs(part_dir, exist_ok=True)
+        pq.write_table(table, path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+        paths.append(path)
+
+    return paths
+
+
+def load_tweets(ticker: str = None, start_dt: str = None, end_dt: str = None, screen_names: list = None,
+                columns: list = None, store_dir: str = STORE_DIR) -> pd.DataFrame:
+    """
+    Tweets (one row per tweet and ticker) mentioning `ticker`, created in
+    [start_dt, end_dt] (days, both included), of `screen_names`. Every
+    argument is optional. Only the partitions of the range are read.
+    """
+
+    dataset = ds.dataset(store_dir, format='parquet', partitioning=ds.HivePartitioning.discover(infer_dictionary=True))
+
+    conditions = list()
+
+    if ticker is not None:
+        conditions.append(ds.field('ticker') == ticker.upper())
+
+    if start_dt is not None:
+        conditions.append(ds.field('year') >= pd.Timestamp(start_dt).year)
+        conditions.append(ds.field('created_at') >= pd.Timestamp(start_dt))
+
+    if end_dt is not None:
+        conditions.append(ds.field('year') <= pd.Timestamp(end_dt).year)
+        conditions.append(ds.field('created_at') < pd.Timestamp(end_dt) + pd.Timedelta(days=1))
+
+    if screen_names is not None:
+        conditions.append(ds.field('screen_name').isin(list(screen_names)))
+
+    condition = None
+
+    for c in conditions:
+        condition = c if condition is None else condition & c
+
+    table = dataset.to_table(columns=columns, filter=condition)
+
+    return table.to_pandas(types_mapper=PANDAS_TYPES.get).drop(columns='year', errors='ignore')
+
+
+def results_frame(results_dir: str, **matcher_params) -> pd.DataFrame:
+    """
+    Tweets of the crawler outputs (<screen_name>.json/.jsonl), with the
+    tickers found by the EntityMatcher (one row per ticker).
+    """
+
+    sys.path.insert(0, os.path.join(THIS_DIR, '..', '..', 'named_entity_recognition'))
+    from entity_matcher import EntityMatcher
+
+    records = list()
+
+    paths = sorted(glob.glob(os.path.join(results_dir, '*.json')) + glob.glob(os.path.join(results_dir, '*.jsonl')))
+
+    for path in paths:
+        # Record files only (the collector keeps its checkpoints.json next to them)
+        if os.path.basename(path) == 'checkpoints.json':
+            continue
+
+        if path.endswith('.jsonl'):
+            records += load_jsonl(path)
+        else:
+            with open(path, encoding='utf8') as json_file:
+                records += json.load(json_file)
+
+    df = pd.DataFrame(records)
+
+    if df.empty:
+        return df
+
+    df['ticker'] = EntityMatcher.from_file(**matcher_params).find_batch(df['text'].fillna(''))
+
+    return df.explode('ticker')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Builds the tweet store.')
+    parser.add_argument('--from-csv', action='store_true', help='the final datasets (with mentions)')
+    parser.add_argument('--from-results', nargs='+', default=list(), help='directories of crawler outputs')
+    parser.add_argument('--output', default=STORE_DIR)
+    args = parser.parse_args()
+
+    frames = list()
+
+    if args.from_csv:
+        frames += [pd.read_csv(path, sep=';', index_col=0) for path in CSV_FILES]
+
+    for results_dir in args.from_results:
+        frames.append(results_frame(results_dir))
+
+    df = pd.concat(frames, ignore_index=True)
+    paths = write_tweets(df, args.output)
+
+    print(f'{len(df)} rows written to {len(paths)} partitions of {args.output}')
+
+
+if __name__ == '__main__':
+    main()
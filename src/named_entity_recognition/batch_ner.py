@@ -0,0 +1,192 @@
+"""
+Batch NER over the crawler outputs.
+
+Reads every Twitter user file (related and specific users, and the
+timelines of twitter/collector.py) and the Suno, InfoMoney and MoneyTimes
+results, finds the mentioned tickers with the EntityMatcher in a process
+pool (one file per task) and writes an exploded mention table (one row per
+text and ticker) to Parquet, partitioned by source and sorted by ticker and
+date, so readers can filter by ticker with predicate pushdown:
+
+    pd.read_parquet(MENTIONS_DIR, filters=[('source', '=', 'twitter'), ('ticker', '=', 'PETR4')])
+
+Usage (from src/named_entity_recognition):
+    python batch_ner.py [--n-jobs 4] [--output data/mentions]
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWLERS_DIR = os.path.join(THIS_DIR, '..', 'crawlers')
+
+sys.path.insert(0, CRAWLERS_DIR)
+
+from entity_matcher import EntityMatcher
+from pipelines import load_jsonl
+
+MENTIONS_DIR = os.path.join(THIS_DIR, 'data', 'mentions')
+
+# Rows per Parquet row group (granularity of the predicate pushdown)
+ROW_GROUP_SIZE = 10000
+
+# Source -> file patterns, id field, date format and whether the tags are scanned
+SOURCES = {
+    'twitter': dict(patterns=['twitter/results_related/*.json', 'twitter/results_specific/*.json', 'twitter/results_stream/*.jsonl'], id_field='tweet_id',
+                    date_field='created_at', date_format='%Y-%m-%d %H:%M:%S', use_tags=False),
+    'suno': dict(patterns=['suno/results/*.json', 'suno/results/*.jsonl'], id_field='url', date_field='date', date_format='%d/%m/%Y %H:%M', use_tags=True),
+    'infomoney': dict(patterns=['infomoney/results/*.json', 'infomoney/results/*.jsonl'], id_field='link', date_field='date', date_format='%Y-%m-%d %H:%M:%S', use_tags=True),
+    'moneytimes': dict(patterns=['moneytimes/results/*.json', 'moneytimes/results/*.jsonl'], id_field='link', date_field='date', date_format='%d/%m/%Y - %H:%M', use_tags=True),
+}
+
+COLUMNS = ['source', 'text_id', 'ticker', 'date', 'title', 'origin', 'topic', 'search_date', 'screen_name', 'rt_count', 'favorite_count']
+
+# Same schema for every source (the source is the partition key)
+SCHEMA = pa.schema([
+    ('text_id', pa.string()),
+    ('ticker', pa.string()),
+    ('date', pa.timestamp('ns')),
+    ('title', pa.string()),
+    ('origin', pa.string()),
+    ('topic', pa.string()),
+    ('search_date', pa.string()),
+    ('screen_name', pa.string()),
+    ('rt_count', pa.int64()),
+    ('favorite_count', pa.int64()),
+])
+
+# EntityMatcher of each worker process
+_matcher = None
+
+
+def _init_worker(matcher_params: dict) -> None:
+    global _matcher
+    _matcher = EntityMatcher.from_file(**matcher_params)
+
+
+def _mentions(path: str, source: str) -> pd.DataFrame:
+    """
+    Worker: mention rows of one crawler output file.
+    """
+
+    config = SOURCES[source]
+
+    if path.endswith('.jsonl'):
+        # Output of a crawl that may still be running: an incomplete last line is skipped
+        records = load_jsonl(path)
+    else:
+        with open(path, encoding='utf8') as json_file:
+            records = json.load(json_file)
+
+    df = pd.DataFrame(records)
+
+    if df.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    df = df.rename(columns={'text': 'title', 'search_dt': 'search_date'})
+    df['title'] = df['title'].fillna('').astype(str)
+
+    texts = df['title']
+
+    if config['use_tags']:
+        # Tags like 'Vale (VALE3)' are scanned with the title
+        texts = texts + ' ' + df['tags'].apply(lambda tags: ' '.join(tags) if isinstance(tags, list) else '')
+
+    df['ticker'] = _matcher.find_batch(texts)
+    df = df[df['ticker'].str.len() > 0].explode('ticker')
+
+    df['source'] = source
+    df['origin'] = os.path.splitext(os.path.basename(path))[0]
+    df['text_id'] = df[config['id_field']].astype(str)
+    df['date'] = pd.to_datetime(df[config['date_field']], format=config['date_format'], errors='coerce')
+
+    return df.reindex(columns=COLUMNS)
+
+
+def source_files(sources: list = None) -> list:
+    """
+    (path, source) of every crawler output file.
+    """
+
+    files = list()
+
+    for source in (sources or list(SOURCES)):
+        for pattern in SOURCES[source]['patterns']:
+            files += [(path, source) for path in sorted(glob.glob(os.path.join(CRAWLERS_DIR, pattern)))]
+
+    return files
+
+
+def extract_mentions(sources: list = None, n_jobs: int = None, **matcher_params) -> pd.DataFrame:
+    """
+    Mention table (one row per text and mentioned ticker) of all the crawler outputs.
+
+    `matcher_params` are passed to EntityMatcher.from_file (e.g. tickers).
+    """
+
+    files = source_files(sources)
+
+    # Fresh checkout, or no outputs of the chosen sources yet
+    if not files:
+        return pd.DataFrame(columns=COLUMNS).astype(dict(rt_count='Int64', favorite_count='Int64'))
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(matcher_params,)) as executor:
+        frames = list(executor.map(_mentions, *zip(*files)))
+
+    df = pd.concat(frames, ignore_index=True)
+
+    # The same news/tweet may be in more than one file (e.g. one Suno file per tag)
+    df = df.drop_duplicates(subset=['source', 'text_id', 'ticker'], keep='first')
+
+    df['rt_count'] = df['rt_count'].astype('Int64')
+    df['favorite_count'] = df['favorite_count'].astype('Int64')
+
+    return df.sort_values(['source', 'ticker', 'date']).reset_index(drop=True)
+
+
+def write_mentions(df: pd.DataFrame, output_dir: str = MENTIONS_DIR) -> list:
+    """
+    Writes one Parquet file per source (hive layout: source=<source>/mentions.parquet).
+    """
+
+    paths = list()
+
+    for source, df_source in df.groupby('source'):
+        source_dir = os.path.join(output_dir, f'source={source}')
+        os.makedirs(source_dir, exist_ok=True)
+
+        table = pa.Table.from_pandas(df_source.drop(columns='source'), schema=SCHEMA, preserve_index=False)
+
+        path = os.path.join(source_dir, 'mentions.parquet')
+        pq.write_table(table, path, row_group_size=ROW_GROUP_SIZE)
+        paths.append(path)
+
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Batch NER over the crawler outputs.')
+    parser.add_argument('--sources', nargs='+', choices=list(SOURCES), default=None)
+    parser.add_argument('--tickers', nargs='+', default=None, help='only search these tickers (default: all B3 tickers)')
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--output', default=MENTIONS_DIR)
+    args = parser.parse_args()
+
+    df = extract_mentions(sources=args.sources, n_jobs=args.n_jobs, tickers=args.tickers)
+
+    for path in write_mentions(df, args.output):
+        print(path)
+
+    print(df.groupby('source')['ticker'].agg(['count', 'nunique']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+import os
+import re
+import json
+import unicodedata
+from collections import deque
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+B3_FILE = os.path.join(THIS_DIR, 'data', 'results-b3.json')
+
+# Fields of results-b3.json used as patterns
+FIELDS = ('tickers', 'nome_pregao', 'razao_social')
+
+# Names of companies that are also common words (tickers are still matched)
+AMBIGUOUS_NAMES = {
+    'ALLIED', 'AMAZONIA', 'ANIMA', 'AZUL', 'BRASIL', 'CACHOEIRA', 'CEDRO', 'COMPASS', 'CRISTAL', 'DESKTOP',
+    'ESTRELA', 'EVEN', 'GOL', 'HERCULES', 'LIGHT', 'MOSAICO', 'MUNDIAL', 'OI', 'PARANA', 'PINE', 'PRATICA',
+    'RENOVA', 'SPRINGS', 'TC', 'TIM', 'UNIDAS', 'VALID', 'VAMOS', 'VIA', 'VIVER',
+}
+
+# Legal suffixes dropped from the end of company names (e.g. 'VALE S.A.' -> 'VALE')
+LEGAL_SUFFIXES = [('S', 'A'), ('SA',), ('INC',), ('LTDA',)]
+
+LINK_PATTERN = re.compile(r'https?://\S*', re.I)
+WORD_PATTERN = re.compile(r"[\w']+")
+
+
+def tokenize(text: str) -> list:
+    """
+    Uppercase words of `text`, without links, accents and punctuation.
+    """
+
+    text = LINK_PATTERN.sub(' ', str(text))
+
+    # Remove accents ('PETROBRÁS' -> 'PETROBRAS')
+    text = unicodedata.normalize('NFKD', text.upper())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+
+    return [word.replace("'", '') for word in WORD_PATTERN.findall(text)]
+
+
+def name_tokens(name: str) -> tuple:
+    tokens = tokenize(name)
+
+    for suffix in LEGAL_SUFFIXES:
+        if len(tokens) > len(suffix) and tuple(tokens[-len(suffix):]) == suffix:
+            tokens = tokens[:-len(suffix)]
+            break
+
+    return tuple(tokens)
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over word sequences.
+
+    Patterns are tuples of words, so matches always start and end at word
+    boundaries. Searching a text of n words visits each word once.
+    """
+
+    def __init__(self) -> None:
+        self.goto = [dict()]
+        self.fail = [0]
+        self.outputs = [set()]
+
+    def add(self, words: tuple, value) -> None:
+        state = 0
+
+        for word in words:
+            if word not in self.goto[state]:
+                self.goto.append(dict())
+                self.fail.append(0)
+                self.outputs.append(set())
+                self.goto[state][word] = len(self.goto) - 1
+
+            state = self.goto[state][word]
+
+        self.outputs[state].add(value)
+
+    def build(self) -> None:
+        """
+        Computes the failure links (breadth-first) and merges the outputs along them.
+        """
+
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for word, child in self.goto[state].items():
+                queue.append(child)
+
+                fail = self.fail[state]
+                while fail and word not in self.goto[fail]:
+                    fail = self.fail[fail]
+
+                self.fail[child] = self.goto[fail].get(word, 0)
+                self.outputs[child] |= self.outputs[self.fail[child]]
+
+    def search(self, words: list) -> set:
+        """
+        Values of all patterns found in `words`.
+        """
+
+        found = set()
+        state = 0
+
+        for word in words:
+            while state and word not in self.goto[state]:
+                state = self.fail[state]
+
+            state = self.goto[state].get(word, 0)
+
+            if self.outputs[state]:
+                found |= self.outputs[state]
+
+        return found
+
+
+class EntityMatcher:
+    """
+    Finds the tickers mentioned in a text by their code, trading name
+    (nome_pregao) or company name (razao_social), with one automaton built
+    from all the companies listed in results-b3.json.
+
+    A company name mention counts as a mention to every ticker of the company.
+    """
+
+    def __init__(self, companies: list, tickers: list = None, fields: tuple = FIELDS, exclude_names: set = AMBIGUOUS_NAMES) -> None:
+        """
+        `companies` are the records of results-b3.json. With `tickers`, only
+        mentions to these tickers are searched.
+        """
+
+        universe = None if tickers is None else {ticker.upper() for ticker in tickers}
+        exclude = {name_tokens(name) for name in (exclude_names or set())}
+
+        self.automaton = AhoCorasick()
+        self.n_patterns = 0
+
+        for company in companies:
+            company_tickers = [ticker for ticker in company['tickers'] if universe is None or ticker in universe]
+
+            if not company_tickers:
+                continue
+
+            if 'tickers' in fields:
+                for ticker in company_tickers:
+                    self.add(tokenize(ticker), {ticker})
+
+            for field in fields:
+                if field == 'tickers' or not company.get(field):
+                    continue
+
+                words = name_tokens(company[field])
+
+                if words and words not in exclude:
+                    self.add(words, set(company_tickers))
+
+        self.automaton.build()
+
+    @classmethod
+    def from_file(cls, path: str = B3_FILE, **kwargs):
+        with open(path, encoding='utf8') as json_file:
+            companies = json.load(json_file)
+
+        return cls(companies, **kwargs)
+
+    def add(self, words: tuple, tickers: set) -> None:
+        for ticker in tickers:
+            self.automaton.add(tuple(words), ticker)
+
+        self.n_patterns += 1
+
+    def find(self, text: str) -> list:
+        """
+        Sorted list of the tickers mentioned in `text`.
+        """
+
+        return sorted(self.automaton.search(tokenize(text)))
+
+    def find_batch(self, texts) -> list:
+        return [self.find(text) for text in texts]
@@ -0,0 +1,200 @@
+import os
+import numpy as np
+import pandas as pd
+
+from datasets import TICKERS, load_suno_files, load_twitter_files
+from sent_classifier import SnorkelSentimentClassifier
+from near_duplicates import deduplicate_sources
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DAILY_SCORES_DIR = os.path.join(THIS_DIR, '..', '..', 'data', 'textual')
+
+# Source -> (loader, subdirectory of DAILY_SCORES_DIR)
+SOURCES = {
+    'suno': (load_suno_files, 'news'),
+    'twitter': (load_twitter_files, 'twitter'),
+}
+
+# Set values to label classes
+LABEL_VALUES = {"POSITIVE" : 1,
+                "NEUTRAL" : 0,
+                "NEGATIVE" : -1}
+
+
+def publication_scores(df_results: pd.DataFrame, source: str = 'suno') -> pd.Series:
+    """
+    Score of each publication: label value, weighted by 10 * rt_count for tweets.
+    Representatives of near-duplicate clusters (see near_duplicates.deduplicate)
+    are also weighted by their `cluster_size`.
+    """
+
+    label_value = df_results['label_class'].map(LABEL_VALUES)
+
+    if 'cluster_size' in df_results.columns:
+        label_value = label_value * df_results['cluster_size']
+
+    if source == 'twitter':
+        return (label_value * (10 * df_results['rt_count'])).rename('sent_score')
+
+    return (label_value * 1).rename('sent_score')
+
+
+def _day_keys(df_results: pd.DataFrame, by: list) -> pd.MultiIndex:
+    """
+    (group columns..., day) of every publication.
+    """
+
+    return pd.MultiIndex.from_arrays([df_results[column].to_numpy() for column in by] + [df_results.index.floor('D')],
+                                     names=by + ['date'])
+
+
+def _daily_signs(df_results: pd.DataFrame, source: str, by: list) -> pd.DataFrame:
+    """
+    Sentiment score of the days with publications, one row per (group columns..., date).
+    """
+
+    scores = publication_scores(df_results, source)
+    keys = _day_keys(df_results, by)
+    keys = [keys.get_level_values(name) for name in keys.names]
+
+    # Divide each score by the number of distinct scores of its day
+    scores = scores / scores.groupby(keys).transform('nunique').to_numpy()
+
+    daily = scores.groupby(keys).sum()
+
+    # -1 if x < 0 else (1 if x > 0 else 0)
+    return np.sign(daily).fillna(0).astype(int).reset_index()
+
+
+def _resample_days(signs: pd.DataFrame, by: list) -> pd.DataFrame:
+    """
+    Fills the days without publications (score 0) between the first and last day of each group.
+    """
+
+    signs = signs.set_index('date')
+
+    if by:
+        daily = signs.groupby(by)['sent_score'].resample('D').sum()
+    else:
+        daily = signs['sent_score'].resample('D').sum()
+
+    return daily.astype(int).to_frame()
+
+
+def daily_sent_scores(df_results: pd.DataFrame, source: str = 'suno', by: list = None) -> pd.DataFrame:
+    """
+    Daily sentiment scores (-1, 0 or 1) of labelled publications (output of
+    SnorkelSentimentClassifier.apply_rules, indexed by date).
+
+    Same result as the per-row loop of compute_sent_scores.ipynb, except for
+    publications with the same timestamp: the loop's `.loc[index]` overwrote
+    all of them with the score of the last one (e.g. Suno PETR4 on
+    2022-03-21, a negative and a neutral news at 11:44: 0 in the notebook),
+    while here every publication counts (-1). With `by` (e.g. ['ticker']) the
+    scores of every group are computed at once and the result is indexed by
+    (group columns..., date).
+    """
+
+    by = list(by or [])
+
+    if df_results.empty:
+        return pd.DataFrame(columns=['sent_score'], index=pd.DatetimeIndex([], name='date'))
+
+    return _resample_days(_daily_signs(df_results, source, by), by)
+
+
+def update_daily_sent_scores(daily: pd.DataFrame, df_results: pd.DataFrame, df_new: pd.DataFrame, source: str = 'suno',
+                             by: list = None) -> pd.DataFrame:
+    """
+    Updates `daily` (the daily_sent_scores of `df_results`) with the newly
+    labelled publications of `df_new`.
+
+    Only the days (of each group) with new publications are recomputed, from
+    their publications in `df_results` plus the new ones; all other days are
+    kept as they are.
+    """
+
+    by = list(by or [])
+
+    if df_new.empty:
+        return daily
+
+    if daily.empty:
+        return daily_sent_scores(pd.concat([df_results, df_new]), source, by)
+
+    affected = _day_keys(df_new, by).unique()
+
+    df_affected = pd.concat([df_results[_day_keys(df_results, by).isin(affected)], df_new])
+    signs = _daily_signs(df_affected, source, by)
+
+    current = daily.reset_index()
+    current = current[~pd.MultiIndex.from_frame(current[by + ['date']]).isin(affected)]
+
+    signs = pd.concat([current, signs]).sort_values(by + ['date'])
+
+    return _resample_days(signs, by)
+
+
+def save_daily_sent_scores(daily: pd.DataFrame, source: str = 'suno', output_dir: str = DAILY_SCORES_DIR) -> list:
+    """
+    Writes one `{source}_daily_sent_scores_{TICKER}.csv` per ticker of a
+    daily_sent_scores(..., by=['ticker']) result. Returns the written paths.
+    """
+
+    paths = list()
+
+    for ticker, daily_ticker in daily.groupby(level='ticker'):
+        path = os.path.join(output_dir, SOURCES[source][1], f'{source}_daily_sent_scores_{ticker.upper()}.csv')
+
+        daily_ticker.droplevel('ticker').to_csv(path)
+        paths.append(path)
+
+    return paths
+
+
+def compute_daily_sent_scores(start_dt: str, end_dt: str, tickers: list = TICKERS, sources: list = None, output_dir: str = DAILY_SCORES_DIR,
+                              dedup: dict = None, **classifier_params) -> dict:
+    """
+    Labels the publications of every ticker and source and writes all the
+    daily sentiment score series. Returns {source: daily scores by ticker}.
+
+    With `dedup` (a dict, possibly empty, of near_duplicates.deduplicate
+    parameters), the publications of every ticker are deduplicated across
+    all the sources together: only one publication per near-duplicate
+    cluster is labelled, in the source that published it first, and it
+    counts with the size of its cluster. `classifier_params` are passed to
+    SnorkelSentimentClassifier (e.g. model_path).
+    """
+
+    sources = sources or list(SOURCES)
+    frames = {source: list() for source in sources}
+
+    for ticker in tickers:
+        dfs = {source: SOURCES[source][0](ticker=ticker, start_dt=start_dt, end_dt=end_dt) for source in sources}
+
+        if dedup is not None:
+            dfs = deduplicate_sources(dfs, **dedup)
+
+        for source, df in dfs.items():
+            if df.empty:
+                continue
+
+            sc = SnorkelSentimentClassifier(df=df, source=source, **classifier_params)
+
+            # Executar o módulo de classificação de sentimentos
+            df_results, _ = sc.apply_rules(df)
+            frames[source].append(df_results.assign(ticker=ticker.upper()))
+
+    results = dict()
+
+    for source in sources:
+        if not frames[source]:
+            continue
+
+        results[source] = daily_sent_scores(pd.concat(frames[source]), source, by=['ticker'])
+
+        if output_dir is not None:
+            save_daily_sent_scores(results[source], source, output_dir)
+
+    return results
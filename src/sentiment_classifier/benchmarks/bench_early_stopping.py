@@ -0,0 +1,68 @@
+"""
+LabelModel fit time and label agreement: early stopping against the fixed
+5000 epochs baseline, for each ticker's Suno and Twitter corpora.
+
+Usage (from src/sentiment_classifier):
+    python benchmarks/bench_early_stopping.py
+"""
+
+import os
+import sys
+import warnings
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from datasets import TICKERS, load_suno_files, load_twitter_files
+from sent_classifier import SnorkelSentimentClassifier
+
+START_DT = '2018-01-02'
+END_DT = '2022-07-02'
+
+# (tol, patience) pairs evaluated against the baseline
+CRITERIA = [(1e-6, 50), (1e-7, 100), (1e-8, 200)]
+
+
+def fit(sc: SnorkelSentimentClassifier, L, early_stopping: bool):
+    sc.early_stopping = early_stopping
+    label_model = sc.fit_label_model(L)
+
+    return label_model.predict(L=L, tie_break_policy='abstain'), label_model.fit_stats
+
+
+def main() -> None:
+    header = f"{'corpus':<16} {'rows':>6} {'criterion':>14} {'epochs':>7} {'time (s)':>9} {'speedup':>8} {'agreement':>10}"
+    print(header)
+    print('-' * len(header))
+
+    for source, loader in [('suno', load_suno_files), ('twitter', load_twitter_files)]:
+        for ticker in TICKERS:
+            df = loader(ticker=ticker, start_dt=START_DT, end_dt=END_DT)
+
+            # LabelModel needs at least a few rows to be fitted
+            if len(df) < 10:
+                continue
+
+            sc = SnorkelSentimentClassifier(df=df, source=source)
+            sc.fit_params = dict(sc.fit_params, progress_bar=False)
+            _, L = sc.preprocess_and_label(df.copy())
+
+            baseline_preds, baseline_stats = fit(sc, L, early_stopping=False)
+            corpus = f'{source}/{ticker}'
+
+            print(f"{corpus:<16} {len(L):>6} {'fixed':>14} {baseline_stats['epochs']:>7} {baseline_stats['wall_time']:>9.2f} {1:>7.1f}x {1:>10.2%}")
+
+            for tol, patience in CRITERIA:
+                sc.early_stopping_params = dict(tol=tol, patience=patience)
+                preds, stats = fit(sc, L, early_stopping=True)
+
+                criterion = f'{tol:.0e}/{patience}'
+                speedup = baseline_stats['wall_time'] / stats['wall_time']
+                agreement = (preds == baseline_preds).mean()
+
+                print(f"{corpus:<16} {len(L):>6} {criterion:>14} {stats['epochs']:>7} {stats['wall_time']:>9.2f} {speedup:>7.1f}x {agreement:>10.2%}")
+
+
+if __name__ == '__main__':
+    main()
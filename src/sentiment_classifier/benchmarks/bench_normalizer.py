@@ -0,0 +1,136 @@
+"""
+Rows/sec of the column-wise preprocessor (before) against TextNormalizer (after)
+on the Suno and Twitter publications of the tickers (datasets loaders). Exits
+with an error, showing the first differing title, if both do not produce the
+same output.
+
+Usage (from src/sentiment_classifier):
+    python benchmarks/bench_normalizer.py
+"""
+
+import os
+import sys
+import re
+import time
+import string
+import warnings
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from datasets import TICKERS, load_suno_files, load_twitter_files
+from text_normalizer import TextNormalizer, EMOJI_PATTERN
+
+
+def legacy_remove_emojis(sentence):
+    return re.compile(EMOJI_PATTERN.pattern, flags=re.UNICODE).sub(r'', sentence)
+
+def legacy_remove_valores(sentence):
+    new_sentece = ''
+
+    for token in sentence.split():
+        if token.isdigit():
+            token = '<NUM>'
+        new_sentece += ' {}'.format(token)
+
+    return new_sentece
+
+def legacy_remove_links(sentence):
+    new_sentece = ''
+
+    for token in sentence.split():
+        if token.startswith('http'):
+            token = ''
+        new_sentece += ' {}'.format(token)
+
+    return new_sentece
+
+
+def legacy_preprocessor(titles: pd.Series) -> pd.Series:
+    """
+    Column-wise preprocessor as it was before TextNormalizer (one pass per step).
+    """
+
+    df = pd.DataFrame({'title': titles})
+
+    df['title'] = df['title'].map(lambda s: s.replace('-feira', ''))
+    df['title'] = df['title'].map(lambda s: s.replace('-alvo', ' alvo'))
+    df['title'] = df['title'].map(lambda s: s.replace('\n', ' '))
+    df['title'] = df['title'].map(lambda s: s.replace('+', ''))
+    df['title'] = df['title'].map(lambda s: s.replace('º', ''))
+    df['title'] = df['title'].map(lambda s: s.replace("‘", ''))
+    df['title'] = df['title'].map(lambda s: s.replace("’", ''))
+    df['title'] = df['title'].map(lambda s: s.replace("•", ''))
+    df['title'] = df['title'].map(lambda s: s.replace('-', ''))
+    df['title'] = df['title'].map(lambda s: s.replace('%', ' por cento'))
+    df['title'] = df['title'].map(lambda s: s.replace('R$', ''))
+    df['title'] = df['title'].map(lambda s: s.replace('U$', ''))
+    df['title'] = df['title'].map(lambda s: s.replace('US$', ''))
+    df['title'] = df['title'].map(lambda s: s.replace('S&P 500', 'spx'))
+    df['title'] = df['title'].map(lambda s: s.replace('/', '@'))
+    df['title'] = df['title'].map(lambda s: legacy_remove_links(s))
+    df['title'] = df['title'].str.replace('(\#\w+.*?)', "", regex=True)
+    df['title'] = df['title'].str.replace('(\@\w+.*?)', "", regex=True)
+    df['title'] = df['title'].map(lambda s: str(s).lower())
+    df['title'] = df['title'].map(lambda s: s.translate(str.maketrans('', '', string.punctuation)))
+    df['title'] = df['title'].map(lambda s: legacy_remove_emojis(s))
+    df['title'] = df['title'].map(lambda s: s.replace('\n', ' '))
+    df['title'] = df['title'].map(lambda s: s.replace('\"', ''))
+    df['title'] = df['title'].map(lambda s: s.replace('“', ''))
+    df['title'] = df['title'].map(lambda s: s.replace('”', ''))
+    df['title'] = df['title'].map(lambda s: legacy_remove_valores(s))
+    df['title'] = df['title'].map(lambda s: s.strip())
+
+    return df['title']
+
+
+def load_titles(load_files) -> pd.Series:
+    """
+    Titles of all the publications of TICKERS (all dates) of a datasets loader.
+    """
+
+    frames = [load_files(ticker=ticker, start_dt=None, end_dt=None) for ticker in TICKERS]
+
+    return pd.concat([df['title'] for df in frames if not df.empty], ignore_index=True)
+
+
+def rows_per_sec(func, titles: pd.Series, repeat: int) -> float:
+    best = float('inf')
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(titles)
+        best = min(best, time.perf_counter() - start)
+
+    return len(titles) / best
+
+
+def main(repeat: int = 5, scale: int = 10) -> None:
+    normalizer = TextNormalizer()
+
+    datasets = {
+        'suno': load_titles(load_suno_files),
+        'twitter': load_titles(load_twitter_files),
+    }
+
+    for name, titles in datasets.items():
+        titles = pd.concat([titles] * scale, ignore_index=True)
+
+        # Same output, byte for byte
+        legacy, normalized = legacy_preprocessor(titles).tolist(), normalizer.normalize_batch(titles)
+
+        if legacy != normalized:
+            i = next(i for i, (a, b) in enumerate(zip(legacy, normalized)) if a != b)
+            sys.exit(f'{name}: outputs differ on title {i} {titles[i]!r}: {legacy[i]!r} (before) != {normalized[i]!r} (after)')
+
+        before = rows_per_sec(legacy_preprocessor, titles, repeat)
+        after = rows_per_sec(normalizer.normalize_batch, titles, repeat)
+
+        print(f'{name:<8} rows={len(titles):>7}  before={before:>10,.0f} rows/s  after={after:>10,.0f} rows/s  speedup={after / before:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
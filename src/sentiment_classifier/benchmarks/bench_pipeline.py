@@ -0,0 +1,191 @@
+"""
+Stage-by-stage benchmark of the sentiment classification pipeline.
+
+Synthetic corpora of 10k/100k/1M rows are sampled (with replacement) from
+the bundled Suno headlines and tweets, with random dates, tickers and
+retweet counts. For each source and size the script times
+simple_preprocessor, the LF application, the LabelModel fit, predict and the
+daily aggregation, and records the peak RSS of the run. Every run happens in
+a fresh process, so the peak RSS of one size does not leak into the next.
+
+Results are appended as JSON lines (one per source/size, with the git
+revision) to benchmarks/results/bench_pipeline.jsonl. With --baseline, the
+stage times are compared to the matching runs of a previous results file.
+Runs offline: only the bundled CSVs and `dicts` lexicons are used.
+
+Usage (from src/sentiment_classifier):
+    python benchmarks/bench_pipeline.py [--sizes 10000 100000 1000000] [--sources suno twitter] [--baseline results.jsonl]
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import platform
+import subprocess
+import warnings
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+RESULTS_FILE = os.path.join(THIS_DIR, 'results', 'bench_pipeline.jsonl')
+
+SIZES = [10000, 100000, 1000000]
+SOURCES = ['suno', 'twitter']
+STAGES = ['preprocessor', 'lfs', 'fit', 'predict', 'aggregation']
+
+START_DT = '2018-01-02'
+END_DT = '2022-07-02'
+
+
+def synthetic_corpus(source: str, size: int, seed: int = 123) -> pd.DataFrame:
+    """
+    Samples `size` rows shaped like the Suno or Twitter data, indexed by date.
+    """
+
+    from datasets import TICKERS, SUNO_FILE, TWITTER_RELATED_FILE, TWITTER_SPECIFIC_FILE
+
+    rng = np.random.RandomState(seed)
+
+    if source == 'twitter':
+        df = pd.concat([pd.read_csv(TWITTER_SPECIFIC_FILE, sep=';'), pd.read_csv(TWITTER_RELATED_FILE, sep=';')])
+        df = df.rename(columns={'text': 'title'})
+    else:
+        df = pd.read_csv(SUNO_FILE, sep=';')
+
+    df = df.iloc[rng.randint(0, len(df), size)].reset_index(drop=True)
+
+    # Random dates (second resolution), tickers and retweet counts
+    start, end = pd.Timestamp(START_DT).value // 10**9, pd.Timestamp(END_DT).value // 10**9
+    df['date'] = pd.to_datetime(rng.randint(start, end, size), unit='s')
+    df['ticker'] = rng.choice(TICKERS, size)
+
+    if source == 'twitter':
+        df['rt_count'] = rng.geometric(0.3, size) - 1
+
+    return df.set_index('date').sort_index()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(source: str, size: int) -> dict:
+    """
+    Times every stage of the pipeline on a synthetic corpus (in a worker process).
+    """
+
+    from aggregation import daily_sent_scores
+    from sent_classifier import SnorkelSentimentClassifier
+
+    df = synthetic_corpus(source, size)
+    tickers = df['ticker']
+
+    sc = SnorkelSentimentClassifier(df=df, source=source)
+    sc.fit_params = dict(sc.fit_params, progress_bar=False)
+
+    timings = dict()
+
+    start = time.perf_counter()
+    df = sc.simple_preprocessor(df)
+    timings['preprocessor'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    L = sc.label_matrix(df)
+    timings['lfs'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    label_model = sc.fit_label_model(L)
+    timings['fit'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_results = sc.predict_labels(df, L, label_model)
+    timings['predict'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    daily = daily_sent_scores(df_results.assign(ticker=tickers), source, by=['ticker'])
+    timings['aggregation'] = time.perf_counter() - start
+
+    return dict(source=source, rows=size, stages=timings, total=sum(timings.values()), peak_rss_mb=peak_rss_mb(),
+                fit_epochs=label_model.fit_stats['epochs'], days=len(daily))
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=THIS_DIR, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baseline(path: str) -> dict:
+    """
+    Last run of each (source, rows) in a results file.
+    """
+
+    baseline = dict()
+
+    with open(path, encoding='utf8') as f:
+        for line in f:
+            result = json.loads(line)
+            baseline[(result['source'], result['rows'])] = result
+
+    return baseline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of the sentiment classification pipeline stages.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--sources', nargs='+', choices=SOURCES, default=SOURCES)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    parser.add_argument('--baseline', default=None, help='results file of a previous version to compare with')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else dict()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    environment = dict(revision=git_revision(), python=platform.python_version(), pandas=pd.__version__, numpy=np.__version__,
+                       machine=platform.machine(), cpus=os.cpu_count())
+
+    header = f"{'source':<8} {'rows':>8} " + ' '.join(f'{stage:>13}' for stage in STAGES) + f" {'total (s)':>10} {'peak RSS (MB)':>14}"
+    print(header)
+    print('-' * len(header))
+
+    for source in args.sources:
+        for size in args.sizes:
+            # Fresh process per run: peak RSS is per run
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                result = executor.submit(run, source, size).result()
+
+            result = dict(result, timestamp=datetime.now().isoformat(timespec='seconds'), **environment)
+
+            with open(args.output, 'a', encoding='utf8') as f:
+                f.write(json.dumps(result) + '\n')
+
+            print(f'{source:<8} {size:>8} ' + ' '.join(f"{result['stages'][stage]:>13.3f}" for stage in STAGES) +
+                  f" {result['total']:>10.2f} {result['peak_rss_mb']:>14.0f}")
+
+            previous = baseline.get((source, size))
+
+            if previous is not None:
+                # Ratio > 1 means slower than the baseline
+                print(f"{'vs ' + str(previous.get('revision')):>17} " +
+                      ' '.join(f"{result['stages'][stage] / previous['stages'][stage]:>12.2f}x" for stage in STAGES) +
+                      f" {result['total'] / previous['total']:>9.2f}x {result['peak_rss_mb'] / previous['peak_rss_mb']:>13.2f}x")
+
+    print(f'Results appended to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Microbenchmark of the regex LFs.
+
+Times the precompiled anchored patterns (RegexLFEngine) against
+`re.search(<original pattern>, text.lower(), flags=re.I)` on the raw and
+preprocessed Suno and Twitter texts, and on random texts built from the
+patterns' keywords. The equivalence of the votes is tested in
+tests/test_regex_lfs.py; the script also exits with an error if any vote
+differs.
+
+Usage (from src/sentiment_classifier):
+    python benchmarks/bench_regex_lfs.py
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import warnings
+warnings.simplefilter(action='ignore', category=FutureWarning)
+
+import numpy as np
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from regex_lfs import RegexLFEngine
+from text_normalizer import text_normalizer
+from sent_classifier import SnorkelSentimentClassifier
+
+SUNO_FILE = os.path.join(THIS_DIR, '../../crawlers/suno/final/df_suno_with_mentions.csv')
+TWITTER_FILE = os.path.join(THIS_DIR, '../../crawlers/twitter/final/df_twitter_related_users_with_mentions.csv')
+
+PATTERNS = {name: pattern for name, (pattern, _) in SnorkelSentimentClassifier.regex_lfs.items()}
+
+
+def golden_votes(texts: list) -> np.ndarray:
+    """
+    Votes of the LFs as originally written (uncompiled patterns on lowercased text).
+    """
+
+    return np.array([[re.search(pattern, text.lower(), flags=re.I) is not None for pattern in PATTERNS.values()]
+                     for text in texts], dtype=bool).reshape(len(texts), len(PATTERNS))
+
+
+def random_texts(n: int, seed: int = 123) -> list:
+    """
+    Random texts made of the keywords of the patterns, filler words and line breaks.
+    """
+
+    keywords = set()
+    for pattern in PATTERNS.values():
+        keywords.update(token for token in re.split(r'\.\*|\|', pattern) if token)
+
+    vocabulary = sorted(keywords) + ['a', 'de', 'vale', 'petr4', ' ', '\n', 'FECH', 'Alta', 'ç', '.', '*']
+
+    rng = random.Random(seed)
+
+    return [''.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 40))) for _ in range(n)]
+
+
+def timed(func, texts: list, repeat: int = 3):
+    best = float('inf')
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(texts)
+        best = min(best, time.perf_counter() - start)
+
+    return result, best
+
+
+def main() -> None:
+    engine = RegexLFEngine(PATTERNS)
+
+    raw = pd.concat([pd.read_csv(SUNO_FILE, sep=';')['title'], pd.read_csv(TWITTER_FILE, sep=';')['text']]).tolist()
+
+    corpora = {
+        'raw': raw,
+        'preprocessed': text_normalizer.normalize_batch(raw),
+        'random': random_texts(20000),
+    }
+
+    for name, texts in corpora.items():
+        golden, golden_time = timed(golden_votes, texts, repeat=1)
+        votes, engine_time = timed(engine.match_batch, texts)
+
+        if not (golden == votes).all():
+            sys.exit(f'regex LF votes differ on the {name} corpus')
+
+        print(f'{name:<13} texts={len(texts):>6}  hits={golden.sum(axis=0).tolist()}  '
+              f'original={len(texts) / golden_time:>10,.0f} texts/s  anchored={len(texts) / engine_time:>10,.0f} texts/s  '
+              f'speedup={golden_time / engine_time:.0f}x')
+
+    print('Votes are identical.')
+
+
+if __name__ == '__main__':
+    main()
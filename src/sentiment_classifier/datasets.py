@@ -0,0 +1,169 @@
+import os
+import sys
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SUNO_FILE = os.path.join(THIS_DIR, '..', 'crawlers', 'suno', 'final', 'df_suno_with_mentions.csv')
+TWITTER_RELATED_FILE = os.path.join(THIS_DIR, '..', 'crawlers', 'twitter', 'final', 'df_twitter_related_users_with_mentions.csv')
+TWITTER_SPECIFIC_FILE = os.path.join(THIS_DIR, '..', 'crawlers', 'twitter', 'final', 'df_twitter_specific_users_with_mentions.csv')
+
+# Tweet store written by crawlers/twitter/tweet_store.py
+TWEET_STORE_DIR = os.path.join(THIS_DIR, '..', 'crawlers', 'twitter', 'tweet_store')
+
+# News archive written by crawlers/news_archive.py
+NEWS_ARCHIVE_FILE = os.path.join(THIS_DIR, '..', 'crawlers', 'news_archive.sqlite')
+
+# Mention table written by named_entity_recognition/batch_ner.py
+MENTIONS_DIR = os.path.join(THIS_DIR, '..', 'named_entity_recognition', 'data', 'mentions')
+
+TICKERS = ['B3SA3', 'EQTL3', 'ITUB4', 'PETR4', 'VALE3']
+
+
+def load_suno_files(ticker: str, start_dt: str, end_dt: str) -> pd.DataFrame:
+    """
+    Loads Suno Research news with mentions to `ticker`.
+    """
+
+    df_news = pd.read_csv(SUNO_FILE, sep=';')
+
+    # Convert date to datetime format
+    df_news['date'] = pd.to_datetime(df_news['date'], format='%Y-%m-%d %H:%M:%S')
+
+    # Remove duplicates
+    df_news = df_news.drop_duplicates(subset=['date', 'title'], keep ='first')
+
+    # Set date column as index
+    df_news.set_index('date', inplace=True)
+
+    # Order by date
+    df_news.sort_index(inplace=True)
+
+    # Add ticker Info
+    df_news = df_news[df_news['ticker'] == ticker.upper()]
+
+    # Filter Dates
+    df_news = df_news.loc[start_dt:end_dt]
+
+    return df_news
+
+
+def load_twitter_files(ticker: str, start_dt: str, end_dt: str) -> pd.DataFrame:
+    """
+    Loads tweets (specific and related users) with mentions to `ticker`.
+    """
+
+    df_related = pd.read_csv(TWITTER_RELATED_FILE, sep=';')
+    df_specific = pd.read_csv(TWITTER_SPECIFIC_FILE, sep=';')
+
+    df_twitter = pd.concat([df_specific, df_related])
+
+    df_twitter.rename(columns={'text': 'title'}, inplace=True)
+
+    # Convert date to datetime format
+    df_twitter['date'] = pd.to_datetime(df_twitter['created_at'], format='%Y-%m-%d %H:%M:%S')
+
+    # Remove duplicates
+    df_twitter = df_twitter.drop_duplicates(subset=['date', 'title', 'screen_name'], keep ='first')
+
+    # Set date column as index
+    df_twitter.set_index('date', inplace=True)
+
+    # Order by date
+    df_twitter.sort_index(inplace=True)
+
+    # Add ticker Info
+    df_twitter = df_twitter[df_twitter['ticker'] == ticker.upper()]
+
+    # Filter Dates
+    df_twitter = df_twitter.loc[start_dt:end_dt]
+
+    if df_twitter.empty:
+        return pd.DataFrame()
+
+    return df_twitter
+
+
+def load_tweet_store(ticker: str, start_dt: str, end_dt: str, store_dir: str = TWEET_STORE_DIR) -> pd.DataFrame:
+    """
+    Loads tweets with mentions to `ticker` from the Parquet tweet store (only
+    the partitions of the date range are read). The result has the same
+    columns as load_twitter_files, with compact types.
+    """
+
+    sys.path.insert(0, os.path.join(THIS_DIR, '..', 'crawlers', 'twitter'))
+    from tweet_store import load_tweets
+
+    df_twitter = load_tweets(ticker, start_dt, end_dt, store_dir=store_dir)
+
+    if df_twitter.empty:
+        return pd.DataFrame()
+
+    df_twitter.rename(columns={'text': 'title'}, inplace=True)
+
+    df_twitter['date'] = df_twitter['created_at']
+    df_twitter['created_at'] = df_twitter['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Remove duplicates
+    df_twitter = df_twitter.drop_duplicates(subset=['date', 'title', 'screen_name'], keep='first')
+
+    # Set date column as index
+    df_twitter.set_index('date', inplace=True)
+
+    # Order by date
+    df_twitter.sort_index(inplace=True)
+
+    return df_twitter
+
+
+def load_archive_news(ticker: str, start_dt: str, end_dt: str, sources: tuple = ('suno',), archive_path: str = NEWS_ARCHIVE_FILE) -> pd.DataFrame:
+    """
+    Loads the news of `sources` with mentions to `ticker` from the news
+    archive (an index lookup instead of a scan of the dumps). The result has
+    the columns of load_suno_files.
+    """
+
+    sys.path.insert(0, os.path.join(THIS_DIR, '..', 'crawlers'))
+    from news_archive import NewsArchive
+
+    archive = NewsArchive(archive_path)
+    df_news = archive.search(ticker, start_dt, end_dt, sources=sources)
+    archive.close()
+
+    if df_news.empty:
+        return pd.DataFrame()
+
+    df_news['ticker'] = ticker.upper()
+
+    return df_news[['topic', 'title', 'search_date', 'url', 'tags', 'ticker']]
+
+
+def load_mentions(source: str, ticker: str, start_dt: str, end_dt: str, mentions_dir: str = MENTIONS_DIR) -> pd.DataFrame:
+    """
+    Loads the publications of `source` with mentions to `ticker` from the
+    Parquet mention table. Only the row groups of the ticker and date range
+    are read (predicate pushdown). The result has the same columns as
+    load_suno_files/load_twitter_files.
+    """
+
+    filters = [('source', '=', source),
+               ('ticker', '=', ticker.upper()),
+               ('date', '>=', pd.Timestamp(start_dt)),
+               ('date', '<', pd.Timestamp(end_dt) + pd.Timedelta(days=1))]
+
+    df = pd.read_parquet(mentions_dir, filters=filters).drop(columns='source')
+
+    if df.empty:
+        return pd.DataFrame()
+
+    if source == 'twitter':
+        df = df.rename(columns={'text_id': 'tweet_id', 'search_date': 'search_dt'})
+        df['created_at'] = df['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Set date column as index
+    df.set_index('date', inplace=True)
+
+    # Order by date
+    df.sort_index(inplace=True)
+
+    return df
@@ -0,0 +1,92 @@
+"""
+LabelModel with fit telemetry and early stopping.
+
+snorkel has no callback API for LabelModel.fit, so the telemetry and the
+convergence check hook into its private `_execute_logging`, which fit calls
+once per epoch, outside any try block, in the snorkel versions of
+SUPPORTED_SNORKEL_VERSIONS (checked against their source; see also
+tests/test_early_stopping.py). Convergence stops training by raising out of
+that hook. On any other snorkel version early stopping is disabled (with a
+warning) and the model trains for the full `n_epochs`.
+"""
+
+import time
+import warnings
+import numpy as np
+
+import snorkel
+from snorkel.labeling.model import LabelModel
+
+# snorkel versions whose LabelModel.fit calls _execute_logging every epoch
+SUPPORTED_SNORKEL_VERSIONS = ('0.9.', '0.10.')
+
+
+def early_stopping_supported() -> bool:
+    return snorkel.__version__.startswith(SUPPORTED_SNORKEL_VERSIONS) and hasattr(LabelModel, '_execute_logging')
+
+
+class _Converged(Exception):
+    pass
+
+
+class MonitoredLabelModel(LabelModel):
+    """
+    LabelModel that records fit telemetry and can stop once the loss plateaus.
+
+    With `tol=None` it trains for the full `n_epochs`, exactly like LabelModel.
+    Otherwise training stops when the loss has not improved by more than `tol`
+    over the best loss seen for `patience` consecutive epochs.
+
+    After fit, `fit_stats` holds the epochs run, wall time, final loss and
+    whether training converged.
+    """
+
+    def fit(self, L_train: np.ndarray, tol: float = None, patience: int = 100, **kwargs) -> None:
+
+        if tol is not None and not early_stopping_supported():
+            warnings.warn(f'Early stopping is not supported on snorkel {snorkel.__version__}: training for all the epochs')
+            tol = None
+
+        self.tol = tol
+        self.patience = patience
+
+        self.epochs_run = 0
+        self.final_loss = None
+        self.converged = False
+
+        self._best_loss = float('inf')
+        self._epochs_without_improvement = 0
+
+        start = time.perf_counter()
+
+        try:
+            super().fit(L_train, **kwargs)
+        except _Converged:
+            # Same post-processing LabelModel.fit applies after its last epoch
+            self._clamp_params()
+            self._break_col_permutation_symmetry()
+            self.eval()
+
+        self.fit_stats = dict(epochs=self.epochs_run,
+                              wall_time=time.perf_counter() - start,
+                              final_loss=self.final_loss,
+                              converged=self.converged)
+
+    def _execute_logging(self, loss):
+        metrics_dict = super()._execute_logging(loss)
+
+        self.epochs_run += 1
+        self.final_loss = loss.item()
+
+        if self.tol is not None:
+            if self._best_loss - self.final_loss > self.tol:
+                self._best_loss = self.final_loss
+                self._epochs_without_improvement = 0
+            else:
+                self._epochs_without_improvement += 1
+
+            if self._epochs_without_improvement >= self.patience:
+                self.converged = True
+                raise _Converged()
+
+        return metrics_dict
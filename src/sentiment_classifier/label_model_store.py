@@ -0,0 +1,74 @@
+import os
+import json
+import uuid
+from datetime import datetime
+
+from snorkel.labeling.model import LabelModel
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Default directory for stored models
+MODELS_DIR = os.path.join(THIS_DIR, 'models')
+
+
+class LabelModelStore:
+    """
+    Saves a fitted LabelModel together with the fingerprint of the LF set used
+    to fit it. A stored model is only returned when the fingerprint matches,
+    so changing the LFs (or their dictionaries and patterns) forces a refit.
+
+    Every saved model gets a new unique `model_id` (labels predicted by one
+    model are never taken for another's, even when fitted in the same second).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.metadata_path = os.path.splitext(path)[0] + '.json'
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) and os.path.exists(self.metadata_path)
+
+    def metadata(self) -> dict:
+        with open(self.metadata_path, encoding='utf8') as f:
+            return json.load(f)
+
+    def save(self, label_model: LabelModel, fingerprint: str, n_rows: int) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        label_model.save(self.path)
+
+        metadata = dict()
+        metadata['fingerprint'] = fingerprint
+        metadata['cardinality'] = label_model.cardinality
+        metadata['n_rows'] = n_rows
+        metadata['fitted_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        metadata['model_id'] = uuid.uuid4().hex
+
+        with open(self.metadata_path, 'w', encoding='utf8') as f:
+            json.dump(metadata, f, ensure_ascii=False)
+
+    def model_id(self) -> str:
+        """
+        Unique id of the stored model (None for models saved without one).
+        """
+
+        return self.metadata().get('model_id')
+
+    def load(self, fingerprint: str):
+        """
+        Returns the stored LabelModel, or None if there is no model fitted with
+        the LF set identified by `fingerprint`.
+        """
+
+        if not self.exists():
+            return None
+
+        metadata = self.metadata()
+
+        if metadata['fingerprint'] != fingerprint:
+            return None
+
+        label_model = LabelModel(cardinality=metadata['cardinality'], device='cpu', verbose=False)
+        label_model.load(self.path)
+
+        return label_model
@@ -0,0 +1,86 @@
+import os
+import time
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DICTS_DIR = os.path.join(THIS_DIR, 'dicts')
+
+# Dictionaries used by the Labelling Functions (name -> path inside DICTS_DIR)
+LEXICON_FILES = {
+    'pos_adj': os.path.join('final', 'pos_adj.txt'),
+    'neg_adj': os.path.join('final', 'neg_adj.txt'),
+    'pos_verbs': 'pos_verbs.txt',
+    'neg_verbs': 'neg_verbs.txt',
+    'happiness': os.path.join('dicts_emocoes', 'alegria.txt'),
+    'sadness': os.path.join('dicts_emocoes', 'tristeza.txt'),
+}
+
+
+class LexiconIndex:
+    """
+    Loads the sentiment dictionaries once per process and keeps them as sets.
+
+    Each dictionary is reloaded only when its file changes on disk. The
+    modification time is checked at most once every `check_interval` seconds,
+    so querying the index from the LFs does not touch the filesystem per row.
+    """
+
+    def __init__(self, dicts_dir: str = DICTS_DIR, files: dict = LEXICON_FILES, check_interval: float = 1.0) -> None:
+        self.dicts_dir = dicts_dir
+        self.files = dict(files)
+        self.check_interval = check_interval
+
+        self._words = dict()
+        self._mtimes = dict()
+        self._last_check = dict()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.dicts_dir, self.files[name])
+
+    def _load(self, name: str) -> None:
+        path = self.path(name)
+        mtime = os.path.getmtime(path)
+
+        with open(path, encoding='utf8') as file:
+            words = frozenset(line.rstrip() for line in file)
+
+        # Blank lines never match a token
+        self._words[name] = words - {''}
+        self._mtimes[name] = mtime
+
+    def get(self, name: str) -> frozenset:
+        """
+        Returns the set of words of the dictionary `name`.
+        """
+
+        now = time.monotonic()
+
+        if name not in self._words:
+            self._load(name)
+            self._last_check[name] = now
+
+        elif now - self._last_check[name] >= self.check_interval:
+            self._last_check[name] = now
+            if os.path.getmtime(self.path(name)) != self._mtimes[name]:
+                self._load(name)
+
+        return self._words[name]
+
+    def contains_any(self, name: str, text: str) -> bool:
+        """
+        Checks if any token of `text` (split on whitespace) is in the dictionary `name`.
+        """
+
+        return not self.get(name).isdisjoint(text.split())
+
+    def reload(self) -> None:
+        """
+        Forces all loaded dictionaries to be read again from disk.
+        """
+
+        for name in list(self._words):
+            self._load(name)
+
+
+# Index shared by every classifier in the process
+lexicon_index = LexiconIndex()
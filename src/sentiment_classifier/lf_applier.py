@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from lexicon import lexicon_index
+from regex_lfs import RegexLFEngine
+
+ABSTAIN = -1
+
+
+class VectorizedLFApplier:
+    """
+    Builds the label matrix `L` column-wise instead of calling every LF per row.
+
+    - Dictionary LFs: the corpus is tokenized once into a sparse document x token
+      matrix, and all dictionaries are matched with one sparse product.
+    - Regex LFs: all patterns are precompiled once by the RegexLFEngine.
+    - Any other LF falls back to the row-by-row call used by PandasLFApplier.
+
+    The result is the same matrix returned by PandasLFApplier, stored as int8.
+    """
+
+    def __init__(self, lfs: list, dictionary_lfs: dict = None, regex_lfs: dict = None, lexicon=lexicon_index, field: str = 'title') -> None:
+        """
+        `dictionary_lfs` maps a LF name to (lexicon name, label) and `regex_lfs`
+        maps a LF name to (pattern, label).
+        """
+
+        self.lfs = lfs
+        self.dictionary_lfs = dictionary_lfs or dict()
+        self.regex_lfs = regex_lfs or dict()
+        self.lexicon = lexicon
+        self.field = field
+
+    def _tokenize(self, texts: pd.Series):
+        """
+        Returns the binary document x token matrix and the token vocabulary.
+        """
+
+        tokens = texts.str.split().explode()
+        tokens = tokens[tokens.notna()]
+
+        codes, vocabulary = pd.factorize(tokens)
+        docs = tokens.index.to_numpy()
+
+        X = sparse.csr_matrix((np.ones(len(codes), dtype=np.int32), (docs, codes)),
+                              shape=(len(texts), len(vocabulary)))
+
+        return X, pd.Index(vocabulary)
+
+    def _dictionary_hits(self, texts: pd.Series, lexicon_names: list) -> np.ndarray:
+        """
+        Returns a boolean (documents x dictionaries) matrix of dictionary hits.
+        """
+
+        X, vocabulary = self._tokenize(texts)
+
+        V = np.column_stack([vocabulary.isin(self.lexicon.get(name)) for name in lexicon_names]).astype(np.int32)
+
+        return (X @ V) > 0
+
+    def apply(self, df: pd.DataFrame, progress_bar: bool = False) -> np.ndarray:
+
+        L = np.full((len(df), len(self.lfs)), ABSTAIN, dtype=np.int8)
+
+        if len(df) == 0:
+            return L
+
+        # LFs lowercase the text before matching
+        texts = df[self.field].reset_index(drop=True).str.lower()
+
+        dict_columns = [j for j, lf in enumerate(self.lfs) if lf.name in self.dictionary_lfs]
+
+        if dict_columns:
+            specs = [self.dictionary_lfs[self.lfs[j].name] for j in dict_columns]
+            hits = self._dictionary_hits(texts, [lexicon_name for lexicon_name, _ in specs])
+
+            for k, (j, (_, label)) in enumerate(zip(dict_columns, specs)):
+                L[hits[:, k], j] = label
+
+        regex_columns = [j for j, lf in enumerate(self.lfs) if lf.name in self.regex_lfs]
+
+        if regex_columns:
+            specs = [self.regex_lfs[self.lfs[j].name] for j in regex_columns]
+            engine = RegexLFEngine({self.lfs[j].name: pattern for j, (pattern, _) in zip(regex_columns, specs)})
+            matches = engine.match_batch(texts.tolist())
+
+            for k, (j, (_, label)) in enumerate(zip(regex_columns, specs)):
+                L[matches[:, k], j] = label
+
+        for j, lf in enumerate(self.lfs):
+            if lf.name not in self.dictionary_lfs and lf.name not in self.regex_lfs:
+                # Row-by-row fallback
+                L[:, j] = [lf(row) for _, row in df.iterrows()]
+
+        return L
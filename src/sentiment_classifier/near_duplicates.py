@@ -0,0 +1,266 @@
+"""
+Near-duplicate detection of publications (MinHash + LSH).
+
+The same event is covered by several news sources, and tweets repeat
+headlines with small edits, so exact (date, title) deduplication keeps
+many copies. Here every publication (normalized title, plus its full text
+when there is one) is reduced to a MinHash signature of its character
+shingles, and the signatures are split in bands (LSH): two publications are
+candidates when they share all the rows of a band and were published at
+most `window` apart. Within a bucket, each publication is compared only
+with its predecessor and the first publication of its window (see
+candidate_pairs), so the work is linear in the size of the buckets, even
+for thousands of copies of one tweet. Candidates whose estimated Jaccard
+similarity reaches `threshold` are linked, and the clusters are the
+connected components (a chain of close publications can span more than one
+window).
+
+deduplicate keeps one publication per cluster, the first published, with
+the size of its cluster in `cluster_size` (used as a weight by
+aggregation.publication_scores). deduplicate_sources does the same across
+sources (the same story on several news sites).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from text_normalizer import text_normalizer
+
+# Mersenne prime of the shingle hashes and of the MinHash permutations
+PRIME = (1 << 31) - 1
+BASE = 1000003
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 32
+
+THRESHOLD = 0.6
+WINDOW = '1D'
+
+
+def shingle_hashes(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    Distinct hashes of the character k-grams of a text (the whole text when shorter).
+    """
+
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+    if len(codes) == 0:
+        return codes
+
+    k = min(k, len(codes))
+    n = len(codes) - k + 1
+
+    hashes = np.zeros(n, dtype=np.uint64)
+
+    # Polynomial rolling hash of every k-gram, one vectorized step per position
+    for j in range(k):
+        hashes = (hashes * BASE + codes[j:j + n]) % PRIME
+
+    return np.unique(hashes)
+
+
+class MinHasher:
+    """
+    MinHash signatures with `num_perm` random (a * x + b) mod PRIME permutations.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE, seed: int = 123) -> None:
+        rng = np.random.RandomState(seed)
+
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.randint(1, PRIME, num_perm).astype(np.uint64)[:, None]
+        self.b = rng.randint(0, PRIME, num_perm).astype(np.uint64)[:, None]
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text, self.shingle_size)
+
+        # Empty texts get an all-PRIME signature (see near_duplicate_clusters)
+        if len(hashes) == 0:
+            return np.full(self.num_perm, PRIME, dtype=np.uint64)
+
+        return ((self.a * hashes + self.b) % PRIME).min(axis=1)
+
+    def signatures(self, texts) -> np.ndarray:
+        """
+        (len(texts), num_perm) matrix of signatures.
+        """
+
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+
+        for i, text in enumerate(texts):
+            signatures[i] = self.signature(text)
+
+        return signatures
+
+
+def candidate_pairs(signatures: np.ndarray, times: np.ndarray, window: int, bands: int = BANDS) -> np.ndarray:
+    """
+    (i, j) pairs (i < j) sharing a band bucket and published at most `window` apart.
+
+    The members of a bucket are sorted by date and each one is paired only
+    with its predecessor and with the first member of its window, so there
+    are at most two pairs per member and band, even for a bucket of
+    thousands of identical tweets. The clusters (connected components) make
+    the links transitive: two similar publications of a bucket end up
+    together through a chain of similar neighbours, found in this or in
+    another band.
+    """
+
+    rows = signatures.shape[1] // bands
+    n = len(signatures)
+    pairs = list()
+
+    # Dense rank of the dates, and rank of the first date of the window of each one
+    unique_times, time_ranks = np.unique(times, return_inverse=True)
+    window_ranks = np.searchsorted(unique_times, times - window, side='left')
+
+    for band in range(bands):
+        band_rows = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        _, buckets = np.unique(band_rows.view(np.dtype((np.void, band_rows.dtype.itemsize * rows))).ravel(), return_inverse=True)
+
+        # (bucket, date rank) as one sortable key
+        span = len(unique_times) + 1
+        keys = buckets.astype(np.int64) * span + time_ranks
+        order = np.argsort(keys, kind='stable')
+
+        sorted_buckets, sorted_times = buckets[order], times[order]
+        positions = np.arange(n)
+
+        # Predecessor in the bucket and in the window
+        follows = positions[1:][(sorted_buckets[1:] == sorted_buckets[:-1]) & (sorted_times[1:] - sorted_times[:-1] <= window)]
+        pairs.append(np.stack([order[follows - 1], order[follows]], axis=1))
+
+        # First member of the window in the bucket (when it is not the predecessor)
+        first = np.searchsorted(keys[order], sorted_buckets.astype(np.int64) * span + window_ranks[order], side='left')
+        far = positions[first < positions - 1]
+        pairs.append(np.stack([order[first[far]], order[far]], axis=1))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+
+    return np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0)
+
+
+def cluster_signatures(signatures: np.ndarray, times: np.ndarray, window: int, threshold: float = THRESHOLD, bands: int = BANDS,
+                       chunk_size: int = 100000) -> np.ndarray:
+    """
+    Cluster label of every MinHash signature (0, 1, ...). `times` and
+    `window` are integers (e.g. nanoseconds).
+    """
+
+    pairs = candidate_pairs(signatures, times, window, bands)
+    linked = list()
+
+    # Estimated Jaccard similarity: fraction of equal MinHashes (empty texts are never linked)
+    for i in range(0, len(pairs), chunk_size):
+        chunk = pairs[i:i + chunk_size]
+
+        similarity = (signatures[chunk[:, 0]] == signatures[chunk[:, 1]]).mean(axis=1)
+        nonempty = signatures[chunk[:, 0], 0] != PRIME
+
+        linked.append(chunk[(similarity >= threshold) & nonempty])
+
+    pairs = np.concatenate(linked) if linked else pairs
+
+    graph = sparse.coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(signatures), len(signatures)))
+
+    return connected_components(graph, directed=False)[1]
+
+
+def near_duplicate_clusters(texts, times, window: str = WINDOW, threshold: float = THRESHOLD, num_perm: int = NUM_PERM,
+                            bands: int = BANDS, shingle_size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    Cluster label of every text (0, 1, ...). `times` are the publication
+    dates; only publications at most `window` apart are linked.
+    """
+
+    signatures = MinHasher(num_perm, shingle_size).signatures(list(texts))
+
+    return cluster_signatures(signatures, pd.DatetimeIndex(times).asi8, pd.Timedelta(window).value, threshold, bands)
+
+
+def normalized_texts(df: pd.DataFrame, columns: list = None) -> list:
+    """
+    Normalized `columns` of every row, joined (default: title, and text when the frame has it).
+    """
+
+    columns = columns or [column for column in ['title', 'text'] if column in df.columns]
+
+    texts = df[columns[0]].fillna('').astype(str)
+
+    for column in columns[1:]:
+        texts = texts + ' ' + df[column].fillna('').astype(str)
+
+    return text_normalizer.normalize_batch(texts)
+
+
+def representatives(texts: list, times, **cluster_params) -> tuple:
+    """
+    Positions of the first publication of every cluster (in the order of
+    `texts`) and the sizes of their clusters.
+    """
+
+    labels = near_duplicate_clusters(texts, times, **cluster_params)
+
+    # Stable sort by date: the first row of each cluster is its first publication
+    order = np.argsort(pd.DatetimeIndex(times).asi8, kind='stable')
+    _, first = np.unique(labels[order], return_index=True)
+    positions = np.sort(order[first])
+
+    return positions, np.bincount(labels)[labels[positions]]
+
+
+def deduplicate(df: pd.DataFrame, columns: list = None, **cluster_params) -> pd.DataFrame:
+    """
+    One publication per near-duplicate cluster of `df` (indexed by date, as
+    returned by the datasets loaders): the first published, with the size of
+    its cluster in `cluster_size`.
+
+    The texts compared are the normalized `columns` joined (see
+    normalized_texts). `cluster_params` go to near_duplicate_clusters
+    (window, threshold, ...).
+    """
+
+    if df.empty:
+        return df.assign(cluster_size=pd.Series(dtype='int64'))
+
+    positions, sizes = representatives(normalized_texts(df, columns), df.index, **cluster_params)
+
+    return df.iloc[positions].assign(cluster_size=sizes)
+
+
+def deduplicate_sources(frames: dict, columns: list = None, **cluster_params) -> dict:
+    """
+    deduplicate over the publications of several sources together
+    ({source: frame}, e.g. the Suno and Money Times news of one ticker).
+    Returns {source: representatives}: a cluster is kept once, in the
+    source that published it first, with the copies of every source in its
+    `cluster_size`.
+    """
+
+    nonempty = {source: df for source, df in frames.items() if not df.empty}
+
+    if not nonempty:
+        return dict(frames)
+
+    texts = [text for df in nonempty.values() for text in normalized_texts(df, columns)]
+    times = pd.DatetimeIndex(np.concatenate([df.index.asi8 for df in nonempty.values()]))
+
+    positions, sizes = representatives(texts, times, **cluster_params)
+
+    results = dict(frames)
+    start = 0
+
+    # Positions start..end of the concatenated texts are the rows of one source
+    for source, df in nonempty.items():
+        end = start + len(df)
+        kept = (positions >= start) & (positions < end)
+
+        results[source] = df.iloc[positions[kept] - start].assign(cluster_size=sizes[kept])
+        start = end
+
+    return results
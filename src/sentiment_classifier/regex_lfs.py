@@ -0,0 +1,69 @@
+import re
+import numpy as np
+
+# Patterns with groups, classes, escapes or counted repetitions are compiled as they are
+_COMPLEX_PATTERN = re.compile(r'[()\[\]{}\\]')
+
+
+def anchor_pattern(pattern: str) -> str:
+    """
+    Drops the leading and trailing '.*' of each alternative of `pattern`.
+
+    re.search already looks for a match at every position and only needs one,
+    so `.*pag.*dividendo.*` matches exactly the same texts as `pag.*dividendo`,
+    without backtracking over the whole line for every start position.
+    """
+
+    if _COMPLEX_PATTERN.search(pattern):
+        return pattern
+
+    alternatives = list()
+
+    for alternative in pattern.split('|'):
+        while alternative.startswith('.*') and not alternative.startswith(('.*?', '.*+')):
+            alternative = alternative[2:]
+
+        while alternative.endswith('.*'):
+            alternative = alternative[:-2]
+
+        alternatives.append(alternative)
+
+    return '|'.join(alternatives)
+
+
+def compile_lf_pattern(pattern: str, flags: int = re.I) -> re.Pattern:
+    return re.compile(anchor_pattern(pattern), flags)
+
+
+class RegexLFEngine:
+    """
+    Evaluates the regex LFs with their patterns precompiled in anchored form.
+    """
+
+    def __init__(self, patterns: dict, flags: int = re.I) -> None:
+        """
+        `patterns` maps a LF name to its regex pattern.
+        """
+
+        self.names = list(patterns)
+        self.compiled = {name: compile_lf_pattern(pattern, flags) for name, pattern in patterns.items()}
+
+    def votes(self, text: str) -> dict:
+        """
+        Returns {LF name: matched} for a single text.
+        """
+
+        return {name: regex.search(text) is not None for name, regex in self.compiled.items()}
+
+    def match_batch(self, texts: list) -> np.ndarray:
+        """
+        Returns a boolean (texts x LFs) matrix, columns in the order of `patterns`.
+        """
+
+        matches = np.zeros((len(texts), len(self.names)), dtype=bool)
+
+        for j, name in enumerate(self.names):
+            search = self.compiled[name].search
+            matches[:, j] = [search(text) is not None for text in texts]
+
+        return matches
@@ -0,0 +1,124 @@
+import os
+import time
+import sqlite3
+import hashlib
+import numpy as np
+
+# SQLite limit of variables per statement is 999 on older builds
+BATCH_SIZE = 900
+
+# Fraction of max_entries freed by an eviction, so the table is not recounted on every put
+EVICT_FRACTION = 0.1
+
+
+def text_key(text: str, version: str) -> str:
+    """
+    Cache key of a normalized text for a given LF set version.
+    """
+
+    return hashlib.blake2b(f'{version}\x00{text}'.encode('utf8'), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk (SQLite) cache of LF votes and final labels keyed by the hash of
+    the normalized text and of the LF set.
+
+    A label is only reused when it was predicted by the same LabelModel
+    version. The cache keeps at most `max_entries` texts: once over, the
+    least recently used ones are evicted down to (1 - EVICT_FRACTION) *
+    max_entries.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                votes BLOB NOT NULL,
+                label INTEGER,
+                model_version TEXT,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+        self.conn.commit()
+
+        # Upper bound of len(self): every put counts as new keys (replaced ones included)
+        self.count = len(self)
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def get(self, keys: list) -> dict:
+        """
+        Returns {key: (votes, label, model_version)} for the keys found in the cache.
+        """
+
+        found = dict()
+
+        for i in range(0, len(keys), BATCH_SIZE):
+            batch = keys[i:i + BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+
+            rows = self.conn.execute(
+                f'SELECT key, votes, label, model_version FROM results WHERE key IN ({placeholders})', batch
+            )
+
+            for key, votes, label, model_version in rows:
+                found[key] = (np.frombuffer(votes, dtype=np.int8), label, model_version)
+
+        # Mark hits as recently used
+        now = time.time()
+        self.conn.executemany('UPDATE results SET last_used = ? WHERE key = ?', [(now, key) for key in found])
+        self.conn.commit()
+
+        return found
+
+    def put(self, keys: list, votes: np.ndarray, labels: list = None, model_version: str = None) -> None:
+        """
+        Stores the vote vectors (rows of `votes`) and, optionally, the labels of `keys`.
+        """
+
+        if labels is None:
+            labels = [None] * len(keys)
+
+        now = time.time()
+        votes = votes.astype(np.int8)
+
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO results (key, votes, label, model_version, last_used) VALUES (?, ?, ?, ?, ?)',
+            [(key, votes[i].tobytes(), None if labels[i] is None else int(labels[i]), model_version, now) for i, key in enumerate(keys)]
+        )
+        self.conn.commit()
+
+        self.count += len(keys)
+
+        # The table is only counted when the bound crosses max_entries
+        if self.count > self.max_entries:
+            self.evict()
+
+    def evict(self) -> None:
+        self.count = len(self)
+
+        if self.count <= self.max_entries:
+            return
+
+        excess = self.count - int(self.max_entries * (1 - EVICT_FRACTION))
+
+        self.conn.execute(
+            'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)', (excess,)
+        )
+        self.conn.commit()
+
+        self.count -= excess
+
+    def close(self) -> None:
+        self.conn.close()
@@ -1,62 +1,46 @@
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
-import re
-import string
+import os
+import json
+import time
+import hashlib
+import inspect
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
 # Snorkel
 from snorkel.labeling import LFAnalysis
-from snorkel.labeling import PandasLFApplier
 from snorkel.labeling.model import LabelModel
 from snorkel.labeling import labeling_function
 
-# General Functions
-
-def remove_emojis(sentence):
-    "Remoção de Emojis nas mensagens de texto."
-
-    # Padrões dos Emojis
-    emoji_pattern = re.compile("["
-                u"\U0001F600-\U0001F64F"  # emoticons
-                u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-                u"\U0001F680-\U0001F6FF"  # transport & map symbols
-                u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-                u"\U00002702-\U000027B0"
-                u"\U000024C2-\U0001F251"
-                u"\U0001f926-\U0001f937"
-                u'\U00010000-\U0010ffff'
-                u"\u200d"
-                u"\u2640-\u2642"
-                u"\u2600-\u2B55"
-                u"\u23cf"
-                u"\u23e9"
-                u"\u231a"
-                u"\u3030"
-                u"\ufe0f"
-    "]+", flags=re.UNICODE)
-
-    return emoji_pattern.sub(r'', sentence)
-
-def remove_valores(sentence):
-    new_sentece = ''
-    
-    for token in sentence.split():
-        if token.isdigit():
-            token = '<NUM>'
-        new_sentece += ' {}'.format(token)
-        
-    return new_sentece
+# Sentiment Dictionaries
+from lexicon import lexicon_index
 
-def remove_links(sentence):
-    new_sentece = ''
-    
-    for token in sentence.split():
-        if token.startswith('http'):
-            token = ''
-        new_sentece += ' {}'.format(token)
-        
-    return new_sentece
+# Text Preprocessing
+from text_normalizer import text_normalizer, remove_emojis, remove_valores, remove_links
+
+# Label Matrix
+from lf_applier import VectorizedLFApplier
+from regex_lfs import compile_lf_pattern
+
+# Label Model persistence and fit telemetry
+from label_model_store import LabelModelStore
+from early_stopping import MonitoredLabelModel
+
+# Cache of LF votes and labels for repeated texts
+from result_cache import ResultCache, text_key
+
+# Regex patterns used by the LFs
+DIVIDEND_PATTERN = r".*pag.*dividendo.*|.*anunc.*dividendo.*|.*distrib.*dividendo.*"
+RAISE_PATTERN = r"fech.*alta.*|.*abr.*alta.*|.*fech.*pos.*|.*abr.*pos.*|.*estre.*alta.*|.*prev.*alta.*|.*result.*positivo.*"
+FALL_PATTERN = r"fech.*queda.*|.*abr.*queda.*|.*fech.*neg.*|.*abr.*neg.*|.*prev.*baixa.*|.*prev.*queda.*|.*em.*queda.*|.*result.*negativo.*"
+
+# Precompiled (anchored) forms of the patterns
+DIVIDEND_REGEX = compile_lf_pattern(DIVIDEND_PATTERN)
+RAISE_REGEX = compile_lf_pattern(RAISE_PATTERN)
+FALL_REGEX = compile_lf_pattern(FALL_PATTERN)
 
 
 class SnorkelSentimentClassifier:
@@ -68,9 +52,50 @@ class SnorkelSentimentClassifier:
     ABSTAIN = -1
     categories = [POSITIVE, NEGATIVE, ABSTAIN]
 
-    def __init__(self, df, source='twitter') -> None:
+    # Selected LFs
+    lf_names = [
+        # Positive Rules
+        'lf_news_good_adjs',
+        # 'lf_happiness_words',
+        'lf_news_good_verbs',
+        'lf_regex_dividendos',
+        'lf_regex_resultado_positivo',
+        # Negative Rules
+        'lf_news_bad_adjs',
+        # 'lf_sadness_words',
+        'lf_news_bad_verbs',
+        'lf_regex_resultado_negativo'
+    ]
+
+    # LabelModel.fit parameters
+    fit_params = dict(n_epochs=5000, log_freq=100, seed=123)
+
+    # Convergence criterion used when early_stopping is enabled (n_epochs becomes an upper bound)
+    early_stopping_params = dict(tol=1e-7, patience=100)
+
+    def __init__(self, df, source='twitter', n_jobs: int = 1, shard_size: int = 10000, model_path: str = None, early_stopping: bool = False,
+                 cache_path: str = None, cache_max_entries: int = 1000000) -> None:
         self.df = df
         self.source = source
+        self.early_stopping = early_stopping
+
+        # LabelModel of the last apply_rules, and the telemetry of the last fit
+        # (epochs, wall time, final loss; also in label_model.fit_stats)
+        self.label_model = None
+        self.fit_stats = dict()
+
+        # Fitted LabelModel is saved/reused from `model_path` (None fits on every call)
+        self.model_store = LabelModelStore(model_path) if model_path else None
+        self.model_version = None
+
+        # LF votes and labels of already seen texts are reused from `cache_path` (None disables the cache)
+        self.result_cache = ResultCache(cache_path, cache_max_entries) if cache_path else None
+        self.cache_stats = dict()
+        self._cache_rows = None
+
+        # Parallel mode: number of worker processes (-1 uses all cores) and rows per shard
+        self.n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        self.shard_size = shard_size
     
     # Labelling Functions (LFs)
 
@@ -78,92 +103,64 @@ class SnorkelSentimentClassifier:
     @staticmethod
     @labeling_function()
     def lf_news_good_adjs(x):
-        with open('./dicts/final/pos_adj.txt') as file:
-            adjectives = [line.rstrip() for line in file]
-        
-        for word in x.title.lower().split():
-            if word in adjectives:
-                return POSITIVE
-        return ABSTAIN
+        return POSITIVE if lexicon_index.contains_any('pos_adj', x.title.lower()) else ABSTAIN
 
     @staticmethod
     @labeling_function()
     def lf_happiness_words(x):
-        with open('./dicts_emocoes/alegria.txt') as f_words_happiness:
-            hapiness_words = [line.rstrip() for line in f_words_happiness]
-        
-        for word in x.title.lower().split():
-            if word in hapiness_words:
-                return POSITIVE
-        return ABSTAIN
+        return POSITIVE if lexicon_index.contains_any('happiness', x.title.lower()) else ABSTAIN
 
     @staticmethod
     @labeling_function()
     def lf_news_good_verbs(x):
-        with open('./dicts/pos_verbs.txt') as file:
-            verbs = [line.rstrip() for line in file]
-        
-        for word in x.title.lower().split():
-            if word in verbs:
-                return POSITIVE
-            
-        return ABSTAIN
+        return POSITIVE if lexicon_index.contains_any('pos_verbs', x.title.lower()) else ABSTAIN
 
     @staticmethod
     @labeling_function()
     def lf_regex_dividendos(x):
-        dividend_pattern = r".*pag.*dividendo.*|.*anunc.*dividendo.*|.*distrib.*dividendo.*"
-        return POSITIVE if re.search(dividend_pattern, x.title.lower(), flags=re.I) else ABSTAIN
+        return POSITIVE if DIVIDEND_REGEX.search(x.title) else ABSTAIN
 
     @staticmethod
     @labeling_function()
     def lf_regex_resultado_positivo(x):
-        raise_pattern = r"fech.*alta.*|.*abr.*alta.*|.*fech.*pos.*|.*abr.*pos.*|.*estre.*alta.*|.*prev.*alta.*|.*result.*positivo.*" 
-        return POSITIVE if re.search(raise_pattern, x.title.lower(), flags=re.I) else ABSTAIN
+        return POSITIVE if RAISE_REGEX.search(x.title) else ABSTAIN
 
     # NEGATIVE
     @staticmethod
     @labeling_function()
     def lf_news_bad_adjs(x):
-        with open('./dicts/final/neg_adj.txt') as f_adj_neg:
-            adjectives = [line.rstrip() for line in f_adj_neg]
-
-        for word in x.title.lower().split():
-            if word in adjectives:
-                return NEGATIVE
-
-        return ABSTAIN
+        return NEGATIVE if lexicon_index.contains_any('neg_adj', x.title.lower()) else ABSTAIN
 
     @staticmethod
     @labeling_function()
     def lf_sadness_words(x):
-        with open('./dicts_emocoes/tristeza.txt') as f_words_sadness:
-            sadness_words = [line.rstrip() for line in f_words_sadness]
-        
-        for word in x.title.lower().split():
-            if word in sadness_words:
-                return NEGATIVE
-
-        return ABSTAIN
+        return NEGATIVE if lexicon_index.contains_any('sadness', x.title.lower()) else ABSTAIN
 
     @staticmethod
     @labeling_function()
     def lf_news_bad_verbs(x):
-        with open('./dicts/neg_verbs.txt') as f_verb_neg:
-            verbs = [line.rstrip() for line in f_verb_neg]
-        
-        for word in x.title.lower().split():
-            if word in verbs:
-                return NEGATIVE
-            
-        return ABSTAIN
+        return NEGATIVE if lexicon_index.contains_any('neg_verbs', x.title.lower()) else ABSTAIN
 
     @staticmethod
     @labeling_function()
     def lf_regex_resultado_negativo(x):
-        fall_pattern = r"fech.*queda.*|.*abr.*queda.*|.*fech.*neg.*|.*abr.*neg.*|.*prev.*baixa.*|.*prev.*queda.*|.*em.*queda.*|.*result.*negativo.*" 
-        return NEGATIVE if re.search(fall_pattern, x.title.lower(), flags=re.I) else ABSTAIN    
-    
+        return NEGATIVE if FALL_REGEX.search(x.title) else ABSTAIN
+
+    # LFs evaluated column-wise by the VectorizedLFApplier
+    dictionary_lfs = {
+        'lf_news_good_adjs': ('pos_adj', POSITIVE),
+        'lf_happiness_words': ('happiness', POSITIVE),
+        'lf_news_good_verbs': ('pos_verbs', POSITIVE),
+        'lf_news_bad_adjs': ('neg_adj', NEGATIVE),
+        'lf_sadness_words': ('sadness', NEGATIVE),
+        'lf_news_bad_verbs': ('neg_verbs', NEGATIVE),
+    }
+
+    regex_lfs = {
+        'lf_regex_dividendos': (DIVIDEND_PATTERN, POSITIVE),
+        'lf_regex_resultado_positivo': (RAISE_PATTERN, POSITIVE),
+        'lf_regex_resultado_negativo': (FALL_PATTERN, NEGATIVE),
+    }
 
     def simple_preprocessor(self, df_input: pd.DataFrame) -> pd.DataFrame:
         
@@ -177,100 +174,241 @@ class SnorkelSentimentClassifier:
         # Duplicate column to save original data
         df['title_raw'] = df['title']
 
-        # Substituir símbolos importantes
-        df['title'] = df['title'].map(lambda s: s.replace('-feira', ''))
-        df['title'] = df['title'].map(lambda s: s.replace('-alvo', ' alvo'))
-        df['title'] = df['title'].map(lambda s: s.replace('\n', ' '))  
-        df['title'] = df['title'].map(lambda s: s.replace('+', ''))
-        df['title'] = df['title'].map(lambda s: s.replace('º', ''))
-        df['title'] = df['title'].map(lambda s: s.replace("‘", ''))
-        df['title'] = df['title'].map(lambda s: s.replace("’", ''))
-        df['title'] = df['title'].map(lambda s: s.replace("•", ''))
-        df['title'] = df['title'].map(lambda s: s.replace('-', ''))
-        df['title'] = df['title'].map(lambda s: s.replace('%', ' por cento'))
-        df['title'] = df['title'].map(lambda s: s.replace('R$', ''))
-        df['title'] = df['title'].map(lambda s: s.replace('U$', ''))
-        df['title'] = df['title'].map(lambda s: s.replace('US$', ''))
-        df['title'] = df['title'].map(lambda s: s.replace('S&P 500', 'spx'))
-        df['title'] = df['title'].map(lambda s: s.replace('/', '@'))
-
-        # Remove Links, Hashtags e Menções
-        df['title'] = df['title'].map(lambda s: remove_links(s))
-        df['title'] = df['title'].str.replace('(\#\w+.*?)',"")
-        df['title'] = df['title'].str.replace('(\@\w+.*?)',"")
-
-        # Transformar em String e Letras Minúsculas nas Mensagens
-        df['title'] = df['title'].map(lambda s: str(s).lower())
-
-        # Remover Pontuações
-        df['title'] = df['title'].map(lambda s: s.translate(str.maketrans('', '', string.punctuation)))
-
-        # Remover Emojis     
-        df['title'] = df['title'].map(lambda s: remove_emojis(s))
-
-        # Quebras de Linha desnecessárias
-        df['title'] = df['title'].map(lambda s: s.replace('\n', ' '))
-
-        # Remover aspas duplas
-        df['title'] = df['title'].map(lambda s: s.replace('\"', ''))
-        df['title'] = df['title'].map(lambda s: s.replace('“', ''))
-        df['title'] = df['title'].map(lambda s: s.replace('”', ''))
-
-        # Remover valores
-        df['title'] = df['title'].map(lambda s: remove_valores(s))
-
-        # Espaços desnecessários
-        df['title'] = df['title'].map(lambda s: s.strip())
+        # Substituir símbolos, remover links, hashtags, menções, pontuações,
+        # emojis e valores em uma única passagem por texto
+        df['title'] = text_normalizer.normalize_batch(df['title'])
 
         self.df = df.copy()
 
         return df
 
-    def apply_rules(self, df: pd.DataFrame):
+    def get_lfs(self) -> list:
+        return [getattr(self, name) for name in self.lf_names]
+
+    def label_matrix(self, df: pd.DataFrame) -> np.ndarray:
         """
-        Apply the selected LFs to textual data. Use full dataset, since there is no labelled data to compare.
+        Apply the LFs on the (preprocessed) dataframe.
         """
 
-        # 1. Import Raw Data
-        df = self.df.copy()
+        applier = VectorizedLFApplier(lfs=self.get_lfs(),
+                                      dictionary_lfs=self.dictionary_lfs,
+                                      regex_lfs=self.regex_lfs)
+
+        return applier.apply(df=df, progress_bar=False)
+
+    def label_shards(self, df: pd.DataFrame, preprocess: bool = True):
+        """
+        Preprocess and apply the LFs on row shards of `df` using a process pool.
+        With `preprocess` False, `df` is already preprocessed (e.g. the cache misses).
+
+        Shards are merged back in their original order, so the result is the
+        same as the serial path.
+        """
+
+        shards = [df.iloc[i:i + self.shard_size] for i in range(0, len(df), self.shard_size)]
+
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            results = list(executor.map(_label_shard, shards, [self.source] * len(shards), [preprocess] * len(shards)))
+
+        df = pd.concat([df_shard for df_shard, _ in results])
+        L = np.concatenate([L_shard for _, L_shard in results])
+
+        if preprocess:
+            self.df = df.copy()
+
+        return df, L
+
+    def cached_label_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Build the label matrix reusing the LF votes stored in the result cache.
+        Only texts missing from the cache (deduplicated) reach the LF applier,
+        in parallel shards if n_jobs > 1.
+        """
+
+        version = self.lf_fingerprint()
+
+        titles = df['title'].tolist()
+        keys = [text_key(title, version) for title in titles]
+
+        found = self.result_cache.get(list(dict.fromkeys(keys)))
+        row_hits = sum(key in found for key in keys)
+
+        # Apply the LFs on the unique texts not found in the cache
+        misses = dict()
+        for key, title in zip(keys, titles):
+            if key not in found:
+                misses.setdefault(key, title)
+
+        if misses:
+            df_misses = pd.DataFrame({'title': list(misses.values())})
+
+            if self.n_jobs > 1 and len(df_misses) > self.shard_size:
+                _, L_misses = self.label_shards(df_misses, preprocess=False)
+            else:
+                L_misses = self.label_matrix(df_misses)
+            self.result_cache.put(list(misses), L_misses)
+
+            for key, votes in zip(misses, L_misses):
+                found[key] = (votes, None, None)
+
+        L = np.array([found[key][0] for key in keys], dtype=np.int8).reshape(len(keys), len(self.lf_names))
+
+        self._cache_rows = (keys, found)
+        self.cache_stats = dict(rows=len(keys),
+                                hits=row_hits,
+                                misses=len(keys) - row_hits,
+                                lf_applied=len(misses),
+                                hit_ratio=row_hits / len(keys) if keys else 0.0)
+
+        return L
+
+    def preprocess_and_label(self, df: pd.DataFrame):
+        """
+        Preprocess the data and apply the LFs (in parallel shards if n_jobs > 1).
+        With a result cache, the LFs are only applied on cache misses.
+        """
+
+        self._cache_rows = None
+
+        if self.result_cache is not None:
+            df = self.simple_preprocessor(df)
+            return df, self.cached_label_matrix(df)
+
+        if self.n_jobs > 1 and len(df) > self.shard_size:
+            return self.label_shards(df)
 
-        # 2. Preprocess Data
         df = self.simple_preprocessor(df)
 
-        lfs = [
-            # Positive Rules
-            self.lf_news_good_adjs,
-            # self.lf_happiness_words,
-            self.lf_news_good_verbs,
-            self.lf_regex_dividendos,
-            self.lf_regex_resultado_positivo,
-            # Negative Rules
-            self.lf_news_bad_adjs,
-            # self.lf_sadness_words,
-            self.lf_news_bad_verbs,
-            self.lf_regex_resultado_negativo
-        ]
-
-        # apply the label model
-        applier = PandasLFApplier(lfs=lfs)
-
-        label_model = LabelModel(cardinality=len(categories),
-                                device='cpu', 
-                                verbose=False)
-
-        # apply the lfs on the dataframe
-        L_train = applier.apply(df=df, 
-                                progress_bar=False)
-
-        # fit on the data
-        label_model.fit(L_train,
-                        n_epochs=5000,
-                        log_freq=100, 
-                        seed=123)
+        return df, self.label_matrix(df)
+
+    def lf_fingerprint(self) -> str:
+        """
+        Hash of the selected LFs (names, code, dictionaries and patterns) and of the fit parameters.
+        """
+
+        fingerprint = hashlib.sha256()
+
+        for name in self.lf_names:
+            fingerprint.update(name.encode('utf8'))
+            fingerprint.update(inspect.getsource(getattr(self, name)._f).encode('utf8'))
+
+            if name in self.dictionary_lfs:
+                lexicon_name, label = self.dictionary_lfs[name]
+                words = sorted(lexicon_index.get(lexicon_name))
+                fingerprint.update(json.dumps([label, words], ensure_ascii=False).encode('utf8'))
+
+            if name in self.regex_lfs:
+                fingerprint.update(json.dumps(self.regex_lfs[name]).encode('utf8'))
+
+        fingerprint.update(json.dumps(self.get_fit_params(), sort_keys=True).encode('utf8'))
+
+        return fingerprint.hexdigest()
+
+    def get_fit_params(self) -> dict:
+        if self.early_stopping:
+            return dict(self.fit_params, **self.early_stopping_params)
+
+        return dict(self.fit_params)
+
+    def fit_label_model(self, L_train: np.ndarray) -> LabelModel:
+
+        label_model = MonitoredLabelModel(cardinality=len(categories),
+                                          device='cpu', 
+                                          verbose=False)
+
+        # fit on the data (telemetry in label_model.fit_stats)
+        label_model.fit(L_train, **self.get_fit_params())
+        label_model.fit_stats['loaded'] = False
+
+        self.fit_stats = label_model.fit_stats
+
+        return label_model
+
+    def get_label_model(self, L_train: np.ndarray, refit: bool = False) -> LabelModel:
+        """
+        Load the stored LabelModel if it was fitted with the current LF set,
+        otherwise (or if `refit`) fit it on `L_train` and store it.
+        """
+
+        self.model_version = None
+
+        if self.model_store is None:
+            return self.fit_label_model(L_train)
+
+        start = time.perf_counter()
+
+        label_model = None if refit else self.load_label_model()
+
+        if label_model is not None:
+            label_model.fit_stats = dict(epochs=0, wall_time=time.perf_counter() - start, final_loss=None, converged=None, loaded=True)
+            self.fit_stats = label_model.fit_stats
+        else:
+            fingerprint = self.lf_fingerprint()
+            label_model = self.fit_label_model(L_train)
+            self.model_store.save(label_model, fingerprint, n_rows=len(L_train))
+            self.model_version = self.model_store.model_id()
+
+        return label_model
+
+    def load_label_model(self):
+        """
+        Load the stored LabelModel fitted with the current LF set (None if there is none).
+        """
+
+        fingerprint = self.lf_fingerprint()
+
+        label_model = self.model_store.load(fingerprint)
+
+        if label_model is not None:
+            self.model_version = self.model_store.model_id()
+
+        return label_model
+
+    def predict(self, L: np.ndarray, label_model: LabelModel) -> np.ndarray:
+        """
+        Predict the labels of `L`, reusing the cached labels predicted by the same stored LabelModel.
+        """
+
+        if self._cache_rows is None or self.model_version is None:
+            return label_model.predict(L=L, tie_break_policy='abstain')
+
+        keys, found = self._cache_rows
+
+        preds = np.array([found[key][1] if found[key][2] == self.model_version else ABSTAIN for key in keys], dtype=int)
+        missing = np.array([found[key][2] != self.model_version for key in keys], dtype=bool)
+
+        if missing.any():
+            preds[missing] = label_model.predict(L=L[missing], tie_break_policy='abstain')
+
+            # Store the new labels (one per unique text)
+            new_rows = dict()
+            for i in np.flatnonzero(missing):
+                new_rows.setdefault(keys[i], i)
+
+            rows = list(new_rows.values())
+            self.result_cache.put(list(new_rows), L[rows], labels=preds[rows].tolist(), model_version=self.model_version)
+
+        return preds
+
+    def fit_reference(self, df: pd.DataFrame = None) -> LabelModel:
+        """
+        Fit the LabelModel once on a reference corpus and store it in `model_path`.
+        Later calls to apply_rules only predict on new data.
+        """
+
+        df = self.df.copy() if df is None else df.copy()
+
+        _, L_train = self.preprocess_and_label(df)
+
+        return self.get_label_model(L_train, refit=True)
+
+    def predict_labels(self, df: pd.DataFrame, L: np.ndarray, label_model: LabelModel) -> pd.DataFrame:
+        """
+        Predict the label classes of the (preprocessed) dataframe and keep the output columns.
+        """
 
         # predict and create the labels
-        df['label'] = label_model.predict(L=L_train, 
-                                        tie_break_policy='abstain').astype(str)
+        df['label'] = self.predict(L, label_model).astype(str)
 
         # Convert Labels to Real classes
         dict_map = {'-1': 'NEUTRAL', '1': 'POSITIVE', '0': 'NEGATIVE'}
@@ -280,10 +418,55 @@ class SnorkelSentimentClassifier:
             columns_to_keep = ['title', 'title_raw', 'created_at', 'search_dt', 'rt_count', 'favorite_count', 'label_class']
         else:
             columns_to_keep = ['title', 'title_raw', 'search_date', 'label_class']
+
+        # Weight of the near-duplicate cluster (see near_duplicates.deduplicate)
+        if 'cluster_size' in df.columns:
+            columns_to_keep.append('cluster_size')
         
-        df = df[columns_to_keep]
+        return df[columns_to_keep]
+
+    def apply_rules(self, df: pd.DataFrame, refit: bool = False):
+        """
+        Apply the selected LFs to textual data. Use full dataset, since there is no labelled data to compare.
+
+        With a `model_path`, the stored LabelModel is reused (predict only) unless
+        the LF set changed or `refit` is True.
+        """
+
+        # 1. Import Raw Data
+        df = self.df.copy()
+
+        # 2. Preprocess Data and apply the LFs
+        lfs = self.get_lfs()
+
+        df, L_train = self.preprocess_and_label(df)
+
+        # 3. Fit (or load) the label model
+        label_model = self.get_label_model(L_train, refit=refit)
+
+        # 4. Predict and create the labels
+        df = self.predict_labels(df, L_train, label_model)
+
+        # Results (the LabelModel fit telemetry is also kept in results.attrs)
+        self.label_model = label_model
 
-        # Results
         results = LFAnalysis(L=L_train, lfs=lfs).lf_summary()
+        results.attrs['label_model_fit'] = label_model.fit_stats
+
+        if self.result_cache is not None:
+            results.attrs['cache'] = self.cache_stats
 
         return df, results
+
+
+def _label_shard(df_shard: pd.DataFrame, source: str, preprocess: bool = True):
+    """
+    Worker for SnorkelSentimentClassifier.label_shards.
+    """
+
+    sc = SnorkelSentimentClassifier(df=df_shard, source=source)
+
+    if preprocess:
+        df_shard = sc.simple_preprocessor(df_shard)
+
+    return df_shard, sc.label_matrix(df_shard)
@@ -0,0 +1,90 @@
+from itertools import islice
+
+import pandas as pd
+
+from sent_classifier import SnorkelSentimentClassifier
+
+
+def iter_chunks(data, chunk_size: int = 10000, sep: str = ';'):
+    """
+    Yields DataFrames of at most `chunk_size` rows from a CSV/JSONL file path
+    or from an iterator of records (dicts).
+    """
+
+    if isinstance(data, str):
+        if data.endswith('.jsonl'):
+            reader = pd.read_json(data, lines=True, chunksize=chunk_size, dtype=False)
+        else:
+            reader = pd.read_csv(data, sep=sep, chunksize=chunk_size)
+
+        with reader:
+            yield from reader
+
+        return
+
+    records = iter(data)
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+
+        if not chunk:
+            return
+
+        yield pd.DataFrame(chunk)
+
+
+def write_chunk(df: pd.DataFrame, output_path: str, first: bool, index: bool, sep: str = ';') -> None:
+    if output_path.endswith('.jsonl'):
+        if index:
+            df = df.reset_index()
+
+        with open(output_path, 'w' if first else 'a', encoding='utf8') as f:
+            df.to_json(f, orient='records', lines=True, force_ascii=False, date_format='iso')
+    else:
+        df.to_csv(output_path, sep=sep, index=index, mode='w' if first else 'a', header=first)
+
+
+def classify_stream(data, output_path: str, model_path: str, source: str = 'twitter', chunk_size: int = 10000, index_col: str = None, sep: str = ';',
+                    cache_path: str = None) -> dict:
+    """
+    Classifies a corpus chunk by chunk with a pre-fitted LabelModel (see
+    SnorkelSentimentClassifier.fit_reference) and writes each labelled chunk
+    to `output_path` (CSV or JSONL) before reading the next one.
+
+    `data` is a CSV/JSONL file path or an iterator of records. Only one chunk
+    is held in memory at a time, so peak memory depends on `chunk_size` and
+    not on the size of the corpus. With a `cache_path`, texts already seen
+    reuse their cached LF votes and labels.
+    """
+
+    sc = SnorkelSentimentClassifier(df=None, source=source, model_path=model_path, cache_path=cache_path)
+
+    label_model = sc.load_label_model()
+
+    if label_model is None:
+        raise ValueError(f'No LabelModel fitted with the current LFs in {model_path}. Run fit_reference first.')
+
+    stats = dict(rows=0, chunks=0)
+
+    for chunk in iter_chunks(data, chunk_size=chunk_size, sep=sep):
+        if index_col is not None:
+            chunk = chunk.set_index(index_col)
+
+        # 1. Preprocess Data and apply the LFs
+        chunk, L = sc.preprocess_and_label(chunk)
+
+        # 2. Predict and create the labels
+        chunk = sc.predict_labels(chunk, L, label_model)
+
+        write_chunk(chunk, output_path, first=stats['chunks'] == 0, index=index_col is not None, sep=sep)
+
+        stats['rows'] += len(chunk)
+        stats['chunks'] += 1
+
+        if sc.result_cache is not None:
+            stats['cache_hits'] = stats.get('cache_hits', 0) + sc.cache_stats['hits']
+
+    # Drop the reference to the last chunk kept by simple_preprocessor
+    sc.df = None
+
+    return stats
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from aggregation import LABEL_VALUES, daily_sent_scores
+
+
+def notebook_daily_sent_scores(df_results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-row loop of compute_sent_scores.ipynb (Suno).
+    """
+
+    df_results = df_results.copy()
+    df_results['sent_score'] = df_results['label_class'].map(LABEL_VALUES) * 1
+
+    daily_publications = pd.DataFrame(df_results.sent_score).resample('D').nunique()
+
+    for index, row in df_results.iterrows():
+        count_dt = daily_publications.loc[str(index.date())].values[0]
+        df_results.loc[index, 'sent_score'] = row['sent_score'] / count_dt
+
+    converter = lambda x: -1 if x < 0 else (1 if x > 0 else 0)
+
+    return pd.DataFrame(df_results.sent_score.resample('D').sum().apply(converter))
+
+
+def results(rows: list) -> pd.DataFrame:
+    return pd.DataFrame([label for _, label in rows], columns=['label_class'],
+                        index=pd.DatetimeIndex([date for date, _ in rows], name='date'))
+
+
+def test_same_as_notebook_with_distinct_timestamps():
+    df_results = results([
+        ('2022-03-20 10:00', 'POSITIVE'), ('2022-03-20 12:00', 'NEGATIVE'), ('2022-03-20 15:00', 'NEGATIVE'),
+        ('2022-03-22 09:00', 'NEUTRAL'), ('2022-03-22 18:00', 'POSITIVE'),
+        ('2022-03-23 11:00', 'NEGATIVE'),
+    ])
+
+    expected = notebook_daily_sent_scores(df_results)
+    daily = daily_sent_scores(df_results, 'suno')
+
+    assert daily['sent_score'].tolist() == expected['sent_score'].tolist()
+    assert daily.index.equals(expected.index)
+
+
+def test_publications_with_the_same_timestamp_all_count():
+    # Suno PETR4 on 2022-03-21: a negative and a neutral news at 11:44, a neutral one at 21:32
+    df_results = results([
+        ('2022-03-21 11:44', 'NEGATIVE'), ('2022-03-21 11:44', 'NEUTRAL'), ('2022-03-21 21:32', 'NEUTRAL'),
+        ('2022-03-22 10:00', 'POSITIVE'),
+    ])
+
+    daily = daily_sent_scores(df_results, 'suno')
+
+    # The notebook overwrote both 11:44 rows with the neutral score
+    assert notebook_daily_sent_scores(df_results).loc['2022-03-21', 'sent_score'] == 0
+    assert daily.loc['2022-03-21', 'sent_score'] == -1
+    assert daily.loc['2022-03-22', 'sent_score'] == 1
@@ -0,0 +1,79 @@
+import os
+import sys
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+import snorkel
+from snorkel.labeling.model import LabelModel
+
+import early_stopping
+from early_stopping import MonitoredLabelModel, early_stopping_supported
+from datasets import SUNO_FILE
+from sent_classifier import SnorkelSentimentClassifier
+
+
+def label_matrix(n: int = 40, seed: int = 123) -> np.ndarray:
+    rng = np.random.RandomState(seed)
+
+    return rng.choice([-1, 0, 1], size=(n, 4), p=[0.5, 0.25, 0.25])
+
+
+def test_installed_snorkel_calls_the_logging_hook_every_epoch():
+    # The private hook early stopping relies on (see the early_stopping module docstring)
+    assert early_stopping_supported()
+    assert 'self._execute_logging(loss)' in inspect.getsource(LabelModel.fit)
+
+
+def test_early_stopping_stops_and_records_fit_stats():
+    label_model = MonitoredLabelModel(cardinality=3, device='cpu', verbose=False)
+    label_model.fit(label_matrix(), n_epochs=5000, seed=123, progress_bar=False, tol=1e-4, patience=20)
+
+    stats = label_model.fit_stats
+
+    assert stats['converged']
+    assert 0 < stats['epochs'] < 5000
+    assert stats['final_loss'] is not None
+
+
+def test_full_training_without_tol():
+    label_model = MonitoredLabelModel(cardinality=3, device='cpu', verbose=False)
+    label_model.fit(label_matrix(), n_epochs=50, seed=123, progress_bar=False)
+
+    assert label_model.fit_stats['epochs'] == 50
+    assert not label_model.fit_stats['converged']
+
+
+def test_unsupported_snorkel_version_trains_all_epochs(monkeypatch):
+    monkeypatch.setattr(snorkel, '__version__', '99.0.0')
+
+    label_model = MonitoredLabelModel(cardinality=3, device='cpu', verbose=False)
+
+    with pytest.warns(UserWarning, match='not supported'):
+        label_model.fit(label_matrix(), n_epochs=300, seed=123, progress_bar=False, tol=1e10, patience=1)
+
+    assert label_model.fit_stats['epochs'] == 300
+    assert not label_model.fit_stats['converged']
+
+
+def test_apply_rules_reads_fit_stats_from_the_model(tmp_path):
+    df = pd.read_csv(SUNO_FILE, sep=';').head(200)
+
+    sc = SnorkelSentimentClassifier(df=df, source='suno', early_stopping=True, model_path=str(tmp_path / 'label_model.pkl'))
+    _, results = sc.apply_rules(df)
+
+    assert sc.label_model.fit_stats['loaded'] is False
+    assert sc.fit_stats is sc.label_model.fit_stats
+    assert results.attrs['label_model_fit'] == sc.label_model.fit_stats
+
+    # Stored model: loaded, not fitted
+    sc = SnorkelSentimentClassifier(df=df, source='suno', early_stopping=True, model_path=str(tmp_path / 'label_model.pkl'))
+    sc.apply_rules(df)
+
+    assert sc.label_model.fit_stats['loaded'] is True
+    assert sc.label_model.fit_stats['epochs'] == 0
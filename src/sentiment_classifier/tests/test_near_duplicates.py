@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from near_duplicates import NUM_PERM, BANDS, candidate_pairs, cluster_signatures, deduplicate, deduplicate_sources
+
+HOUR = pd.Timedelta('1H').value
+DAY = pd.Timedelta('1D').value
+
+TITLE = 'Petrobras anuncia pagamento de dividendos de R$ 3 por ação aos acionistas'
+
+
+def test_three_item_bucket_links_first_and_last():
+    # 0 and 2 are identical; 1 shares only band 0 with them and sits between them in time
+    signatures = np.arange(3 * NUM_PERM, dtype=np.uint64).reshape(3, NUM_PERM)
+    signatures[2] = signatures[0]
+    signatures[1, :NUM_PERM // BANDS] = signatures[0, :NUM_PERM // BANDS]
+
+    times = np.array([0, HOUR, 2 * HOUR])
+
+    pairs = candidate_pairs(signatures, times, DAY)
+    assert {tuple(pair) for pair in pairs} == {(0, 1), (0, 2), (1, 2)}
+
+    labels = cluster_signatures(signatures, times, DAY)
+    assert labels[0] == labels[2] != labels[1]
+
+
+def test_candidate_pairs_respect_the_window():
+    signatures = np.zeros((4, NUM_PERM), dtype=np.uint64)
+    times = np.array([0, HOUR, 2 * DAY, 2 * DAY + HOUR])
+
+    pairs = candidate_pairs(signatures, times, DAY)
+
+    assert {tuple(pair) for pair in pairs} == {(0, 1), (2, 3)}
+
+
+def test_deduplicate_keeps_first_of_each_cluster():
+    df = pd.DataFrame({'title': [TITLE + '.', 'Vale reporta queda na produção de minério', TITLE, TITLE.upper() + '!']},
+                      index=pd.DatetimeIndex(['2021-05-03 10:00', '2021-05-03 09:00', '2021-05-03 08:00', '2021-05-03 12:00']))
+
+    df_dedup = deduplicate(df)
+
+    assert list(df_dedup['title']) == ['Vale reporta queda na produção de minério', TITLE]
+    assert list(df_dedup['cluster_size']) == [1, 3]
+
+
+def test_deduplicate_sources_counts_copies_of_every_source():
+    suno = pd.DataFrame({'title': [TITLE, 'Itaú divulga resultado do trimestre acima do esperado']},
+                        index=pd.DatetimeIndex(['2021-05-03 11:00', '2021-05-04 09:00']))
+    twitter = pd.DataFrame({'title': ['RT ' + TITLE, 'Bolsa fecha em alta puxada por bancos e Petrobras']},
+                           index=pd.DatetimeIndex(['2021-05-03 10:00', '2021-05-04 18:00']))
+
+    results = deduplicate_sources({'suno': suno, 'twitter': twitter, 'moneytimes': pd.DataFrame()})
+
+    # The story is kept once, in the source that published it first, with the copy of the other source counted
+    assert list(results['suno']['title']) == ['Itaú divulga resultado do trimestre acima do esperado']
+    assert list(results['twitter']['title']) == ['RT ' + TITLE, 'Bolsa fecha em alta puxada por bancos e Petrobras']
+    assert list(results['twitter']['cluster_size']) == [2, 1]
+    assert results['moneytimes'].empty
+
+
+def test_large_identical_bucket_is_linear():
+    # 5000 copies of one templated tweet within the window: a few pairs per copy and band, one cluster
+    n = 5000
+    signatures = np.tile(np.arange(NUM_PERM, dtype=np.uint64), (n, 1))
+    times = np.arange(n) * pd.Timedelta('1s').value
+
+    pairs = candidate_pairs(signatures, times, DAY)
+
+    assert len(pairs) <= 2 * n
+    assert (cluster_signatures(signatures, times, DAY) == 0).all()
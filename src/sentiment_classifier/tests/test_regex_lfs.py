@@ -0,0 +1,110 @@
+import os
+import re
+import sys
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from datasets import SUNO_FILE, TWITTER_RELATED_FILE, TWITTER_SPECIFIC_FILE
+from regex_lfs import RegexLFEngine, anchor_pattern
+from text_normalizer import text_normalizer
+from sent_classifier import SnorkelSentimentClassifier
+
+PATTERNS = {name: pattern for name, (pattern, _) in SnorkelSentimentClassifier.regex_lfs.items()}
+
+# Accents, case, line breaks (not crossed by '.') and keywords at the start or end of the text
+EDGE_TEXTS = [
+    '',
+    'dividendo',
+    'Petrobras PAGA dividendos',
+    'Petrobrás anunciará DIVIDENDOS extraordinários',
+    'DISTRIBUIÇÃO de dividendo',
+    'distribuição\nde dividendo',
+    'pag\ndividendo',
+    'Ibovespa FECHA em ALTA',
+    'fech alta',
+    'Bolsa abre em queda; previsão de baixa',
+    'PREVİSÃO DE ALTA',
+    'resultado positivo',
+    'RESULTADO NEGATIVO\n',
+    'em queda',
+    'emqueda',
+    'estreia em alta',
+    'Ação <NUM> por cento em queda',
+    '.* fech .* alta .*',
+]
+
+# Patterns starting and ending with '.*' (dropped by anchor_pattern), lazy and possessive forms kept
+EDGE_PATTERNS = [
+    '.*a.*',
+    '.*.*fech.*alta.*.*',
+    '.*?queda',
+    '.*+queda',
+    'prev.*|.*baixa',
+    '.*',
+    '.*(pag|anunc).*dividendo.*',
+]
+
+
+def original_votes(patterns: dict, texts: list) -> np.ndarray:
+    """
+    Votes of the LFs as originally written: re.search of the pattern on the lowercased text.
+    """
+
+    return np.array([[re.search(pattern, text.lower(), flags=re.I) is not None for pattern in patterns.values()]
+                     for text in texts], dtype=bool).reshape(len(texts), len(patterns))
+
+
+def random_texts(n: int, seed: int = 123) -> list:
+    keywords = set()
+    for pattern in PATTERNS.values():
+        keywords.update(token for token in re.split(r'\.\*|\|', pattern) if token)
+
+    vocabulary = sorted(keywords) + ['a', 'de', 'vale', 'petr4', ' ', '\n', 'FECH', 'Alta', 'ç', 'ã', 'Ã', '.', '*']
+
+    rng = random.Random(seed)
+
+    return [''.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 40))) for _ in range(n)]
+
+
+def bundled_texts() -> list:
+    titles = pd.read_csv(SUNO_FILE, sep=';')['title'].tolist()
+
+    for path in [TWITTER_RELATED_FILE, TWITTER_SPECIFIC_FILE]:
+        titles += pd.read_csv(path, sep=';')['text'].dropna().tolist()
+
+    return titles
+
+
+@pytest.mark.parametrize('corpus', ['raw', 'preprocessed', 'random', 'edge'])
+def test_engine_matches_original_lfs(corpus):
+    if corpus == 'random':
+        texts = random_texts(5000)
+    elif corpus == 'edge':
+        texts = EDGE_TEXTS
+    else:
+        texts = bundled_texts()
+
+        if corpus == 'preprocessed':
+            texts = text_normalizer.normalize_batch(texts)
+
+    np.testing.assert_array_equal(RegexLFEngine(PATTERNS).match_batch(texts), original_votes(PATTERNS, texts))
+
+
+def test_anchored_edge_patterns_match_original():
+    patterns = {f'lf_{i}': pattern for i, pattern in enumerate(EDGE_PATTERNS)}
+    texts = EDGE_TEXTS + random_texts(1000, seed=7)
+
+    np.testing.assert_array_equal(RegexLFEngine(patterns).match_batch(texts), original_votes(patterns, texts))
+
+
+def test_anchor_pattern():
+    assert anchor_pattern('.*pag.*dividendo.*|.*anunc.*dividendo.*') == 'pag.*dividendo|anunc.*dividendo'
+    assert anchor_pattern('.*.*fech.*alta.*.*') == 'fech.*alta'
+    assert anchor_pattern('.*?queda') == '.*?queda'
+    assert anchor_pattern('.*(pag|anunc).*dividendo.*') == '.*(pag|anunc).*dividendo.*'
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(THIS_DIR))
+
+from snorkel.labeling.model import LabelModel
+
+from datasets import SUNO_FILE
+from label_model_store import LabelModelStore
+from result_cache import ResultCache
+from sent_classifier import SnorkelSentimentClassifier
+
+
+def suno_titles(n: int) -> pd.DataFrame:
+    return pd.read_csv(SUNO_FILE, sep=';').drop_duplicates(subset='title').head(n).reset_index(drop=True)
+
+
+def test_cache_misses_are_labelled_in_shards(tmp_path):
+    df = suno_titles(300)
+
+    _, L_serial = SnorkelSentimentClassifier(df=df, source='suno').preprocess_and_label(df.copy())
+
+    sc = SnorkelSentimentClassifier(df=df, source='suno', n_jobs=2, shard_size=50, cache_path=str(tmp_path / 'cache.sqlite'))
+
+    sharded = list()
+    label_shards = sc.label_shards
+
+    def spy(df_shards, preprocess=True):
+        sharded.append((len(df_shards), preprocess))
+        return label_shards(df_shards, preprocess)
+
+    sc.label_shards = spy
+
+    _, L_cached = sc.preprocess_and_label(df.copy())
+
+    # One sharded pass over the unique (normalized) texts, not preprocessed again
+    assert sharded == [(sc.cache_stats['lf_applied'], False)]
+    assert sc.cache_stats['lf_applied'] > 50
+    assert np.array_equal(L_cached, L_serial)
+
+    # Second run: every text is a hit, nothing is labelled
+    sharded.clear()
+    _, L_hits = sc.preprocess_and_label(df.copy())
+
+    assert sharded == []
+    assert sc.cache_stats['hits'] == 300
+    assert np.array_equal(L_hits, L_serial)
+
+
+def test_models_saved_in_the_same_second_get_different_ids(tmp_path):
+    L = np.array([[1, -1, 0], [0, 0, -1], [-1, 1, 1], [1, 1, -1]] * 10)
+
+    label_model = LabelModel(cardinality=3, device='cpu', verbose=False)
+    label_model.fit(L, n_epochs=10, seed=123)
+
+    store = LabelModelStore(str(tmp_path / 'label_model.pkl'))
+
+    store.save(label_model, 'fingerprint', n_rows=len(L))
+    first = store.metadata()
+
+    store.save(label_model, 'fingerprint', n_rows=len(L))
+    second = store.metadata()
+
+    assert first['model_id'] != second['model_id']
+    assert store.model_id() == second['model_id']
+
+
+def test_cache_is_counted_only_when_full(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / 'results.sqlite'), max_entries=100)
+    counts = list()
+    monkeypatch.setattr(ResultCache, '__len__', lambda self: counts.append(1) or self.conn.execute('SELECT COUNT(*) FROM results').fetchone()[0])
+
+    for i in range(25):
+        cache.put([f'{i}-{j}' for j in range(10)], np.zeros((10, 3)))
+
+    # 25 puts of 10 new keys: the table is counted (and trimmed to 90 entries) at 110 entries, every other put from the 11th
+    assert len(counts) == 8
+    assert cache.count == len(cache) == 90
+
+    cache.close()
@@ -0,0 +1,115 @@
+import re
+import string
+
+# Padrões dos Emojis
+EMOJI_CHARS = (
+            u"\U0001F600-\U0001F64F"  # emoticons
+            u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+            u"\U0001F680-\U0001F6FF"  # transport & map symbols
+            u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+            u"\U00002702-\U000027B0"
+            u"\U000024C2-\U0001F251"
+            u"\U0001f926-\U0001f937"
+            u'\U00010000-\U0010ffff'
+            u"\u200d"
+            u"\u2640-\u2642"
+            u"\u2600-\u2B55"
+            u"\u23cf"
+            u"\u23e9"
+            u"\u231a"
+            u"\u3030"
+            u"\ufe0f"
+)
+
+EMOJI_PATTERN = re.compile("[" + EMOJI_CHARS + "]+", flags=re.UNICODE)
+
+# Símbolos removidos antes de tratar moedas e links
+SYMBOLS_PATTERN = re.compile("[+º‘’•-]")
+
+# Pontuações, aspas duplas e Emojis (removidos depois das letras minúsculas)
+STRIP_PATTERN = re.compile("[" + re.escape(string.punctuation + "“”") + EMOJI_CHARS + "]+", flags=re.UNICODE)
+
+# Hashtags e Menções ('#' and '@' are not word characters, so one pattern removes both)
+TAGS_PATTERN = re.compile(r'[#@]\w+')
+
+
+def remove_emojis(sentence):
+    "Remoção de Emojis nas mensagens de texto."
+
+    return EMOJI_PATTERN.sub(r'', sentence)
+
+def remove_valores(sentence):
+    return ''.join([' <NUM>' if token.isdigit() else ' ' + token for token in sentence.split()])
+
+def remove_links(sentence):
+    return ''.join([' ' if token.startswith('http') else ' ' + token for token in sentence.split()])
+
+
+class TextNormalizer:
+    """
+    Normalizes titles and tweets in a single pass per string.
+
+    All replacement tables and patterns are built once, in the constructor.
+    The output is the same as applying every step of the original column-wise
+    preprocessor in sequence: single character removals commute, so they are
+    grouped into one compiled character class per stage.
+    """
+
+    def __init__(self) -> None:
+        # Substituições que dependem da ordem de aplicação
+        self.pre_replacements = [
+            ('-feira', ''),
+            ('-alvo', ' alvo'),
+            ('\n', ' '),
+        ]
+
+        self.symbols_pattern = SYMBOLS_PATTERN
+
+        self.replacements = [
+            ('%', ' por cento'),
+            ('R$', ''),
+            ('U$', ''),
+            ('US$', ''),
+            ('S&P 500', 'spx'),
+            ('/', '@'),
+        ]
+
+        self.tags_pattern = TAGS_PATTERN
+        self.strip_pattern = STRIP_PATTERN
+
+    def normalize(self, text: str) -> str:
+
+        # Substituir símbolos importantes
+        for old, new in self.pre_replacements:
+            text = text.replace(old, new)
+
+        text = self.symbols_pattern.sub('', text)
+
+        for old, new in self.replacements:
+            text = text.replace(old, new)
+
+        # Remove Links, Hashtags e Menções (quebras de linha somem no split)
+        text = ' '.join(['' if token.startswith('http') else token for token in text.split()])
+        text = self.tags_pattern.sub('', text)
+
+        # Letras Minúsculas, Pontuações, Emojis e aspas duplas
+        text = self.strip_pattern.sub('', text.lower())
+
+        # Remover valores e espaços desnecessários
+        return ' '.join(['<NUM>' if token.isdigit() else token for token in text.split()])
+
+    def normalize_batch(self, texts) -> list:
+        """
+        Normalizes a batch of texts (list, pandas Series or Arrow array).
+        """
+
+        if hasattr(texts, 'to_pylist'):
+            texts = texts.to_pylist()
+
+        normalize = self.normalize
+
+        return [normalize(text) for text in texts]
+
+
+# Normalizer shared by every classifier in the process
+text_normalizer = TextNormalizer()